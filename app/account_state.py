@@ -0,0 +1,184 @@
+import asyncio
+import time
+from collections import OrderedDict
+from binance.exceptions import BinanceAPIException
+from .config import settings
+
+
+class PositionState:
+    """Bir sembolün tek yönlü (one-way, `ps`='BOTH') pozisyonu."""
+    __slots__ = ("symbol", "amount", "entry_price", "unrealized_pnl", "margin_type", "updated")
+
+    def __init__(self, symbol: str, amount: float = 0.0, entry_price: float = 0.0, unrealized_pnl: float = 0.0,
+                 margin_type: str = "cross", updated: int = 0):
+        self.symbol, self.amount, self.entry_price, self.unrealized_pnl = symbol, amount, entry_price, unrealized_pnl
+        self.margin_type, self.updated = margin_type, updated
+
+    @property
+    def side(self) -> str | None:
+        return "LONG" if self.amount > 0 else "SHORT" if self.amount < 0 else None
+
+    def to_dict(self) -> dict:
+        # REST `positionRisk` ile aynı alan adları (get_open_positions çağıranları için)
+        return {"symbol": self.symbol, "positionAmt": str(self.amount), "entryPrice": str(self.entry_price),
+                "unRealizedProfit": str(self.unrealized_pnl), "marginType": self.margin_type, "updateTime": self.updated}
+
+
+class AccountState:
+    """
+    Hesabın bellek içi durumu: pozisyonlar, bakiyeler, emirlerin ortalama dolum fiyatları,
+    gerçekleşen K/Z ve komisyonlar.
+
+    `start` ile REST'ten (`futures_account`) bir kez beslenir, ardından kullanıcı akışındaki
+    ACCOUNT_UPDATE ve ORDER_TRADE_UPDATE olaylarıyla `apply` üzerinden güncel tutulur. Akışta
+    kaçan olaylara karşı `reconcile_interval` saniyede bir REST anlık görüntüsüyle karşılaştırılır;
+    anlık görüntü isteği başladıktan sonra akıştan güncellenmiş pozisyon ve bakiyelere dokunulmaz. "Sonra"
+    borsa saatiyle belirlenir: istek başladığında görülmüş en yeni olay zamanından (`E`) yeni olaylar.
+    Yalnızca tek yönlü pozisyon modu izlenir (botun kullandığı mod).
+    """
+    def __init__(self, reconcile_interval: float = settings.ACCOUNT_RECONCILE_SECONDS, max_orders: int = 1000):
+        self.reconcile_interval, self.max_orders = reconcile_interval, max_orders
+        self.positions: dict[str, PositionState] = {}
+        # varlık -> {"wallet_balance", "cross_wallet_balance", "balance_change", "updated"}
+        self.balances: dict[str, dict] = {}
+        # orderId -> emir kaydı (en yeni `max_orders` emir)
+        self.orders: OrderedDict[int, dict] = OrderedDict()
+        self.realized_pnl: dict[str, float] = {}
+        self.commissions: dict[str, float] = {}
+        self._last_trade_id: dict[str, int] = {}
+        self._last_closing_order: dict[str, int] = {}
+        # Borsa saatiyle (olay `E`, ms): görülen en yeni olay ve sembol/varlık başına son akış güncellemesi
+        self._last_event_time = 0
+        self._position_events: dict[str, int] = {}
+        self._balance_events: dict[str, int] = {}
+        self._client = None
+        self._task: asyncio.Task | None = None
+        self.seeded = False
+        self.metrics = {"events": 0, "duplicate_trades": 0, "reconciles": 0, "drift_corrections": 0, "last_reconcile": None}
+
+    async def start(self, client):
+        """REST'ten ilk durumu yükler ve periyodik uzlaştırmayı başlatır (zaten çalışıyorsa bir şey yapmaz)."""
+        self._client = client
+        if self._task is not None and not self._task.done(): return
+        await self.reconcile()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Uzlaştırmayı durdurur; kullanıcı akışı da kapandığı için durum artık güncel sayılmaz."""
+        self.seeded = False
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try: await self._task
+            except asyncio.CancelledError: pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            await self.reconcile()
+
+    async def reconcile(self) -> int:
+        """REST anlık görüntüsünü yerel durumla karşılaştırıp farkları düzeltir; düzeltilen pozisyon sayısını döndürür."""
+        if self._client is None: return 0
+        # Yerel saat kullanılmaz; saat kayması akıştan gelen güncel durumu silebilir ya da eskisini tutabilirdi
+        started = self._last_event_time
+        try:
+            account = await self._client.futures_account()
+        except (BinanceAPIException, OSError, asyncio.TimeoutError) as e:
+            print(f"Hata: Hesap durumu uzlaştırılamadı: {e}"); return 0
+        corrected = 0
+        remote = {p["symbol"]: p for p in account.get("positions", []) if p.get("positionSide", "BOTH") == "BOTH"}
+        for symbol in set(remote) | set(self.positions):
+            local = self.positions.get(symbol)
+            # İstek sırasında akıştan gelen güncelleme anlık görüntüden daha yenidir
+            if self._position_events.get(symbol, 0) > started: continue
+            data = remote.get(symbol, {})
+            amount, entry_price = float(data.get("positionAmt", 0)), float(data.get("entryPrice", 0))
+            if self.seeded and (local.amount if local else 0.0) != amount:
+                corrected += 1
+                print(f"UYARI: {symbol} pozisyonu akışla uyuşmuyordu ({local.amount if local else 0.0} -> {amount}), düzeltildi.")
+            if amount == 0: self.positions.pop(symbol, None); continue
+            self.positions[symbol] = PositionState(symbol, amount, entry_price, float(data.get("unrealizedProfit", 0)),
+                                                   "isolated" if data.get("isolated") else "cross", int(data.get("updateTime", 0)))
+        for asset in account.get("assets", []):
+            balance = self.balances.get(asset["asset"])
+            if self._balance_events.get(asset["asset"], 0) > started: continue
+            self.balances[asset["asset"]] = {"wallet_balance": float(asset.get("walletBalance", 0)),
+                                             "cross_wallet_balance": float(asset.get("crossWalletBalance", 0)),
+                                             "balance_change": balance["balance_change"] if balance else 0.0,
+                                             "updated": int(asset.get("updateTime", 0))}
+        self.seeded = True
+        self.metrics["reconciles"] += 1; self.metrics["drift_corrections"] += corrected; self.metrics["last_reconcile"] = time.time()
+        return corrected
+
+    def apply(self, message: dict):
+        """Kullanıcı akışı olayını uygular (ACCOUNT_UPDATE / ORDER_TRADE_UPDATE; diğerleri yok sayılır)."""
+        event = message.get('e')
+        if event == 'ACCOUNT_UPDATE': self._apply_account_update(message)
+        elif event == 'ORDER_TRADE_UPDATE': self._apply_order_update(message)
+        else: return
+        self._last_event_time = max(self._last_event_time, int(message.get('E') or 0))
+        self.metrics["events"] += 1
+
+    def _apply_account_update(self, message: dict):
+        data, updated, event_time = message.get('a', {}), int(message.get('T') or message.get('E') or 0), int(message.get('E') or 0)
+        for balance in data.get('B', []):
+            self._balance_events[balance['a']] = event_time
+            self.balances[balance['a']] = {"wallet_balance": float(balance['wb']), "cross_wallet_balance": float(balance.get('cw', 0)),
+                                           "balance_change": float(balance.get('bc', 0)), "updated": updated}
+        for position in data.get('P', []):
+            if position.get('ps', 'BOTH') != 'BOTH': continue
+            # Kapanan pozisyon sıfır miktarla tutulur ki daha eski bir REST anlık görüntüsü onu geri getirmesin
+            symbol, amount = position['s'], float(position['pa'])
+            self._position_events[symbol] = event_time
+            self.positions[symbol] = PositionState(symbol, amount, float(position['ep']), float(position.get('up', 0)),
+                                                   position.get('mt', 'cross'), updated)
+
+    def _apply_order_update(self, message: dict):
+        data = message.get('o', {})
+        symbol, order_id = data.get('s'), int(data.get('i', 0))
+        order = self.orders.get(order_id)
+        if order is None:
+            order = self.orders[order_id] = {"order_id": order_id, "symbol": symbol, "client_order_id": data.get('c'), "side": data.get('S'),
+                                             "type": data.get('o'), "reduce_only": bool(data.get('R')), "avg_price": 0.0, "last_price": 0.0,
+                                             "filled_qty": 0.0, "realized_pnl": 0.0, "commission": 0.0, "commission_asset": data.get('N')}
+            while len(self.orders) > self.max_orders: self.orders.popitem(last=False)
+        order["status"], order["update_time"] = data.get('X'), int(data.get('T') or message.get('E') or 0)
+        if data.get('x') != 'TRADE': return
+        # Yeniden bağlanmada tekrar gelen dolumlar iki kez sayılmamalı (işlem kimlikleri sembol başına artar)
+        trade_id = int(data.get('t', 0))
+        if trade_id and trade_id <= self._last_trade_id.get(symbol, 0):
+            self.metrics["duplicate_trades"] += 1; return
+        if trade_id: self._last_trade_id[symbol] = trade_id
+        realized, commission = float(data.get('rp', 0)), float(data.get('n', 0))
+        order["avg_price"], order["last_price"] = float(data.get('ap', 0)), float(data.get('L', 0))
+        order["filled_qty"] = float(data.get('z', 0))
+        order["realized_pnl"] += realized; order["commission"] += commission
+        if data.get('N'): order["commission_asset"] = data['N']; self.commissions[data['N']] = self.commissions.get(data['N'], 0.0) + commission
+        self.realized_pnl[symbol] = self.realized_pnl.get(symbol, 0.0) + realized
+        if realized or order["reduce_only"]: self._last_closing_order[symbol] = order_id
+
+    def order(self, order_id: int) -> dict | None:
+        return self.orders.get(int(order_id))
+
+    def exit_price(self, order: dict) -> float:
+        """Dolan emrin çıkış fiyatı: ortalama dolum fiyatı, yoksa son dolum fiyatı (piyasa emirlerinde `p` 0'dır)."""
+        return order["avg_price"] or order["last_price"]
+
+    def position(self, symbol: str) -> PositionState | None:
+        position = self.positions.get(symbol)
+        return position if position is not None and position.amount != 0 else None
+
+    def open_positions(self) -> list[dict]:
+        return [position.to_dict() for position in self.positions.values() if position.amount != 0]
+
+    def last_trade_pnl(self, symbol: str) -> float:
+        """Sembolün son kapanış emrinin (tüm kısmi dolumları dahil) gerçekleşen K/Z'si."""
+        order = self.orders.get(self._last_closing_order.get(symbol, -1))
+        return order["realized_pnl"] if order else 0.0
+
+    def snapshot(self) -> dict:
+        return {"seeded": self.seeded, "positions": {p["symbol"]: p for p in self.open_positions()},
+                "balances": self.balances, "realized_pnl": self.realized_pnl, "commissions": self.commissions} | self.metrics
+
+account_state = AccountState()
@@ -0,0 +1,297 @@
+"""
+Çevrimdışı geriye dönük test (backtest) motoru.
+
+Yerel CSV/Parquet mum dosyalarını yükler, `ema_crossover` stratejisiyle aynı EMA kesişim
+sinyallerini (EMA'lar canlı yolla bit düzeyinde aynı; EMA ve kesişimler NumPy ile vektörel) üretir ve `create_market_order_with_tp_sl`
+tarafından kurulan TAKE_PROFIT_MARKET / STOP_MARKET çıkışlarını mum içi high/low
+değerleriyle simüle eder.
+
+Kullanım:
+    python -m app.backtester BTCUSDT-1m-2024.csv --symbol BTCUSDT
+"""
+import argparse
+import math
+from datetime import datetime, timezone
+import numpy as np
+from .config import settings
+from .kline_store import KLINE_FIELDS
+
+LONG, SHORT = 1, -1
+EXIT_TAKE_PROFIT, EXIT_STOP_LOSS, EXIT_END_OF_DATA = 0, 1, 2
+EXIT_STATUSES = ("CLOSED_BY_TAKE_PROFIT_MARKET", "CLOSED_BY_STOP_MARKET", "CLOSED_BY_END_OF_DATA")
+# Binance kline dosyalarındaki olası sütun adları -> KLINE_FIELDS adları
+_COLUMN_ALIASES = {
+    "quote_asset_volume": "quote_volume", "number_of_trades": "trades", "count": "trades",
+    "taker_buy_base_asset_volume": "taker_buy_base_volume", "taker_buy_volume": "taker_buy_base_volume",
+    "taker_buy_quote_asset_volume": "taker_buy_quote_volume",
+}
+
+
+def load_klines(path: str) -> dict[str, np.ndarray]:
+    """
+    Binance formatındaki bir CSV ya da Parquet mum dosyasını sütun dizilerine yükler.
+    Başlıksız CSV'lerde (data.binance.vision) sütun sırası REST çıktısıyla aynıdır.
+    """
+    import pandas as pd
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, header=None)
+        if not str(df.iat[0, 0]).lstrip("-").isdigit():
+            df = pd.read_csv(path)  # Başlık satırı var
+    if all(isinstance(c, int) for c in df.columns):
+        df = df.iloc[:, :len(KLINE_FIELDS)]
+        df.columns = [name for name, _ in KLINE_FIELDS][:df.shape[1]]
+    df = df.rename(columns=lambda c: _COLUMN_ALIASES.get(str(c).lower(), str(c).lower()))
+    df = df.sort_values("open_time").drop_duplicates("open_time")
+    return {name: df[name].to_numpy(dtype=dtype) for name, dtype in KLINE_FIELDS if name in df.columns}
+
+
+def _ema_estimate(x: np.ndarray, alpha: float, decay: float) -> np.ndarray:
+    """
+    EMA'nın blok içi kapalı formla yaklaşık değeri: y[j] = d^(j+1) * c + alpha * d^j * cumsum(x[i] * d^-i).
+    Blok boyu d^-B taşmayacak şekilde seçilir; ~1e-13 göreli sapma yalnızca `ema` çapaları için yeterlidir.
+    """
+    n = len(x)
+    block = int(min(4096, max(1, math.floor(8 * math.log(10) / -math.log(decay))))) if decay > 0 else 1
+    blocks = -(-n // block)
+    padded = np.zeros(blocks * block); padded[:n] = x
+    padded = padded.reshape(blocks, block)
+    powers = decay ** np.arange(block)
+    partial = alpha * powers * np.cumsum(padded / powers, axis=1)
+    carries = np.empty(blocks)
+    carry, decay_block = x[0], decay ** block
+    for k in range(blocks):
+        carries[k] = carry
+        carry = decay_block * carry + partial[k, -1]
+    return (carries[:, None] * (powers * decay)[None, :] + partial).reshape(-1)[:n]
+
+
+def _changed(new: np.ndarray, old: np.ndarray) -> np.ndarray:
+    return (new != old) & ~(np.isnan(new) & np.isnan(old))
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    `indicators.EMA` / pandas `ewm(span=period, adjust=False)` ile bit düzeyinde aynı EMA serisi.
+
+    Kesişim sinyali iki EMA'nın farkının işaretine bağlıdır; yatay bölgelerde 1e-13'lük yuvarlama
+    farkı bile sahte kesişim üretir. Bu yüzden her değer canlı yoldaki özyinelemeyle, aynı işlem
+    sırası ve aynı "fiyat değişmediyse değer korunur" kuralıyla hesaplanır.
+
+    Vektörleştirme: seri ~√n genişliğinde satırlara bölünür ve özyineleme tüm satırlarda sütun sütun
+    birlikte yürütülür; satır başları kapalı form tahminle çapalanır. Sonra her satırın gerçek başlangıcı
+    (önceki satırın son değeri) çapayla karşılaştırılır; farklı olanlar gerçek değerle yeniden çapalanıp
+    yörünge eski hesapla bire bir birleşene kadar yeniden yürütülür. Özyineleme deterministik olduğundan
+    birleşmeden sonra satırın kalanı değişmez; her turda en az bir satır daha kesinleşir.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    if n == 0: return x.copy()
+    alpha = 2.0 / (period + 1); decay = 1.0 - alpha
+    # Satır, çapa hatasının (~1e-13) yuvarlama düzeyine sönümlenmesinden (~3.5 * period adım) uzun tutulur
+    width = max(64, math.isqrt(n), 4 * (period + 1))
+    rows = -(-n // width)
+    if rows < 64:
+        # Kısa seride sütun başına NumPy çağrısı döngüden pahalıdır
+        value, out = x[0], []
+        for price in x.tolist():
+            if price != value: value = decay * value + alpha * price
+            out.append(value)
+        return np.array(out)
+    def step(prev, price): return np.where(price == prev, prev, decay * prev + alpha * price)
+
+    grid = np.empty(rows * width); grid[:n] = x; grid[n:] = x[-1]  # Sabit dolgu: değer korunur
+    grid = grid.reshape(rows, width)
+    out = np.empty_like(grid)
+    anchors = np.empty(rows); anchors[0] = x[0]  # İlk fiyat kendisiyle eşit: y[0] = x[0]
+    anchors[1:] = _ema_estimate(x, alpha, decay)[width - 1:(rows - 1) * width:width]
+    value = anchors
+    for j in range(width): value = out[:, j] = step(value, grid[:, j])
+
+    stale = np.flatnonzero(_changed(out[:-1, -1], anchors[1:])) + 1
+    while len(stale):
+        value, moving = out[stale - 1, -1], stale
+        for j in range(width):
+            new = step(value, grid[moving, j])
+            moved = _changed(new, out[moving, j])
+            moving, value = moving[moved], new[moved]
+            if not len(moving): break
+            out[moving, j] = value
+        # Satır sonuna kadar birleşmeyenlerin son değeri değişti: ardıl satırlar yeniden çapalanır
+        stale = moving[moving < rows - 1] + 1
+    return out.reshape(-1)[:n]
+
+
+def generate_signals(close: np.ndarray, short_ema_period: int, long_ema_period: int,
+                     short_ema: np.ndarray | None = None, long_ema: np.ndarray | None = None):
+    """
+    Kesişim anlarını döndürür: (mum indeksleri, yönler [+1 LONG, -1 SHORT]).
+    Canlı strateji gibi en az `long_ema_period` mum birikmeden sinyal üretilmez.
+    Önceden hesaplanmış EMA serileri verilebilir (parametre taramasında tekrar kullanım için).
+    """
+    short_ema = ema(close, short_ema_period) if short_ema is None else short_ema
+    long_ema = ema(close, long_ema_period) if long_ema is None else long_ema
+    diff = short_ema - long_ema
+    prev, cur = diff[:-1], diff[1:]
+    sides = np.where((prev < 0) & (cur > 0), LONG, np.where((prev > 0) & (cur < 0), SHORT, 0))
+    indices = np.flatnonzero(sides) + 1
+    indices = indices[indices >= long_ema_period - 1]
+    return indices, sides[indices - 1].astype(np.int8)
+
+
+def find_exits(high, low, open_, entry_indices, sides, tp_prices, sl_prices):
+    """
+    Her giriş için TP ya da SL'nin ilk tetiklendiği mumu tüm girişler üzerinde birlikte arar.
+    Çıkış yalnızca giriş mumu ve yöne bağlı olduğundan pozisyon sırasından bağımsız hesaplanabilir.
+    Dönüş: (çıkış indeksleri [-1: veri sonuna kadar yok], çıkış türleri, çıkış fiyatları).
+    """
+    n, count = len(high), len(entry_indices)
+    exit_idx = np.full(count, -1, dtype=np.int64)
+    kinds = np.full(count, EXIT_END_OF_DATA, dtype=np.int8)
+    prices = np.zeros(count)
+    pending = np.arange(count)
+    offset, window = 1, 16
+    while len(pending):
+        starts = entry_indices[pending] + offset
+        pending = pending[starts < n]; starts = starts[starts < n]
+        if not len(pending): break
+        # Her bekleyen giriş için [start, start + window) aralığındaki mumlar (veri sonunda kırpılır)
+        idx = np.minimum(starts[:, None] + np.arange(window)[None, :], n - 1)
+        valid = starts[:, None] + np.arange(window)[None, :] < n
+        long_side = (sides[pending] == LONG)[:, None]
+        tp, sl = tp_prices[pending][:, None], sl_prices[pending][:, None]
+        h, l = high[idx], low[idx]
+        tp_hits = np.where(long_side, h >= tp, l <= tp) & valid
+        sl_hits = np.where(long_side, l <= sl, h >= sl) & valid
+        hits = tp_hits | sl_hits
+        found = hits.any(axis=1)
+        first = np.argmax(hits, axis=1)
+        rows = np.flatnonzero(found)
+        if len(rows):
+            target, j = pending[rows], idx[rows, first[rows]]
+            o, is_long = open_[j], sides[target] == LONG
+            tp_v, sl_v = tp_prices[target], sl_prices[target]
+            sl_hit, tp_hit = sl_hits[rows, first[rows]], tp_hits[rows, first[rows]]
+            # Boşluklu açılışta emir açılış fiyatından dolar; aynı mumda ikisi de tetiklendiyse
+            # mum içi sıra bilinmediğinden temkinli olarak SL varsayılır
+            sl_gap = sl_hit & np.where(is_long, o <= sl_v, o >= sl_v)
+            tp_gap = ~sl_gap & tp_hit & np.where(is_long, o >= tp_v, o <= tp_v)
+            is_sl = sl_gap | (~tp_gap & sl_hit)
+            exit_idx[target] = j
+            kinds[target] = np.where(is_sl, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT)
+            prices[target] = np.where(sl_gap | tp_gap, o, np.where(is_sl, sl_v, tp_v))
+        pending = pending[~found]
+        offset, window = offset + window, window * 4
+    return exit_idx, kinds, prices
+
+
+def simulate_trades(columns: dict, signal_indices: np.ndarray, signal_sides: np.ndarray,
+                    take_profit_percent: float = settings.TAKE_PROFIT_PERCENT,
+                    stop_loss_percent: float = settings.STOP_LOSS_PERCENT,
+                    leverage: int = settings.LEVERAGE, order_size_usdt: float = settings.ORDER_SIZE_USDT,
+                    quantity_precision: int | None = None, fee_rate: float = 0.0) -> dict[str, np.ndarray]:
+    """
+    Sinyalleri canlı botun kurallarıyla işleme dönüştürür: pozisyon açıkken sinyal
+    değerlendirilmez, giriş sinyal mumunun kapanışından yapılır, TP/SL giriş fiyatına
+    göre kurulur ve sonraki mumların high/low değerleriyle aranır.
+    """
+    high, low, open_, close = columns["high"], columns["low"], columns["open"], columns["close"]
+    sides = signal_sides.astype(np.int8)
+    entries = close[signal_indices].astype(np.float64)
+    quantities = (order_size_usdt * leverage) / entries
+    if quantity_precision is not None:
+        factor = 10 ** quantity_precision; quantities = np.floor(quantities * factor) / factor
+    tp_prices = np.where(sides == LONG, entries * (1 + take_profit_percent), entries * (1 - take_profit_percent))
+    sl_prices = np.where(sides == LONG, entries * (1 - stop_loss_percent), entries * (1 + stop_loss_percent))
+    exit_idx, kinds, prices = find_exits(high, low, open_, signal_indices, sides, tp_prices, sl_prices)
+
+    # Pozisyon sırası: yalnızca önceki işlem kapandıktan sonraki sinyaller işleme dönüşür
+    taken = []
+    free_from, last_side = 0, 0
+    for k, (idx, side, exit_at) in enumerate(zip(signal_indices.tolist(), sides.tolist(), exit_idx.tolist())):
+        if idx < free_from or quantities[k] <= 0: continue
+        # Çıkış mumunun kapanışında strateji yeniden değerlendirilir; aynı yöndeki sinyal tekrar sayılır
+        if idx == free_from and side == last_side: continue
+        taken.append(k)
+        if exit_at < 0: break
+        free_from, last_side = exit_at, side
+    taken = np.array(taken, dtype=np.int64)
+    exit_idx, kinds, prices = exit_idx[taken], kinds[taken], prices[taken]
+    open_ended = exit_idx < 0
+    exit_idx[open_ended], prices[open_ended] = len(close) - 1, close[-1]
+
+    trades = {"entry_index": np.asarray(signal_indices, dtype=np.int64)[taken], "exit_index": exit_idx,
+              "side": sides[taken], "entry_price": entries[taken], "exit_price": prices,
+              "exit_kind": kinds, "quantity": quantities[taken]}
+    trades["commission"] = fee_rate * trades["quantity"] * (trades["entry_price"] + trades["exit_price"])
+    pnl = trades["quantity"] * (trades["exit_price"] - trades["entry_price"]) * trades["side"]
+    trades["pnl"] = pnl - trades["commission"]
+    return trades
+
+
+def summarize(trades: dict[str, np.ndarray]) -> dict:
+    """İşlem dizilerinden özet PnL istatistiklerini hesaplar."""
+    pnl = trades["pnl"]
+    equity = np.cumsum(pnl)
+    drawdown = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:] - equity if len(pnl) else np.zeros(0)
+    gross_profit, gross_loss = float(pnl[pnl > 0].sum()), float(-pnl[pnl < 0].sum())
+    return {
+        "total_trades": int(len(pnl)), "winning_trades": int((pnl > 0).sum()),
+        "win_rate": float((pnl > 0).mean()) if len(pnl) else 0.0,
+        "net_pnl": float(pnl.sum()), "gross_profit": gross_profit, "gross_loss": gross_loss,
+        "profit_factor": gross_profit / gross_loss if gross_loss else math.inf if gross_profit else 0.0,
+        "average_pnl": float(pnl.mean()) if len(pnl) else 0.0,
+        "max_drawdown": float(drawdown.max()) if len(drawdown) else 0.0,
+        "take_profit_exits": int((trades["exit_kind"] == EXIT_TAKE_PROFIT).sum()),
+        "stop_loss_exits": int((trades["exit_kind"] == EXIT_STOP_LOSS).sum()),
+    }
+
+
+def to_trade_log(symbol: str, columns: dict, trades: dict[str, np.ndarray]) -> list[dict]:
+    """
+    İşlemleri botun `trade_journal.log_trade` ile yazdığı kapanış kayıtlarının biçimine dönüştürür.
+    Canlı kayıtlarda olduğu gibi `pnl` borsanın gerçekleşen K/Z'si (komisyon hariç), `commission` ayrıdır.
+    """
+    open_time = columns["open_time"]
+    return [{
+        "symbol": symbol, "side": "LONG" if side == LONG else "SHORT",
+        "entry_price": entry, "exit_price": exit_price, "status": EXIT_STATUSES[kind], "pnl": pnl + commission,
+        "commission": commission, "timestamp": datetime.fromtimestamp(int(open_time[exit_idx]) / 1000, tz=timezone.utc),
+    } for side, entry, exit_price, kind, pnl, commission, exit_idx in zip(
+        trades["side"].tolist(), trades["entry_price"].tolist(), trades["exit_price"].tolist(),
+        trades["exit_kind"].tolist(), trades["pnl"].tolist(), trades["commission"].tolist(), trades["exit_index"].tolist())]
+
+
+def run_backtest(columns: dict, symbol: str = "", short_ema_period: int = 5, long_ema_period: int = 12, **trade_params) -> dict:
+    """Sinyal üretimi, işlem simülasyonu ve özeti tek adımda çalıştırır."""
+    indices, sides = generate_signals(columns["close"], short_ema_period, long_ema_period)
+    trades = simulate_trades(columns, indices, sides, **trade_params)
+    return {"trades": to_trade_log(symbol, columns, trades), "summary": summarize(trades)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EMA kesişim stratejisi için çevrimdışı backtest.")
+    parser.add_argument("path", help="Binance formatında CSV ya da Parquet mum dosyası")
+    parser.add_argument("--symbol", default="")
+    parser.add_argument("--short-ema", type=int, default=5)
+    parser.add_argument("--long-ema", type=int, default=12)
+    parser.add_argument("--take-profit", type=float, default=settings.TAKE_PROFIT_PERCENT)
+    parser.add_argument("--stop-loss", type=float, default=settings.STOP_LOSS_PERCENT)
+    parser.add_argument("--leverage", type=int, default=settings.LEVERAGE)
+    parser.add_argument("--order-size", type=float, default=settings.ORDER_SIZE_USDT)
+    parser.add_argument("--quantity-precision", type=int, default=None)
+    parser.add_argument("--fee-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    columns = load_klines(args.path)
+    result = run_backtest(columns, args.symbol, args.short_ema, args.long_ema,
+                          take_profit_percent=args.take_profit, stop_loss_percent=args.stop_loss,
+                          leverage=args.leverage, order_size_usdt=args.order_size,
+                          quantity_precision=args.quantity_precision, fee_rate=args.fee_rate)
+    print(f"{len(columns['close'])} mum üzerinde backtest tamamlandı.")
+    for key, value in result["summary"].items():
+        print(f"  {key}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -2,95 +2,123 @@ import asyncio
 from binance import AsyncClient, BinanceSocketManager
 from binance.exceptions import BinanceAPIException
 from .config import settings
+from .account_state import account_state
+from .order_pipeline import cancel_all_open_orders, order_pipeline
+from .rest_scheduler import RestScheduler, ScheduledClient
+from .symbol_metadata import SymbolMeta, symbol_metadata
+from .stream_supervisor import StreamHealth
 
 class BinanceClient:
     def __init__(self):
         self.api_key = settings.API_KEY; self.api_secret = settings.API_SECRET
         self.is_testnet = settings.ENVIRONMENT == "TEST"; self.client: AsyncClient | None = None
         self.bsm: BinanceSocketManager | None = None
-        self.exchange_info = None; print(f"Binance İstemcisi başlatılıyor. Ortam: {settings.ENVIRONMENT}")
+        self.user_stream_health = StreamHealth("user"); self._reconcile_task: asyncio.Task | None = None
+        # Tüm REST çağrıları ağırlık bütçesi, öncelik ve birleştirme için bu zamanlayıcıdan geçer
+        self.scheduler = RestScheduler(); self._rest: ScheduledClient | None = None
+        self._init_lock = asyncio.Lock(); print(f"Binance İstemcisi başlatılıyor. Ortam: {settings.ENVIRONMENT}")
 
     async def initialize(self):
-        if self.client is None:
-            self.client = await AsyncClient.create(self.api_key, self.api_secret, testnet=self.is_testnet)
-            self.bsm = BinanceSocketManager(self.client)
-            self.exchange_info = await self.client.get_exchange_info()
-            print("Binance AsyncClient ve Socket Manager başarıyla başlatıldı.")
+        # Aynı anda başlatılan semboller tek bir istemciyi paylaşır
+        async with self._init_lock:
+            if self.client is None:
+                self.client = await AsyncClient.create(self.api_key, self.api_secret, testnet=self.is_testnet)
+                self.bsm = BinanceSocketManager(self.client)
+                print("Binance AsyncClient ve Socket Manager başarıyla başlatıldı.")
+            # Vadeli işlem sembol kuralları: disk önbelleği tazeyse ağ isteği yapılmaz, TTL dolunca yenilenir
+            await symbol_metadata.load(self.rest)
+            # Pozisyon/bakiye durumu bir kez REST'ten yüklenir, sonrası kullanıcı akışından
+            await account_state.start(self.rest)
         return self.client
 
+    @property
+    def rest(self) -> ScheduledClient:
+        """Geçerli `client` için zamanlayıcılı sarmalayıcı (istemci değişirse yenilenir)."""
+        if self._rest is None or self._rest.client is not self.client: self._rest = ScheduledClient(self.client, self.scheduler)
+        return self._rest
+
     async def start_user_stream(self, callback):
-        """Kullanıcı emir güncellemelerini dinlemek için stream başlatır."""
+        """
+        Kullanıcı emir güncellemelerini dinler. Soket kapanır ya da hata mesajı gelirse bağlam
+        kapatılıp yeni bir soketle (yeni listenKey) jitter'lı üstel beklemeyle yeniden bağlanılır.
+        Her yeniden bağlantıda hesap durumu uzlaştırılır; bağlantı kopukken kaçan olaylar böylece telafi edilir.
+        İlk bağlantıda gerekmez: `initialize` durumu az önce yükledi, sonrasını periyodik uzlaştırma kapsar.
+        """
         if not self.bsm: await self.initialize()
-        print("Kullanıcı veri akışı (User Stream) başlatılıyor...")
-        ts = self.bsm.user_socket()
-        async with ts as tscm:
-            while True:
-                try:
-                    res = await tscm.recv()
-                    await callback(res)
-                except Exception as e:
-                    print(f"User stream hatası: {e}. Yeniden bağlanılıyor...")
-                    await asyncio.sleep(5)
+        while True:
+            print("Kullanıcı veri akışı (User Stream) başlatılıyor...")
+            error = None
+            try:
+                async with self.bsm.futures_user_socket() as tscm:
+                    self.user_stream_health.on_connect()
+                    if self.user_stream_health.connects > 1: self._reconcile_after_reconnect()
+                    while True:
+                        res = await tscm.recv()
+                        # python-binance bağlantı hatalarını {'e': 'error'} mesajı olarak kuyruğa koyar
+                        if res.get('e') == 'error': error = res.get('m') or res.get('type'); break
+                        self.user_stream_health.on_message()
+                        await callback(res)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = e
+            delay = self.user_stream_health.on_disconnect(repr(error))
+            print(f"User stream hatası: {error!r}. {delay:.1f} sn sonra yeniden bağlanılıyor...")
+            await asyncio.sleep(delay)
 
-    # ... (Diğer tüm fonksiyonlar aynı kalacak, sadece create_market_order_with_tp_sl'i güvenli hale getiriyoruz)
-    async def create_market_order_with_tp_sl(self, symbol: str, side: str, quantity: float, entry_price: float, price_precision: int):
-        def format_price(price): return f"{price:.{price_precision}f}"
-        try:
-            main_order = await self.client.futures_create_order(symbol=symbol, side=side, type='MARKET', quantity=quantity)
-            print(f"Başarılı: {symbol} {side} {quantity} PİYASA EMRİ oluşturuldu.")
-            await asyncio.sleep(0.5)
-            tp_price = entry_price * (1 + settings.TAKE_PROFIT_PERCENT) if side == 'BUY' else entry_price * (1 - settings.TAKE_PROFIT_PERCENT)
-            sl_price = entry_price * (1 - settings.STOP_LOSS_PERCENT) if side == 'BUY' else entry_price * (1 + settings.TAKE_PROFIT_PERCENT)
-            formatted_tp_price = format_price(tp_price)
-            formatted_sl_price = format_price(sl_price)
-            await self.client.futures_create_order(
-                symbol=symbol, side='SELL' if side == 'BUY' else 'BUY', type='TAKE_PROFIT_MARKET',
-                stopPrice=formatted_tp_price, closePosition=True)
-            print(f"Başarılı: {symbol} için TAKE PROFIT emri {formatted_tp_price} seviyesine kuruldu.")
-            await self.client.futures_create_order(
-                symbol=symbol, side='SELL' if side == 'BUY' else 'BUY', type='STOP_MARKET',
-                stopPrice=formatted_sl_price, closePosition=True)
-            print(f"Başarılı: {symbol} için STOP LOSS emri {formatted_sl_price} seviyesine kuruldu.")
-            return main_order
-        except BinanceAPIException as e:
-            print(f"Hata: Emir oluşturulurken sorun oluştu: {e}")
-            await self.client.futures_cancel_all_open_orders(symbol=symbol)
-            print(f"--> GÜVENLİK: Hata nedeniyle {symbol} için tüm emirler ve pozisyonlar kapatıldı.")
-            return None
+    def _reconcile_after_reconnect(self):
+        # Önceki kopukluktan kalan uzlaştırma bu kopukluğu kapsamayabilir; yerine yenisi başlatılır
+        if self._reconcile_task and not self._reconcile_task.done(): self._reconcile_task.cancel()
+        self._reconcile_task = asyncio.create_task(account_state.reconcile())
+
+    async def create_market_order_with_tp_sl(self, symbol: str, side: str, quantity: str | float, entry_price: float, meta: SymbolMeta, signal_time: float | None = None):
+        """Piyasa emrini ve TP/SL emirlerini `order_pipeline` üzerinden yerleştirir; `entry_price` yalnızca yedek tahmindir."""
+        return await order_pipeline.open_position(self.rest, symbol, side, quantity, entry_price, meta, signal_time)
     async def cancel_all_symbol_orders(self, symbol: str):
         try:
-            await self.client.futures_cancel_all_open_orders(symbol=symbol)
+            await cancel_all_open_orders(self.rest, symbol)
             print(f"--> TEMİZLİK: {symbol} için kalan tüm açık emirler iptal edildi.")
         except BinanceAPIException as e:
             print(f"Hata: Emirler temizlenirken sorun oluştu: {e}")
     # ... (Diğer tüm yardımcı fonksiyonlar aynı kalacak) ...
-    async def get_symbol_info(self, symbol: str):
-        if not self.exchange_info: return None
-        for s in self.exchange_info['symbols']:
-            if s['symbol'] == symbol: return s
-        return None
+    async def get_symbol_info(self, symbol: str) -> SymbolMeta | None:
+        if not symbol_metadata.is_fresh(): await self.initialize()
+        return symbol_metadata.get(symbol)
     async def get_open_positions(self):
+        """Açık pozisyonlar; hesap durumu kullanıcı akışından güncel tutuluyorsa REST çağrısı yapılmaz."""
+        if account_state.seeded: return account_state.open_positions()
         try:
-            positions = await self.client.futures_position_information()
+            positions = await self.rest.futures_position_information()
             return [p for p in positions if float(p['positionAmt']) != 0]
         except BinanceAPIException as e: print(f"Hata: Pozisyon bilgileri alınamadı: {e}"); return []
-    async def close_open_position(self, symbol: str):
-        try:
-            positions = await self.client.futures_position_information(symbol=symbol)
-            for position in positions:
-                if float(position['positionAmt']) != 0:
-                    side = 'SELL' if float(position['positionAmt']) > 0 else 'BUY'
-                    quantity = abs(float(position['positionAmt']))
-                    await self.client.futures_cancel_all_open_orders(symbol=symbol)
-                    await asyncio.sleep(0.1)
-                    response = await self.client.futures_create_order(symbol=symbol, side=side, type='MARKET', quantity=quantity, reduceOnly=True)
-                    print(f"--> TRAILING STOP ile POZİSYON KAPATILDI: {response}")
-                    return response
-            return None
-        except BinanceAPIException as e: print(f"Hata: Pozisyon kapatılırken sorun oluştu: {e}"); return None
+    async def close_open_position(self, symbol: str, attempts: int = 3, retry_delay: float = 0.2):
+        """
+        Pozisyonu reduce-only piyasa emriyle kapatır; pozisyon yoksa (TP/SL zaten dolduysa) None döner. TP/SL
+        emirleri kapanış onaylandıktan sonra iptal edilir, böylece kapatma başarısız olursa pozisyon korumasız
+        kalmaz. Emir reddedilirse pozisyon yeniden okunup tekrar denenir; son denemenin hatası yükseltilir.
+        """
+        for attempt in range(1, attempts + 1):
+            try:
+                if account_state.seeded:
+                    position = account_state.position(symbol)
+                    positions = [position.to_dict()] if position else []
+                else:
+                    positions = await self.rest.futures_position_information(symbol=symbol)
+                amount = next((float(p['positionAmt']) for p in positions if float(p['positionAmt']) != 0), 0.0)
+                if not amount: return None
+                response = await self.rest.futures_create_order(symbol=symbol, side='SELL' if amount > 0 else 'BUY', type='MARKET',
+                                                                 quantity=abs(amount), reduceOnly=True)
+            except BinanceAPIException as e:
+                print(f"Hata: Pozisyon kapatılırken sorun oluştu ({attempt}/{attempts}): {e}")
+                if attempt == attempts: raise
+                await asyncio.sleep(retry_delay * attempt); continue
+            print(f"--> TRAILING STOP ile POZİSYON KAPATILDI: {response}")
+            await self.cancel_all_symbol_orders(symbol)
+            return response
     async def get_last_trade_pnl(self, symbol: str) -> float:
+        if account_state.seeded: return account_state.last_trade_pnl(symbol)
         try:
-            trades = await self.client.futures_account_trades(symbol=symbol, limit=5)
+            trades = await self.rest.futures_account_trades(symbol=symbol, limit=5)
             if trades:
                 last_order_id = trades[-1]['orderId']
                 pnl = 0.0
@@ -101,18 +129,24 @@ class BinanceClient:
             return 0.0
         except BinanceAPIException as e: print(f"Hata: Son işlem PNL'i alınamadı: {e}"); return 0.0
     async def close(self):
+        if self._reconcile_task and not self._reconcile_task.done(): self._reconcile_task.cancel()
+        await account_state.stop()
         if self.client: await self.client.close_connection(); self.client = None; print("Binance AsyncClient bağlantısı kapatıldı.")
-    async def get_historical_klines(self, symbol: str, interval: str, limit: int = 100):
+    async def get_historical_klines(self, symbol: str, interval: str, limit: int = 100, start_time: int | None = None, end_time: int | None = None):
+        """Vadeli işlem mumları; `start_time`/`end_time` (ms) verilirse yalnızca o aralık (boşluk tamamlama için)."""
         try:
-            print(f"{symbol} için {limit} adet geçmiş mum verisi çekiliyor..."); return await self.client.get_historical_klines(symbol, interval, limit=limit)
+            print(f"{symbol} için {limit} adet geçmiş mum verisi çekiliyor...")
+            # Tek istek (en fazla 1500 mum); akıştaki fstream mumlarıyla aynı kaynak
+            window = {k: v for k, v in (("startTime", start_time), ("endTime", end_time)) if v is not None}
+            return await self.rest.futures_klines(symbol=symbol, interval=interval, limit=min(limit, 1500), **window)
         except BinanceAPIException as e: print(f"Hata: Geçmiş mum verileri çekilemedi: {e}"); return []
     async def set_leverage(self, symbol: str, leverage: int):
         try:
-            await self.client.futures_change_leverage(symbol=symbol, leverage=leverage); print(f"Başarılı: {symbol} kaldıracı {leverage}x olarak ayarlandı."); return True
+            await self.rest.futures_change_leverage(symbol=symbol, leverage=leverage); print(f"Başarılı: {symbol} kaldıracı {leverage}x olarak ayarlandı."); return True
         except BinanceAPIException as e: print(f"Hata: Kaldıraç ayarlanamadı: {e}"); return False
     async def get_market_price(self, symbol: str):
         try:
-            ticker = await self.client.futures_symbol_ticker(symbol=symbol); return float(ticker['price'])
+            ticker = await self.rest.futures_symbol_ticker(symbol=symbol); return float(ticker['price'])
         except BinanceAPIException as e: print(f"Hata: {symbol} fiyatı alınamadı: {e}"); return None
 
 binance_client = BinanceClient()
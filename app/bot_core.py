@@ -1,135 +1,323 @@
 import asyncio
-import json
-import websockets
+import time
+try:
+    # Piyasa akışı sıcak yolu: orjson standart json'dan birkaç kat hızlı çözer
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 from .config import settings
+from .account_state import account_state
 from .binance_client import binance_client
-from .trading_strategy import trading_strategy
-from .firebase_manager import firebase_manager
+from .order_pipeline import order_pipeline
+from .trading_strategy import DEFAULT_STRATEGY, Strategy, create_strategy
+from .trade_journal import trade_journal
+from .market_stream import MarketStreamManager
+from .kline_store import KlineStore
+from .price_cache import price_cache
+from .status_hub import StatusHub
+from .strategy_executor import StrategyExecutor
+from .symbol_metadata import SymbolMeta
+from .trailing_stop import TrailingStopEngine
+from binance.helpers import interval_to_milliseconds
 from datetime import datetime, timezone
-import math
+from decimal import Decimal
+
+class SymbolState:
+    """Tek bir sembolün çalışma zamanı durumu: mumlar, emir kuralları, pozisyon ve strateji."""
+    def __init__(self, symbol: str, strategy: Strategy):
+        self.symbol, self.strategy = symbol, strategy
+        self.klines: KlineStore | None = None
+        self.meta: SymbolMeta | None = None
+        self.trade_task: asyncio.Task | None = None
+        # Boşluk tamamlanırken gelen kapanışlar sırayla bekletilir
+        self.backfill_task: asyncio.Task | None = None
+        self.held_closes: list[tuple[dict, float]] = []
+        self.status = {"symbol": symbol, "in_position": False, "status_message": f"{symbol} için başlatılıyor...", "last_signal": "N/A", "entry_price": 0.0, "position_side": None, "strategy": strategy.name, "strategy_params": strategy.params}
+
+    @property
+    def streams(self) -> list[str]:
+        """Bu sembol için abone olunan piyasa akışları (kline + isteğe bağlı fiyat akışı)."""
+        streams = [f"{self.symbol.lower()}@kline_{settings.TIMEFRAME}"]
+        if settings.PRICE_STREAM: streams.append(f"{self.symbol.lower()}@{settings.PRICE_STREAM}")
+        return streams
+
 
 class BotCore:
     def __init__(self):
-        self.status = {"is_running": False, "symbol": None, "in_position": False, "status_message": "Bot başlatılmadı.", "last_signal": "N/A", "entry_price": 0.0, "position_side": None}
-        self.klines, self._stop_requested, self.quantity_precision, self.price_precision = [], False, 0, 0
-
-    # ... (_get_precision_from_filter aynı) ...
-    def _get_precision_from_filter(self, symbol_info, filter_type, key):
-        for f in symbol_info['filters']:
-            if f['filterType'] == filter_type:
-                size_str = f[key]
-                if '.' in size_str: return len(size_str.split('.')[1].rstrip('0'))
-                return 0
-        return 0
-
-    async def start(self, symbol: str):
-        if self.status["is_running"]: print("Bot zaten çalışıyor."); return
-        self._stop_requested = False
-        self.status.update({"is_running": True, "symbol": symbol, "in_position": False, "status_message": f"{symbol} için başlatılıyor..."})
-        print(self.status["status_message"])
-        
+        self.symbols: dict[str, SymbolState] = {}
+        self.status = {"is_running": False, "status_message": "Bot başlatılmadı.", "symbols": {}}
+        self.market_streams = MarketStreamManager(self._handle_market_message)
+        self._user_stream_task: asyncio.Task | None = None
+        self.status_hub = StatusHub(lambda: self.status)
+        self.strategy_executor = StrategyExecutor(self._on_signal)
+        self.trailing_stops = TrailingStopEngine(self._on_trailing_stop)
+        self.stream_metrics = {"gaps": 0, "backfilled_candles": 0, "unfilled_candles": 0, "last_kline_lag_ms": 0.0, "max_kline_lag_ms": 0.0}
+
+    def _refresh_status(self, message: str | None = None):
+        self.status["is_running"] = bool(self.symbols)
+        self.status["symbols"] = {symbol: state.status for symbol, state in self.symbols.items()}
+        if message: self.status["status_message"] = message
+        self.status_hub.notify()
+
+    async def start(self, symbol: str, strategy: str = DEFAULT_STRATEGY, params: dict | None = None):
+        if symbol in self.symbols: print(f"{symbol} için bot zaten çalışıyor."); return
+        state = SymbolState(symbol, create_strategy(strategy, **(params or {})))
+        self.symbols[symbol] = state
+        self._refresh_status(state.status["status_message"])
+        print(state.status["status_message"])
+
         await binance_client.initialize()
-        
-        symbol_info = await binance_client.get_symbol_info(symbol)
-        if not symbol_info: self.status["status_message"] = f"{symbol} için borsa bilgileri alınamadı."; await self.stop(); return
-        self.quantity_precision = self._get_precision_from_filter(symbol_info, 'LOT_SIZE', 'stepSize')
-        self.price_precision = self._get_precision_from_filter(symbol_info, 'PRICE_FILTER', 'tickSize')
-        print(f"{symbol} için Miktar Hassasiyeti: {self.quantity_precision}, Fiyat Hassasiyeti: {self.price_precision}")
-        
-        if not await binance_client.set_leverage(symbol, settings.LEVERAGE): self.status["status_message"] = "Kaldıraç ayarlanamadı."; await self.stop(); return
-        
-        self.klines = await binance_client.get_historical_klines(symbol, settings.TIMEFRAME, limit=50)
-        if not self.klines: self.status["status_message"] = "Geçmiş veri alınamadı."; await self.stop(); return
-        
-        self.status["status_message"] = f"{symbol} ({settings.TIMEFRAME}) için sinyal bekleniyor..."
-        
-        # İki görevi (piyasa dinleme ve emir dinleme) aynı anda çalıştır
-        await asyncio.gather(
-            self.listen_market_stream(),
-            self.listen_user_stream()
-        )
-        await self.stop()
-
-    async def listen_market_stream(self):
-        """Piyasa verilerini (mumları) dinler."""
-        ws_url = f"{settings.WEBSOCKET_URL}/ws/{self.status['symbol'].lower()}@kline_{settings.TIMEFRAME}"
-        try:
-            async with websockets.connect(ws_url, ping_interval=30, ping_timeout=15) as ws:
-                print(f"Piyasa veri akışı kuruldu: {ws_url}")
-                while not self._stop_requested:
-                    try:
-                        message = await asyncio.wait_for(ws.recv(), timeout=60.0)
-                        await self._handle_market_message(message)
-                    except (asyncio.TimeoutError, websockets.exceptions.ConnectionClosed):
-                        print("Piyasa veri akışı bağlantı sorunu, yeniden deneniyor..."); await asyncio.sleep(5); break
-        except Exception as e:
-            print(f"Piyasa veri akışı hatası: {e}")
+
+        state.meta = await binance_client.get_symbol_info(symbol)
+        if not state.meta: await self.stop(symbol, f"{symbol} için borsa bilgileri alınamadı."); return
+        print(f"{symbol} için Miktar Adımı: {state.meta.step_size}, Fiyat Adımı: {state.meta.tick_size}, Asgari Nominal: {state.meta.min_notional}")
+
+        if not await binance_client.set_leverage(symbol, settings.LEVERAGE): await self.stop(symbol, f"{symbol} için kaldıraç ayarlanamadı."); return
+
+        history = self.strategy_executor.history_size(state.strategy)
+        klines = await binance_client.get_historical_klines(symbol, settings.TIMEFRAME, limit=history)
+        if not klines: await self.stop(symbol, f"{symbol} için geçmiş veri alınamadı."); return
+        state.klines = KlineStore.from_klines(klines, capacity=history, shared=self.strategy_executor.shared_klines)
+        if self.symbols.get(symbol) is not state:
+            # Hazırlık sırasında durduruldu; `stop` depo oluşturulmadan önce çalıştığı için paylaşımlı bellek burada bırakılır
+            state.klines.release(); return
+        self.strategy_executor.add_symbol(state)
+
+        # Kullanıcı akışı tüm semboller için tektir; piyasa akışı combined-stream gruplarına eklenir
+        if self._user_stream_task is None or self._user_stream_task.done():
+            self._user_stream_task = asyncio.create_task(self.listen_user_stream())
+        await self.market_streams.subscribe(state.streams)
+
+        state.status["status_message"] = f"{symbol} ({settings.TIMEFRAME}) için sinyal bekleniyor..."
+        self._refresh_status(f"{len(self.symbols)} sembol izleniyor.")
 
     async def listen_user_stream(self):
         """Kullanıcı emir güncellemelerini dinler."""
         await binance_client.start_user_stream(self._handle_user_message)
 
-    async def stop(self):
-        self._stop_requested = True
-        if self.status["is_running"]:
-            self.status.update({"is_running": False, "status_message": "Bot durduruldu."})
-            print(self.status["status_message"]); await binance_client.close()
+    async def stop(self, symbol: str | None = None, reason: str | None = None):
+        """Tek bir sembolü ya da (symbol verilmezse) tüm sembolleri durdurur."""
+        symbols = [symbol] if symbol else list(self.symbols)
+        removed = [self.symbols.pop(s) for s in symbols if s in self.symbols]
+        if removed: await self.market_streams.unsubscribe([stream for state in removed for stream in state.streams + [self._trailing_stream(state)]])
+        for state in removed:
+            if state.backfill_task and not state.backfill_task.done(): state.backfill_task.cancel()
+            self.trailing_stops.close(state.symbol)
+            price_cache.discard(state.symbol)
+            self.strategy_executor.remove_symbol(state)
+            if state.klines: state.klines.release()
+        for state in removed: print(reason or f"{state.symbol} için bot durduruldu.")
+        if not self.symbols and (removed or self.status["is_running"]):
+            if self._user_stream_task and not self._user_stream_task.done():
+                self._user_stream_task.cancel()
+                try: await self._user_stream_task
+                except asyncio.CancelledError: pass
+            self._user_stream_task = None
+            await self.market_streams.close()
+            await self.strategy_executor.close()
+            await binance_client.close()
+            self._refresh_status(reason or "Bot durduruldu.")
+        else:
+            self._refresh_status(reason or f"{len(self.symbols)} sembol izleniyor.")
 
     async def _handle_market_message(self, message: str):
-        """Gelen mum verilerini işler."""
-        data = json.loads(message)
-        if data.get('k', {}).get('x', False):
-            kline_data = data['k']
-            print(f"Yeni mum kapandı: {self.status['symbol']} ({settings.TIMEFRAME}) - Kapanış: {kline_data['c']}")
-            self.klines.pop(0); self.klines.append([kline_data[key] for key in ['t','o','h','l','c','v','T','q','n','V','Q']] + ['0'])
-            if not self.status["in_position"]:
-                signal = trading_strategy.analyze_klines(self.klines)
-                self.status["last_signal"] = signal; print(f"Strateji analizi sonucu: {signal}")
-                if signal in ["LONG", "SHORT"]: await self._execute_trade(signal)
+        """Combined-stream üzerinden gelen piyasa verilerini fiyat önbelleğine ve ilgili sembole yönlendirir."""
+        received = time.perf_counter()
+        data = json_loads(message).get('data') or {}
+        event = data.get('e')
+        if event == 'bookTicker': price_cache.update(data['s'], (float(data['b']) + float(data['a'])) / 2, "bookTicker"); return
+        if event == 'markPriceUpdate':
+            price = float(data['p']); price_cache.update(data['s'], price, "markPrice"); self.trailing_stops.on_price(data['s'], price); return
+        if event == 'aggTrade':
+            price = float(data['p']); price_cache.update(data['s'], price, "aggTrade"); self.trailing_stops.on_price(data['s'], price); return
+        kline_data = data.get('k')
+        if not kline_data: return
+        # Kapanmamış mumlar da son fiyatı taşır
+        price_cache.update(kline_data['s'], float(kline_data['c']), "kline")
+        if not kline_data.get('x', False): return
+        state = self.symbols.get(kline_data['s'])
+        if state is None: return
+        lag = time.time() * 1000 - data.get('E', 0)
+        self.stream_metrics["last_kline_lag_ms"] = lag; self.stream_metrics["max_kline_lag_ms"] = max(self.stream_metrics["max_kline_lag_ms"], lag)
+        self._route_close(state, kline_data, received)
+
+    def _route_close(self, state: SymbolState, kline_data: dict, received: float):
+        """
+        Bağlantı kopukken kapanan mumlar sinyal değerlendirilmeden önce REST'ten tamamlanır. Tamamlama
+        sembolün kendi görevinde çalışır; diğer sembollerin mesajları beklemez, bu sembolün sonraki
+        kapanışları ise tamamlama bitene kadar sırayla bekletilir.
+        """
+        if state.backfill_task is not None:
+            state.held_closes.append((kline_data, received)); return
+        if int(kline_data['t']) > state.klines.last_open_time + interval_to_milliseconds(settings.TIMEFRAME):
+            state.held_closes.append((kline_data, received))
+            state.backfill_task = asyncio.create_task(self._backfill(state, int(kline_data['t'])))
+            return
+        self._apply_close(state, kline_data, received)
+
+    def _apply_close(self, state: SymbolState, kline_data: dict, received: float):
+        # Aynı mumun tekrar gelmesi göstergeleri iki kez güncellememeli
+        if not state.klines.append_event(kline_data): return
+        print(f"Yeni mum kapandı: {state.symbol} ({settings.TIMEFRAME}) - Kapanış: {kline_data['c']}")
+        self.status_hub.publish("candle", symbol=state.symbol, open_time=kline_data['t'], close=float(kline_data['c']))
+        # Göstergeler pozisyondayken de güncel kalmalı; sinyal yalnızca pozisyon yokken değerlendirilir.
+        # Değerlendirme yürütücüde; aynı sınırda kapanan diğer semboller bu sembolün emrini beklemez
+        evaluate = not state.status["in_position"] and (state.trade_task is None or state.trade_task.done())
+        self.strategy_executor.submit(state, int(kline_data['t']), int(kline_data['T']), received, evaluate)
+
+    @staticmethod
+    def _trailing_stream(state: SymbolState) -> str:
+        return f"{state.symbol.lower()}@{settings.TRAILING_STREAM}"
+
+    async def _start_trailing(self, state: SymbolState, side: str, entry_price: float):
+        """Açılan pozisyonu iz süren stop motoruna ekler ve fiyat akışına abone olur."""
+        self.trailing_stops.open(state.symbol, side, entry_price)
+        await self.market_streams.subscribe([self._trailing_stream(state)])
+
+    async def _stop_trailing(self, state: SymbolState):
+        self.trailing_stops.close(state.symbol)
+        # Sembolün kalıcı akışlarından biriyse (PRICE_STREAM) abonelik korunur
+        if self._trailing_stream(state) not in state.streams: await self.market_streams.unsubscribe([self._trailing_stream(state)])
+
+    def _on_trailing_stop(self, symbol: str, price: float, position):
+        state = self.symbols.get(symbol)
+        if state is None or not state.status["in_position"]: return
+        print(f"--> İZ SÜREN STOP tetiklendi: {symbol} fiyat {price}, stop {position.stop_price:.6f} (uç {position.side * position.extreme:.6f})")
+        state.trade_task = asyncio.create_task(self._close_by_trailing_stop(state, price, position))
+
+    async def _close_by_trailing_stop(self, state: SymbolState, trigger_price: float, position=None):
+        """Pozisyonu piyasa emriyle kapatır, kalan TP/SL emirlerini iptal eder ve işlemi kaydeder."""
+        try:
+            response = await binance_client.close_open_position(state.symbol)
+        except Exception as e:
+            # Pozisyon açık ve TP/SL yerinde; iz süren stop aynı seviyeyle geri alınır, sonraki delinmede yeniden denenir
+            if position is not None and self.symbols.get(state.symbol) is state: self.trailing_stops.restore(position)
+            state.status["status_message"] = f"{state.symbol} için iz süren stop kapatması başarısız: {e}"; self.status_hub.notify(); return
+        await self._stop_trailing(state)
+        if not response:
+            # Pozisyon zaten kapanmış (TP/SL dolumu); durum kullanıcı akışından güncellenir
+            return
+        # Dolum olayı yanıttan önce geldiyse fiyat ve K/Z hesap durumundan, gelmediyse yanıttan tahmin edilir
+        order = account_state.order(response.get('orderId', 0))
+        if order and order["filled_qty"]:
+            exit_price, pnl, commission = account_state.exit_price(order), order["realized_pnl"], order["commission"]
+        else:
+            exit_price = float(response.get('avgPrice') or 0) or trigger_price
+            quantity = float(response.get('executedQty') or response.get('origQty') or 0)
+            direction = 1 if state.status.get("position_side") == "LONG" else -1
+            pnl, commission = direction * (exit_price - float(state.status.get("entry_price") or 0)) * quantity, 0.0
+        trade_log = {
+            "symbol": state.symbol, "side": state.status.get("position_side"),
+            "entry_price": state.status.get("entry_price"), "exit_price": exit_price,
+            "status": "CLOSED_BY_TRAILING_STOP", "pnl": pnl, "commission": commission, "timestamp": datetime.now(timezone.utc)
+        }
+        trade_journal.log_trade(trade_log)
+        state.status.update({"in_position": False, "status_message": f"{state.symbol} için sinyal bekleniyor..."})
+        self.status_hub.publish("pnl", **trade_log)
+
+    def _on_signal(self, state: SymbolState, signal: str, received: float):
+        """Yürütücüden gelen sonucu kaydeder; LONG/SHORT ise işlemi ayrı bir görevde başlatır."""
+        if self.symbols.get(state.symbol) is not state or state.status["in_position"]: return
+        state.status["last_signal"] = signal; print(f"Strateji analizi sonucu ({state.symbol}): {signal}")
+        if signal != "HOLD": self.status_hub.publish("signal", symbol=state.symbol, signal=signal)
+        if signal in ["LONG", "SHORT"]: state.trade_task = asyncio.create_task(self._execute_trade(state, signal, received))
+
+    async def _backfill(self, state: SymbolState, next_open_time: int):
+        """
+        Son kaydedilen mum ile `next_open_time` arasındaki eksik mumları ekler ve göstergeleri günceller (sinyal
+        üretmez), ardından bekletilen kapanışları işler. Tek istek en fazla 1500 mum döndürdüğünden uzun
+        boşluklar eskiden yeniye sayfalanır.
+        """
+        step = interval_to_milliseconds(settings.TIMEFRAME)
+        start = state.klines.last_open_time + step
+        missing, filled = (next_open_time - start) // step, 0
+        self.stream_metrics["gaps"] += 1
+        print(f"{state.symbol} için {missing} eksik mum tespit edildi, REST'ten tamamlanıyor...")
+        try:
+            while start < next_open_time:
+                klines = await binance_client.get_historical_klines(state.symbol, settings.TIMEFRAME, limit=min((next_open_time - start) // step, 1500),
+                                                                    start_time=start, end_time=next_open_time - 1)
+                klines = [k for k in klines if state.klines.last_open_time < int(k[0]) < next_open_time]
+                if not klines: break
+                state.klines.extend(klines)
+                self.strategy_executor.advance(state, len(klines))
+                filled += len(klines); start = int(klines[-1][0]) + step
+        except Exception as e:
+            print(f"Hata: {state.symbol} için eksik mumlar alınamadı: {e}")
+        self.stream_metrics["backfilled_candles"] += filled
+        if filled < missing:
+            self.stream_metrics["unfilled_candles"] += missing - filled
+            print(f"UYARI: {state.symbol} için {missing - filled} mum tamamlanamadı.")
+        state.backfill_task = None
+        held, state.held_closes = state.held_closes, []
+        if self.symbols.get(state.symbol) is not state: return  # Tamamlama sırasında durduruldu
+        # Boşluğu tetikleyen kapanış tamamlanamasa da eklenir; sonrakilerde yeni bir boşluk yeni bir tamamlama başlatır
+        self._apply_close(state, *held[0])
+        for kline_data, received in held[1:]: self._route_close(state, kline_data, received)
+
+    def stream_health(self) -> dict:
+        """Piyasa/kullanıcı akışlarının bağlantı ve gecikme ölçümleri."""
+        return {"market": self.market_streams.health(), "user": binance_client.user_stream_health.snapshot()} | self.stream_metrics
 
     async def _handle_user_message(self, message: dict):
         """Gelen emir güncelleme verilerini işler."""
+        # Hesap durumu (pozisyon, bakiye, dolum fiyatı, K/Z) tüm semboller için akıştan tutulur
+        account_state.apply(message)
+        # Dolum bekleyen giriş emirleri varsa önce onlara bildir
+        order_pipeline.on_order_update(message)
         if message.get('e') == 'ORDER_TRADE_UPDATE':
             order_data = message.get('o', {})
             symbol = order_data.get('s')
             order_status = order_data.get('X')
             order_type = order_data.get('o')
-            
-            # Sadece bizim ilgilendiğimiz coinin emirleriyle ilgilen
-            if symbol == self.status['symbol'] and self.status["in_position"]:
+
+            # Sadece bizim izlediğimiz ve pozisyonda olan coinlerin emirleriyle ilgilen
+            state = self.symbols.get(symbol)
+            if state and state.status["in_position"]:
                 # Eğer TP veya SL emirlerinden biri tamamen dolduysa
                 if order_status == 'FILLED' and order_type in ['TAKE_PROFIT_MARKET', 'STOP_MARKET']:
                     print(f"--> GERÇEK ZAMANLI TESPİT: {symbol} için {order_type} emri doldu!")
                     # GÜVENLİK: Diğer tüm "yetim" emirleri anında iptal et
                     await binance_client.cancel_all_symbol_orders(symbol)
-                    
-                    # İşlemi logla ve durumu sıfırla
-                    closed_pnl = float(order_data.get('rp', 0.0))
+                    await self._stop_trailing(state)
+
+                    # İşlemi logla ve durumu sıfırla. `p` piyasa tipi emirlerde 0'dır; çıkış fiyatı ortalama dolum
+                    # fiyatından, K/Z emrin tüm kısmi dolumlarının toplamından alınır.
+                    order = account_state.order(order_data.get('i', 0)) or {}
+                    exit_price = account_state.exit_price(order) if order else float(order_data.get('ap') or order_data.get('L') or 0)
                     trade_log = {
-                        "symbol": symbol, "side": self.status.get("position_side"),
-                        "entry_price": self.status.get("entry_price"), "exit_price": float(order_data.get('p')),
-                        "status": f"CLOSED_BY_{order_type}", "pnl": closed_pnl, "timestamp": datetime.now(timezone.utc)
+                        "symbol": symbol, "side": state.status.get("position_side"),
+                        "entry_price": state.status.get("entry_price"), "exit_price": exit_price,
+                        "status": f"CLOSED_BY_{order_type}", "pnl": order.get("realized_pnl", float(order_data.get('rp', 0.0))),
+                        "commission": order.get("commission", 0.0), "timestamp": datetime.now(timezone.utc)
                     }
-                    firebase_manager.log_trade(trade_log)
-                    self.status.update({"in_position": False, "status_message": f"{symbol} için sinyal bekleniyor..."})
-
-    # ... (_format_quantity ve _execute_trade aynı) ...
-    def _format_quantity(self, quantity: float):
-        if self.quantity_precision == 0: return math.floor(quantity)
-        factor = 10 ** self.quantity_precision; return math.floor(quantity * factor) / factor
-    async def _execute_trade(self, signal: str):
-        symbol = self.status["symbol"]; side = "BUY" if signal == "LONG" else "SELL"
-        self.status["status_message"] = f"{signal} sinyali alındı..."; print(self.status["status_message"])
-        price = await binance_client.get_market_price(symbol)
-        if not price: self.status["status_message"] = "İşlem için fiyat alınamadı."; return
-        quantity = self._format_quantity((settings.ORDER_SIZE_USDT * settings.LEVERAGE) / price)
+                    trade_journal.log_trade(trade_log)  # Uzak yazma arka planda, olay döngüsü bloklanmaz
+                    state.status.update({"in_position": False, "status_message": f"{symbol} için sinyal bekleniyor..."})
+                    self.status_hub.publish("pnl", **trade_log)
+
+    def _format_quantity(self, state: SymbolState, quantity: float) -> Decimal:
+        return state.meta.round_quantity(quantity)
+    async def _execute_trade(self, state: SymbolState, signal: str, signal_time: float | None = None):
+        # Gecikmeler mum mesajının alındığı andan itibaren ölçülür
+        signal_time = signal_time or time.perf_counter()
+        symbol = state.symbol; side = "BUY" if signal == "LONG" else "SELL"
+        state.status["status_message"] = f"{signal} sinyali alındı..."; print(f"{symbol}: {state.status['status_message']}")
+        # Akıştan gelen fiyat tazeyse REST gidiş-dönüşü yapılmaz
+        price = await price_cache.get_or_fetch(symbol, binance_client.get_market_price)
+        if not price: state.status["status_message"] = "İşlem için fiyat alınamadı."; return
+        quantity = self._format_quantity(state, (settings.ORDER_SIZE_USDT * settings.LEVERAGE) / price)
         print(f"Hesaplanan Miktar: {quantity} {symbol.replace('USDT','')}")
-        if quantity <= 0: print("Hesaplanan miktar çok düşük, emir gönderilemiyor."); return
-        order = await binance_client.create_market_order_with_tp_sl(symbol, side, quantity, price, self.price_precision)
-        if order:
-            self.status.update({"in_position": True, "status_message": f"{signal} pozisyonu {price} fiyattan açıldı.", "entry_price": price, "position_side": signal})
+        if not state.meta.is_valid_order(quantity, price): print("Hesaplanan miktar çok düşük, emir gönderilemiyor."); return
+        result = await binance_client.create_market_order_with_tp_sl(symbol, side, str(quantity), price, state.meta, signal_time)
+        if result:
+            fill_price = result["fill_price"]
+            state.status.update({"in_position": True, "status_message": f"{signal} pozisyonu {fill_price} fiyattan açıldı.", "entry_price": fill_price, "position_side": signal})
+            await self._start_trailing(state, signal, fill_price)
+            self.status_hub.publish("fill", symbol=symbol, side=side, price=fill_price, quantity=result["quantity"],
+                                    tp_price=result["tp_price"], sl_price=result["sl_price"])
         else:
-            self.status.update({"status_message": "Emir gönderilemedi.", "in_position": False})
-        print(self.status["status_message"])
+            state.status.update({"status_message": "Emir gönderilemedi.", "in_position": False})
+        self.status_hub.notify()
+        print(f"{symbol}: {state.status['status_message']}")
 
 bot_core = BotCore()
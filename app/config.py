@@ -14,9 +14,57 @@ class Settings:
     LEVERAGE: int = 5
     ORDER_SIZE_USDT: float = 100.0
     TIMEFRAME: str = "5m"
+    KLINE_HISTORY_LIMIT: int = 50
+    # Binance USDT-M tek bir bağlantıda en fazla 200 akışa izin verir
+    MAX_STREAMS_PER_CONNECTION: int = 200
+    # Binance bağlantı başına saniyede en fazla 10 gelen mesaja (ping/pong dahil) izin verir;
+    # SUBSCRIBE/UNSUBSCRIBE mesajları bunun altında kalacak hızda gönderilir
+    STREAM_CONTROL_MESSAGES_PER_SECOND: float = 4.0
+    # Websocket yeniden bağlanma: jitter'lı üstel bekleme taban ve tavan süreleri
+    RECONNECT_BASE_SECONDS: float = 1.0
+    RECONNECT_MAX_SECONDS: float = 60.0
+    # Kline akışı fiyat önbelleğini zaten ~250ms'de bir günceller; daha sık fiyat için
+    # "bookTicker" ya da "markPrice@1s" eklenebilir (None: ek akış yok)
+    PRICE_STREAM: str | None = os.getenv("PRICE_STREAM") or None
+    PRICE_CACHE_MAX_AGE_SECONDS: float = 2.0
+    # REST hız sınırı: Binance dakikalık IP ağırlığı ve emir sayısı sınırları, bunların kullanılacak oranı
+    # ve emir/iptallere ayrılan pay (meta veri istekleri ağırlık bütçesinin bu kadarını boş bırakır)
+    REST_WEIGHT_LIMIT_1M: int = 2400
+    ORDER_LIMIT_10S: int = 300
+    ORDER_LIMIT_1M: int = 1200
+    REST_WEIGHT_SAFETY: float = 0.9
+    REST_ORDER_RESERVE: float = 0.2
+    # Vadeli işlem sembol kuralları (exchangeInfo) disk önbelleği ve yenileme süresi
+    EXCHANGE_INFO_CACHE_PATH: str = os.getenv("EXCHANGE_INFO_CACHE_PATH", ".cache/exchange_info.json")
+    EXCHANGE_INFO_TTL_SECONDS: float = 6 * 60 * 60
+    # Doğrulanmış ID token önbelleği: kayıt sayısı ve token `exp` süresinden bağımsız üst sınır
+    TOKEN_CACHE_SIZE: int = 256
+    TOKEN_CACHE_MAX_TTL_SECONDS: float = 300.0
+    # Pano push kanalı: olay birleştirme aralığı, olay yokken durum farkı kontrolü,
+    # istemci başına bekleyen mesaj sınırı ve yavaş istemcinin koparılacağı gönderim süresi
+    STATUS_PUSH_INTERVAL_SECONDS: float = 0.25
+    STATUS_PUSH_IDLE_SECONDS: float = 5.0
+    STATUS_PUSH_QUEUE_SIZE: int = 64
+    STATUS_PUSH_SEND_TIMEOUT_SECONDS: float = 5.0
+    # Uzak depoya henüz yazılmamış işlem kayıtlarının yerel günlüğü (write-ahead log)
+    TRADE_JOURNAL_WAL_PATH: str = os.getenv("TRADE_JOURNAL_WAL_PATH", ".cache/trade_journal.jsonl")
+    # Kullanıcı akışından tutulan hesap durumunun REST ile uzlaştırılma aralığı (sn)
+    ACCOUNT_RECONCILE_SECONDS: float = 300.0
+    # Strateji değerlendirmesi: "inline" (olay döngüsü), "thread" ya da "process" (paylaşımlı bellekli süreç havuzu)
+    STRATEGY_EXECUTOR: str = os.getenv("STRATEGY_EXECUTOR", "inline")
+    STRATEGY_WORKERS: int | None = int(os.getenv("STRATEGY_WORKERS", "0")) or None
+    # Süreç havuzunda göstergeler her mumda pencereden baştan hesaplanır; pencere en uzun gösterge periyodunun
+    # bu katı kadar tutulur ki başlangıç değerinin etkisi sönsün (20x periyotta EMA ve Wilder RSI/ATR için <1e-8)
+    PROCESS_WARMUP_FACTOR: int = 20
+    # Kapanan mumlar göstergelere toplu işlenmeden önce en fazla bu kadar biriktirilir (0: olay döngüsünün bir sonraki turu)
+    STRATEGY_BATCH_WINDOW_SECONDS: float = 0.0
     TAKE_PROFIT_PERCENT: float = 0.003
     STOP_LOSS_PERCENT: float = 0.005
+    # Giriş emri yanıtı dolumu içermezse kullanıcı akışındaki dolum olayı için beklenecek süre
+    ORDER_FILL_TIMEOUT_SECONDS: float = 2.0
     TRAILING_ACTIVATION_PERCENT: float = 0.0015
     TRAILING_DISTANCE_PERCENT: float = 0.001
+    # Açık pozisyonların iz süren stop'u için fiyat akışı ("markPrice@1s" ya da daha sık "aggTrade")
+    TRAILING_STREAM: str = os.getenv("TRAILING_STREAM", "markPrice@1s")
 
 settings = Settings()
@@ -25,18 +25,22 @@ class FirebaseManager:
             self.db_ref = None
             print(f"Firebase başlatılırken hata oluştu: {e}")
 
-    def log_trade(self, trade_data: dict):
-        """Bir işlemi Realtime Database'e kaydeder."""
+    @property
+    def configured(self) -> bool:
+        """Realtime Database bağlantısı kurulduysa True; `trade_journal` yazıcıyı buna göre başlatır."""
+        return self.db_ref is not None
+
+    def write_trades(self, records: dict[str, dict]):
+        """
+        Bir grup işlemi tek bir çok yollu `update` çağrısıyla Realtime Database'e yazar.
+        Bloklayan bir çağrıdır; `trade_journal` tarafından iş parçacığı havuzunda çalıştırılır.
+        Hata durumunda istisna yükseltilir ki kayıtlar günlükte kalıp yeniden denensin.
+        """
         if not self.db_ref:
-            print("Veritabanı bağlantısı yok, işlem kaydedilemedi.")
-            return
-        try:
-            # Zaman damgasını string'e çevirerek uyumluluk sağla
-            trade_data['timestamp'] = trade_data.get('timestamp').isoformat()
-            self.db_ref.push(trade_data) # Yeni bir kayıt eklemek için push() kullanılır
-            print(f"--> İşlem başarıyla Firebase Realtime DB'e kaydedildi.")
-        except Exception as e:
-            print(f"Firebase'e işlem kaydedilirken hata oluştu: {e}")
+            # Sessizce dönmek günlüğün kayıtları yazılmış sayıp silmesine yol açardı
+            raise ConnectionError(f"Veritabanı bağlantısı yok, {len(records)} işlem kaydedilemedi.")
+        self.db_ref.update(records)  # trades/<anahtar> yollarına tek istekte yazar
+        print(f"--> {len(records)} işlem başarıyla Firebase Realtime DB'e kaydedildi.")
 
     def verify_token(self, token: str):
         """Gelen ID Token'ını doğrular ve kullanıcı bilgilerini döndürür."""
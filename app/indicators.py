@@ -0,0 +1,347 @@
+"""
+Stratejilerin paylaştığı gösterge katmanı.
+
+Her gösterge akışlıdır: her kapanan mumda bir `step` çağrısıyla güncellenir ve durumunu
+(semboller x ...) biçimindeki NumPy dizilerinde tutar. `step` aynı anda birden çok sembol
+satırı üzerinde vektörel çalışır; aynı sınırda kapanan tüm semboller tek çağrıda güncellenir.
+Kayan pencereli göstergeler (Bollinger, VWAP) son `period` değeri (semboller x zaman) bir
+halka tamponda tutar.
+
+`IndicatorEngine` göstergeleri anahtarlarına (ad + parametreler) göre bir kez kaydeder; farklı
+semboller ya da stratejiler aynı göstergeyi isterse aynı durum paylaşılır ve mum başına bir
+kez hesaplanır.
+"""
+import threading
+from abc import ABC, abstractmethod
+import numpy as np
+
+# Göstergelerin okuduğu mum alanları
+BAR_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def positive_int(value, name: str = "period") -> int:
+    """Periyot parametresini doğrular; 0, negatif, ondalıklı ya da bool değerler ValueError yükseltir."""
+    if isinstance(value, bool) or not isinstance(value, (int, np.integer)) or value < 1:
+        raise ValueError(f"{name} pozitif bir tam sayı olmalı: {value!r}")
+    return int(value)
+
+
+def positive_float(value, name: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float, np.number)) or not np.isfinite(value) or value <= 0:
+        raise ValueError(f"{name} pozitif bir sayı olmalı: {value!r}")
+    return float(value)
+
+
+class Indicator(ABC):
+    """Gösterge arayüzü. `step` sayımı (`count`) bu adımdan önceki mum sayısıdır."""
+    name = ""
+    outputs: tuple[str, ...] = ("value",)
+
+    def __init__(self, *params):
+        self.params = params
+
+    @property
+    def key(self) -> tuple:
+        return (self.name,) + self.params
+
+    def __repr__(self) -> str:
+        return f"{self.name}({', '.join(map(str, self.params))})"
+
+    def init_state(self, n: int) -> dict[str, np.ndarray]:
+        return {}
+
+    @abstractmethod
+    def step(self, state: dict, rows: np.ndarray, bar: dict, count: np.ndarray) -> np.ndarray:
+        """`rows` satırları için yeni değerleri (len(rows), len(outputs)) döndürür; hazır değilse NaN."""
+
+
+class EMA(Indicator):
+    """Üssel hareketli ortalama; pandas `ewm(span=period, adjust=False)` ile bit düzeyinde aynı."""
+    name = "ema"
+
+    def __init__(self, period: int):
+        period = positive_int(period)
+        super().__init__(period)
+        self.period, self.alpha = period, 2.0 / (period + 1)
+
+    def init_state(self, n):
+        return {"value": np.zeros(n)}
+
+    def step(self, state, rows, bar, count):
+        value, price = state["value"][rows], bar["close"]
+        # pandas ile aynı sıralama: (1 - alpha) * eski + alpha * yeni; fiyat değişmediyse değer korunur
+        value = np.where(count == 0, price, np.where(value != price, (1.0 - self.alpha) * value + self.alpha * price, value))
+        state["value"][rows] = value
+        return value[:, None]
+
+
+class RSI(Indicator):
+    """Wilder RSI: ilk `period` değişimin basit ortalaması, ardından Wilder yumuşatması."""
+    name = "rsi"
+
+    def __init__(self, period: int = 14):
+        period = positive_int(period)
+        super().__init__(period)
+        self.period = period
+
+    def init_state(self, n):
+        return {"prev_close": np.zeros(n), "avg_gain": np.zeros(n), "avg_loss": np.zeros(n)}
+
+    def step(self, state, rows, bar, count):
+        price, period = bar["close"], self.period
+        delta = price - state["prev_close"][rows]
+        gain, loss = np.maximum(delta, 0.0), np.maximum(-delta, 0.0)
+        conditions = [count == 0, count < period, count == period]
+        avg_gain = np.select(conditions, [0.0, state["avg_gain"][rows] + gain, (state["avg_gain"][rows] + gain) / period],
+                             (state["avg_gain"][rows] * (period - 1) + gain) / period)
+        avg_loss = np.select(conditions, [0.0, state["avg_loss"][rows] + loss, (state["avg_loss"][rows] + loss) / period],
+                             (state["avg_loss"][rows] * (period - 1) + loss) / period)
+        state["prev_close"][rows], state["avg_gain"][rows], state["avg_loss"][rows] = price, avg_gain, avg_loss
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(avg_loss == 0.0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+        return np.where(count >= period, rsi, np.nan)[:, None]
+
+
+class ATR(Indicator):
+    """Wilder ATR: ilk `period` gerçek aralığın ortalaması, ardından Wilder yumuşatması."""
+    name = "atr"
+
+    def __init__(self, period: int = 14):
+        period = positive_int(period)
+        super().__init__(period)
+        self.period = period
+
+    def init_state(self, n):
+        return {"prev_close": np.zeros(n), "atr": np.zeros(n)}
+
+    def step(self, state, rows, bar, count):
+        high, low, period = bar["high"], bar["low"], self.period
+        prev_close = state["prev_close"][rows]
+        true_range = np.where(count == 0, high - low,
+                              np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close))))
+        atr = state["atr"][rows]
+        atr = np.select([count == 0, count < period - 1, count == period - 1],
+                        [true_range, atr + true_range, (atr + true_range) / period], (atr * (period - 1) + true_range) / period)
+        state["prev_close"][rows], state["atr"][rows] = bar["close"], atr
+        return np.where(count >= period - 1, atr, np.nan)[:, None]
+
+
+class Bollinger(Indicator):
+    """Bollinger bantları: son `period` kapanışın ortalaması ± `width` standart sapma (ddof=0)."""
+    name = "bollinger"
+    outputs = ("middle", "upper", "lower")
+
+    def __init__(self, period: int = 20, width: float = 2.0):
+        period, width = positive_int(period), positive_float(width, "width")
+        super().__init__(period, width)
+        self.period, self.width = period, width
+
+    def init_state(self, n):
+        return {"window": np.zeros((n, self.period))}
+
+    def step(self, state, rows, bar, count):
+        window = state["window"]
+        window[rows, count % self.period] = bar["close"]
+        values = window[rows]
+        middle, deviation = values.mean(axis=1), values.std(axis=1)
+        out = np.stack([middle, middle + self.width * deviation, middle - self.width * deviation], axis=1)
+        out[count + 1 < self.period] = np.nan
+        return out
+
+
+class VWAP(Indicator):
+    """Kayan hacim ağırlıklı ortalama fiyat: son `period` mumun tipik fiyatı ((H+L+C)/3) hacimle ağırlıklı."""
+    name = "vwap"
+
+    def __init__(self, period: int = 20):
+        period = positive_int(period)
+        super().__init__(period)
+        self.period = period
+
+    def init_state(self, n):
+        return {"price_volume": np.zeros((n, self.period)), "volume": np.zeros((n, self.period))}
+
+    def step(self, state, rows, bar, count):
+        typical = (bar["high"] + bar["low"] + bar["close"]) / 3.0
+        slot = count % self.period
+        state["price_volume"][rows, slot], state["volume"][rows, slot] = typical * bar["volume"], bar["volume"]
+        volume = state["volume"][rows].sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vwap = np.where(volume > 0, state["price_volume"][rows].sum(axis=1) / volume, typical)
+        return np.where(count + 1 >= self.period, vwap, np.nan)[:, None]
+
+
+class _Slot:
+    """Bir göstergenin tüm semboller için durumu, son/önceki değerleri ve mum sayısı."""
+    __slots__ = ("indicator", "state", "value", "prev", "count", "active")
+
+    def __init__(self, indicator: Indicator, capacity: int):
+        self.indicator = indicator
+        self.state = indicator.init_state(capacity)
+        width = len(indicator.outputs)
+        self.value, self.prev = np.full((capacity, width), np.nan), np.full((capacity, width), np.nan)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        # Satır başına bu göstergeyi isteyen strateji sayısı
+        self.active = np.zeros(capacity, dtype=np.int32)
+
+    def grow(self, capacity: int):
+        old = len(self.count)
+        fresh = self.indicator.init_state(capacity)
+        for name, array in self.state.items(): fresh[name][:old] = array
+        self.state = fresh
+        for name in ("value", "prev"):
+            array = np.full((capacity, getattr(self, name).shape[1]), np.nan); array[:old] = getattr(self, name)
+            setattr(self, name, array)
+        self.count = np.concatenate([self.count, np.zeros(capacity - old, dtype=np.int64)])
+        self.active = np.concatenate([self.active, np.zeros(capacity - old, dtype=np.int32)])
+
+    def reset(self, row: int):
+        for name, array in self.indicator.init_state(1).items(): self.state[name][row] = array[0]
+        self.value[row] = self.prev[row] = np.nan
+        self.count[row] = 0
+
+    def step(self, rows: np.ndarray, bar: dict):
+        count = self.count[rows]
+        out = self.indicator.step(self.state, rows, bar, count)
+        self.prev[rows] = self.value[rows]
+        self.value[rows] = out
+        self.count[rows] = count + 1
+
+
+class IndicatorView:
+    """Tek bir sembolün gösterge değerlerine erişim (tek çıktılı göstergelerde skaler)."""
+    __slots__ = ("engine", "row")
+
+    def __init__(self, engine: "IndicatorEngine", row: int):
+        self.engine, self.row = engine, row
+
+    def _read(self, indicator: Indicator, values: str):
+        array = getattr(self.engine._slots[indicator.key], values)[self.row]
+        return float(array[0]) if len(array) == 1 else tuple(float(v) for v in array)
+
+    def __getitem__(self, indicator: Indicator):
+        return self._read(indicator, "value")
+
+    def prev(self, indicator: Indicator):
+        return self._read(indicator, "prev")
+
+    def count(self, indicator: Indicator) -> int:
+        return int(self.engine._slots[indicator.key].count[self.row])
+
+    @property
+    def close(self) -> float:
+        return float(self.engine._close[self.row, 1])
+
+    @property
+    def prev_close(self) -> float:
+        return float(self.engine._close[self.row, 0])
+
+
+class IndicatorEngine:
+    """
+    Sembol satırları x göstergeler. Semboller `add_symbol` ile geçmiş mumlarından beslenir,
+    `update` ile aynı sınırda kapanan sembollerin tüm göstergeleri vektörel güncellenir.
+    İş parçacığı havuzundan da çağrılabilmesi için değişiklikler bir kilitle korunur.
+    """
+    def __init__(self, capacity: int = 64):
+        self._capacity = capacity
+        self._rows: dict[str, int] = {}
+        self._free: list[int] = []
+        self._slots: dict[tuple, _Slot] = {}
+        self._symbol_keys: dict[str, list[tuple]] = {}
+        # Satır başına [önceki, son] kapanış
+        self._close = np.full((capacity, 2), np.nan)
+        self.lock = threading.Lock()
+        self.metrics = {"updates": 0, "indicator_steps": 0, "rows_stepped": 0}
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._rows
+
+    @property
+    def indicator_keys(self) -> list[tuple]:
+        return [key for key, slot in self._slots.items() if slot.active.any()]
+
+    def _allocate(self) -> int:
+        if self._free: return self._free.pop()
+        row = len(self._rows) + len(self._free)
+        if row >= self._capacity:
+            self._capacity *= 2
+            for slot in self._slots.values(): slot.grow(self._capacity)
+            close = np.full((self._capacity, 2), np.nan); close[:row] = self._close; self._close = close
+        return row
+
+    def add_symbol(self, symbol: str, indicators: list[Indicator], klines=None):
+        """Sembol için göstergeleri kaydeder ve varsa `klines` (KlineStore) geçmişiyle besler."""
+        with self.lock:
+            if symbol in self._rows: self._remove(symbol)
+            row = self._rows[symbol] = self._allocate()
+            keys = []
+            for indicator in indicators:
+                slot = self._slots.get(indicator.key)
+                if slot is None: slot = self._slots[indicator.key] = _Slot(indicator, self._capacity)
+                if indicator.key not in keys:
+                    keys.append(indicator.key); slot.active[row] += 1; slot.reset(row)
+            self._symbol_keys[symbol] = keys
+            self._close[row] = np.nan
+            if klines is not None and len(klines): self._advance(symbol, klines, len(klines))
+
+    def remove_symbol(self, symbol: str):
+        with self.lock: self._remove(symbol)
+
+    def _remove(self, symbol: str):
+        row = self._rows.pop(symbol, None)
+        if row is None: return
+        for key in self._symbol_keys.pop(symbol, []): self._slots[key].active[row] -= 1
+        self._free.append(row)
+
+    def advance(self, symbol: str, klines, n: int):
+        """`klines` deposunun son `n` mumunu sırayla işler (geçmiş besleme, boşluk tamamlama)."""
+        with self.lock: self._advance(symbol, klines, n)
+
+    def _advance(self, symbol: str, klines, n: int):
+        rows = np.array([self._rows[symbol]])
+        keys = self._symbol_keys[symbol]
+        columns = {name: klines.column(name)[-n:] for name in BAR_FIELDS}
+        for t in range(len(columns["close"])):
+            bar = {name: column[t:t + 1] for name, column in columns.items()}
+            self._step(rows, bar, keys)
+
+    def update(self, items: list[tuple[str, object]]):
+        """
+        Aynı sınırda kapanan (sembol, KlineStore) çiftlerinin son mumlarıyla tüm göstergeleri günceller.
+        Her gösterge yalnızca onu isteyen satırlar için, tek vektörel adımda hesaplanır.
+        """
+        with self.lock:
+            items = [(symbol, klines) for symbol, klines in items if symbol in self._rows]
+            if not items: return
+            rows = np.array([self._rows[symbol] for symbol, _ in items])
+            bar = {name: np.array([klines.column(name)[-1] for _, klines in items]) for name in BAR_FIELDS}
+            self._step(rows, bar, None)
+            self.metrics["updates"] += 1
+
+    def _step(self, rows: np.ndarray, bar: dict, keys: list[tuple] | None):
+        for key in (keys if keys is not None else list(self._slots)):
+            slot = self._slots[key]
+            mask = slot.active[rows] > 0
+            if not mask.any(): continue
+            if mask.all(): slot.step(rows, bar)
+            else: slot.step(rows[mask], {name: values[mask] for name, values in bar.items()})
+            self.metrics["indicator_steps"] += 1; self.metrics["rows_stepped"] += int(mask.sum())
+        self._close[rows, 0] = self._close[rows, 1]
+        self._close[rows, 1] = bar["close"]
+
+    def view(self, symbol: str) -> IndicatorView:
+        return IndicatorView(self, self._rows[symbol])
+
+    @classmethod
+    def from_window(cls, symbols: list[str], columns: dict[str, np.ndarray], indicators: list[Indicator]) -> "IndicatorEngine":
+        """
+        (semboller x zaman) sütunlarından durumsuz hesaplama: göstergeler zaman ekseni boyunca,
+        her adımda tüm semboller için vektörel ilerletilir (süreç havuzu işçileri için).
+        """
+        engine = cls(capacity=max(len(symbols), 1))
+        for symbol in symbols: engine.add_symbol(symbol, indicators)
+        rows = np.arange(len(symbols))
+        for t in range(columns["close"].shape[1]):
+            engine._step(rows, {name: columns[name][:, t] for name in BAR_FIELDS}, None)
+        return engine
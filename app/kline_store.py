@@ -0,0 +1,166 @@
+import weakref
+from multiprocessing import shared_memory
+import numpy as np
+
+# Binance mum dizisindeki sütunlar (son "ignore" alanı saklanmaz)
+KLINE_FIELDS = (
+    ("open_time", np.int64), ("open", np.float64), ("high", np.float64), ("low", np.float64),
+    ("close", np.float64), ("volume", np.float64), ("close_time", np.int64),
+    ("quote_volume", np.float64), ("trades", np.int64),
+    ("taker_buy_base_volume", np.float64), ("taker_buy_quote_volume", np.float64),
+)
+# Websocket 'k' nesnesindeki karşılık gelen anahtarlar
+KLINE_EVENT_KEYS = ('t', 'o', 'h', 'l', 'c', 'v', 'T', 'q', 'n', 'V', 'Q')
+_EVENT_CONVERTERS = tuple((key, float if dtype is np.float64 else int) for key, (_, dtype) in zip(KLINE_EVENT_KEYS, KLINE_FIELDS))
+
+
+class KlineStore:
+    """
+    Sabit kapasiteli, sütun bazlı mum deposu.
+
+    Her alan önceden ayrılmış bir NumPy dizisinde tutulur ve dairesel tampon olarak
+    kullanılır. Her değer hem `i` hem `i + capacity` konumuna yazıldığı için son
+    `len(self)` mum her zaman tek parça bir dilimdir; `close`, `high` gibi özellikler
+    kopyasız ve kronolojik sıralı (salt okunur) görünümler döndürür. Metin değerler
+    yalnızca bir kez, depoya girerken sayıya çevrilir.
+
+    `shared=True` ise sütunlar tek bir `SharedMemory` bloğunda tutulur; başka bir süreç
+    `attach_shared_column` ile aynı belleği kopyasız okuyabilir (süreç havuzlu strateji çalıştırıcısı).
+    """
+    def __init__(self, capacity: int, shared: bool = False):
+        if capacity <= 0: raise ValueError("Kapasite pozitif olmalı.")
+        self.capacity = capacity
+        self._shm = shared_memory.SharedMemory(create=True, size=len(KLINE_FIELDS) * 2 * capacity * 8) if shared else None
+        if self._shm is None:
+            self._columns = {name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in KLINE_FIELDS}
+        else:
+            self._columns = {name: np.ndarray(2 * capacity, dtype=dtype, buffer=self._shm.buf, offset=i * 2 * capacity * 8)
+                             for i, (name, dtype) in enumerate(KLINE_FIELDS)}
+        self._head = 0   # Bir sonraki yazılacak yuva
+        self._size = 0
+
+    @classmethod
+    def from_klines(cls, klines: list, capacity: int | None = None, shared: bool = False) -> "KlineStore":
+        """`get_historical_klines` çıktısından doğrudan bir depo oluşturur."""
+        store = cls(capacity or max(len(klines), 1), shared)
+        store.extend(klines)
+        return store
+
+    def __len__(self) -> int:
+        return self._size
+
+    def extend(self, klines: list):
+        """REST mum listesini toplu olarak ekler (kapasiteyi aşan eski mumlar düşer)."""
+        klines = klines[-self.capacity:]
+        n = len(klines)
+        if n == 0: return
+        slots = (self._head + np.arange(n)) % self.capacity
+        for i, (name, dtype) in enumerate(KLINE_FIELDS):
+            values = np.array([kline[i] for kline in klines], dtype=dtype)
+            column = self._columns[name]
+            column[slots] = values; column[slots + self.capacity] = values
+        self._head = (self._head + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def append(self, values: tuple):
+        """Tek bir mumu `KLINE_FIELDS` sırasındaki değerlerle ekler."""
+        slot = self._head
+        for (name, _), value in zip(KLINE_FIELDS, values):
+            column = self._columns[name]
+            column[slot] = value; column[slot + self.capacity] = value
+        self._head = (slot + 1) % self.capacity
+        if self._size < self.capacity: self._size += 1
+
+    def append_event(self, kline_data: dict) -> bool:
+        """
+        Websocket kline olayını ekler. Daha önce eklenmiş (ya da daha eski) bir mum
+        tekrar gelirse yok sayılır ve False döner.
+        """
+        open_time = int(kline_data['t'])
+        if self._size and open_time <= self.last_open_time: return False
+        self.append(tuple(convert(kline_data[key]) for key, convert in _EVENT_CONVERTERS))
+        return True
+
+    def column(self, name: str) -> np.ndarray:
+        """Bir alanın kronolojik sıralı, kopyasız ve salt okunur görünümü."""
+        end = self._head + self.capacity
+        view = self._columns[name][end - self._size:end]
+        view.flags.writeable = False
+        return view
+
+    def tail(self, n: int = 1) -> "KlineStore":
+        """Son `n` mumun bağımsız (paylaşımsız) kopyası; başka bir iş parçacığına verilecek anlık görüntü."""
+        n = min(n, self._size)
+        store = KlineStore(max(n, 1))
+        if n:
+            for name, column in store._columns.items():
+                values = self.column(name)[-n:]
+                column[:n] = values; column[store.capacity:store.capacity + n] = values
+            store._size = n
+        return store
+
+    @property
+    def shared_ref(self) -> tuple[str, int, int, int] | None:
+        """Başka bir süreçten okumak için (bellek adı, kapasite, baş, boyut); paylaşımlı değilse None."""
+        return (self._shm.name, self.capacity, self._head, self._size) if self._shm else None
+
+    def release(self):
+        """Paylaşımlı belleği serbest bırakır (depo artık kullanılmamalı)."""
+        if self._shm is None: return
+        self._columns = {}
+        self._shm.close(); self._shm.unlink(); self._shm = None
+
+    @property
+    def last_open_time(self) -> int:
+        return int(self._columns["open_time"][self._head + self.capacity - 1]) if self._size else 0
+
+    open_time = property(lambda self: self.column("open_time"))
+    open = property(lambda self: self.column("open"))
+    high = property(lambda self: self.column("high"))
+    low = property(lambda self: self.column("low"))
+    close = property(lambda self: self.column("close"))
+    volume = property(lambda self: self.column("volume"))
+    close_time = property(lambda self: self.column("close_time"))
+    quote_volume = property(lambda self: self.column("quote_volume"))
+    trades = property(lambda self: self.column("trades"))
+    taker_buy_base_volume = property(lambda self: self.column("taker_buy_base_volume"))
+    taker_buy_quote_volume = property(lambda self: self.column("taker_buy_quote_volume"))
+
+
+# Bu süreçte açılmış paylaşımlı bellek bağlantıları (bellek adı -> SharedMemory) ve üzerlerindeki canlı görünümler.
+# NumPy görünümü arabelleği dışa aktarılmış tutmaz (yalnızca mmap nesnesine referans verir); görünüm yaşarken
+# bağlantı kapatılırsa `close` BufferError vermez, sonraki okuma süreci çökertir. Canlılık bu yüzden ayrıca izlenir.
+_segments: dict[str, shared_memory.SharedMemory] = {}
+_views: dict[str, int] = {}
+
+
+def _drop_view(shm_name: str):
+    _views[shm_name] -= 1
+
+
+def attach_shared_column(ref: tuple[str, int, int, int], name: str) -> np.ndarray:
+    """
+    `KlineStore.shared_ref` ile başka bir süreçte oluşturulmuş deponun bir sütununu kopyasız,
+    kronolojik sıralı görünüm olarak döndürür. Bellek bağlantıları süreç içinde önbelleğe alınır;
+    artık kullanılmayanlar `detach_shared` ile kapatılır.
+    """
+    shm_name, capacity, head, size = ref
+    segment = _segments.get(shm_name)
+    if segment is None:
+        segment = _segments[shm_name] = shared_memory.SharedMemory(name=shm_name)
+    index = next(i for i, (field, _) in enumerate(KLINE_FIELDS) if field == name)
+    column = np.ndarray(2 * capacity, dtype=KLINE_FIELDS[index][1], buffer=segment.buf, offset=index * 2 * capacity * 8)
+    # Bu dizinin tüm dilimleri `base` olarak onu tutar; son dilim düşünce sayaç azalır
+    _views[shm_name] = _views.get(shm_name, 0) + 1
+    weakref.finalize(column, _drop_view, shm_name)
+    end = head + capacity
+    return column[end - size:end]
+
+
+def detach_shared(keep) -> int:
+    """`keep` içinde olmayan (silinmiş sembollere ait) bellek bağlantılarını kapatır; kapatılan sayısını döndürür."""
+    closed = 0
+    for shm_name in [name for name in _segments if name not in keep]:
+        if _views.get(shm_name): continue  # Sütun görünümü hâlâ kullanımda; sonraki çağrıda yeniden denenir
+        _segments.pop(shm_name).close(); _views.pop(shm_name, None); closed += 1
+    return closed
@@ -1,58 +1,125 @@
 # app/main.py
 
 import asyncio
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, WebSocket, WebSocketDisconnect
 from fastapi.security import HTTPBearer
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
+from .account_state import account_state
+from .binance_client import binance_client
 from .bot_core import bot_core
 from .config import settings
-from .firebase_manager import firebase_manager # Yeni import
+from .trade_journal import trade_journal
+from .token_cache import token_cache
+from .trading_strategy import DEFAULT_STRATEGY, STRATEGIES
 
 bearer_scheme = HTTPBearer()
 
 async def authenticate(token: str = Depends(bearer_scheme)):
-    """Gelen Firebase ID Token'ını doğrular."""
-    user = firebase_manager.verify_token(token.credentials)
+    """Gelen Firebase ID Token'ını doğrular; önbellekte yoksa doğrulama olay döngüsü dışında yapılır."""
+    user = await token_cache.get_user(token.credentials)
     if not user:
         raise HTTPException(
             status_code=401,
             detail="Geçersiz veya süresi dolmuş güvenlik token'ı.",
         )
-    print(f"Doğrulanan kullanıcı: {user.get('email')}")
     return user
 
 app = FastAPI(title="Binance Futures Bot", version="2.0.0")
 
+@app.on_event("startup")
+async def startup_event():
+    trade_journal.start()  # Önceki çalışmadan kalan gönderilmemiş işlemleri yeniden oynatır
+
 @app.on_event("shutdown")
 async def shutdown_event():
     if bot_core.status["is_running"]:
         await bot_core.stop()
+    await trade_journal.close()
 
 class StartRequest(BaseModel):
     symbol: str
+    strategy: str = DEFAULT_STRATEGY
+    params: dict = {}
+
+class StopRequest(BaseModel):
+    symbol: str | None = None
 
 @app.post("/api/start")
 async def start_bot(request: StartRequest, background_tasks: BackgroundTasks, user: dict = Depends(authenticate)):
-    if bot_core.status["is_running"]:
-        raise HTTPException(status_code=400, detail="Bot zaten çalışıyor.")
     symbol = request.symbol.upper()
-    background_tasks.add_task(bot_core.start, symbol)
+    if symbol in bot_core.symbols:
+        raise HTTPException(status_code=400, detail=f"{symbol} için bot zaten çalışıyor.")
+    if request.strategy not in STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Bilinmeyen strateji: {request.strategy}")
+    try: STRATEGIES[request.strategy](**request.params)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Geçersiz strateji parametreleri: {e}")
+    background_tasks.add_task(bot_core.start, symbol, request.strategy, request.params)
     await asyncio.sleep(1)
     return bot_core.status
 
 @app.post("/api/stop")
-async def stop_bot(user: dict = Depends(authenticate)):
+async def stop_bot(request: StopRequest | None = None, user: dict = Depends(authenticate)):
+    """Gövdede sembol verilirse yalnızca o sembolü, verilmezse tüm sembolleri durdurur."""
+    symbol = request.symbol.upper() if request and request.symbol else None
     if not bot_core.status["is_running"]:
         raise HTTPException(status_code=400, detail="Bot zaten durdurulmuş.")
-    await bot_core.stop()
+    if symbol and symbol not in bot_core.symbols:
+        raise HTTPException(status_code=400, detail=f"{symbol} için çalışan bir bot yok.")
+    await bot_core.stop(symbol)
     return bot_core.status
 
+@app.get("/api/strategies")
+async def list_strategies(user: dict = Depends(authenticate)):
+    """Kayıtlı stratejiler, açıklamaları ve varsayılan parametreleri."""
+    return [{"name": name, "description": cls.description, "params": cls().params} for name, cls in STRATEGIES.items()]
+
 @app.get("/api/status")
 async def get_status(user: dict = Depends(authenticate)):
     return bot_core.status
 
+@app.websocket("/api/ws")
+async def status_socket(websocket: WebSocket):
+    """
+    Pano push kanalı. Tarayıcı WebSocket başlık gönderemediği için ilk mesaj {"token": ...} olmalıdır;
+    token bağlantı başına bir kez doğrulanır. Ardından tam durum ve birleştirilmiş fark/olay mesajları gelir.
+    """
+    await websocket.accept()
+    try:
+        first = await asyncio.wait_for(websocket.receive_json(), timeout=10)
+        user = await token_cache.get_user(str(first.get("token", "")))
+    except (asyncio.TimeoutError, ValueError, AttributeError, WebSocketDisconnect):
+        user = None
+    if not user:
+        await websocket.close(code=4401, reason="Geçersiz veya süresi dolmuş güvenlik token'ı."); return
+    # İstemciden gelen mesajlar kullanılmaz; okuma yalnızca kapanışı fark etmek içindir
+    async def wait_disconnect():
+        while True:
+            if (await websocket.receive())["type"] == "websocket.disconnect": return
+    push = asyncio.create_task(bot_core.status_hub.serve(websocket.send_text))
+    disconnect = asyncio.create_task(wait_disconnect())
+    done, pending = await asyncio.wait({push, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending: task.cancel()
+    for task in done: task.exception()  # Kapanmış sokete yazma hataları beklenen durumdur
+    if push in done and disconnect not in done:
+        # Yavaş istemci koparıldı
+        try: await websocket.close(code=1013, reason="İstemci güncellemelere yetişemiyor.")
+        except RuntimeError: pass
+
+@app.get("/api/account")
+async def get_account(user: dict = Depends(authenticate)):
+    """Kullanıcı akışından güncel tutulan pozisyonlar, bakiyeler, gerçekleşen K/Z ve komisyonlar (REST çağrısı yapılmaz)."""
+    return account_state.snapshot()
+
+@app.get("/api/metrics")
+async def get_metrics(user: dict = Depends(authenticate)):
+    return {"trade_journal": trade_journal.stats(), "streams": bot_core.stream_health(), "strategy": bot_core.strategy_executor.summary(),
+            "trailing_stops": bot_core.trailing_stops.metrics | {"positions": bot_core.trailing_stops.snapshot()},
+            "status_push": bot_core.status_hub.metrics | {"clients": bot_core.status_hub.client_count},
+            "rest": binance_client.scheduler.snapshot()}
+
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 @app.get("/")
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import websockets
+from .config import settings
+from .stream_supervisor import StreamHealth
+
+class StreamGroup:
+    """
+    Tek bir combined-stream (`/stream?streams=a/b/...`) bağlantısı.
+    Bağlantı açıkken yeni akışlar SUBSCRIBE/UNSUBSCRIBE mesajlarıyla eklenip çıkarılır,
+    böylece diğer sembollerin veri akışı kesilmez. Binance saniyede 10'dan fazla gelen mesaj gönderen
+    bağlantıyı kapattığı için değişiklikler biriktirilir ve mesajlar `control_rate` hızını aşmadan,
+    her gönderimde bekleyen tüm akışlar tek mesajda toplanarak yollanır.
+    """
+    def __init__(self, manager: "MarketStreamManager", index: int):
+        self.manager, self.index = manager, index
+        self.streams: set[str] = set()
+        self.ws = None
+        self.task: asyncio.Task | None = None
+        self.health = StreamHealth(f"market-{index}")
+        self._request_id = 0
+        # akış -> bekleyen işlem ("SUBSCRIBE" / "UNSUBSCRIBE"); aynı akış için son işlem geçerlidir
+        self._pending: dict[str, str] = {}
+        self._sender: asyncio.Task | None = None
+        self._next_send = 0.0
+
+    @property
+    def free_slots(self) -> int:
+        return self.manager.max_streams - len(self.streams)
+
+    async def add(self, streams: list[str]):
+        self.streams.update(streams)
+        if self.ws is not None: self._queue("SUBSCRIBE", streams)
+        if self.task is None or self.task.done(): self.task = asyncio.create_task(self.run())
+
+    async def remove(self, streams: list[str]):
+        self.streams.difference_update(streams)
+        if not self.streams:
+            await self.close(); return
+        if self.ws is not None: self._queue("UNSUBSCRIBE", streams)
+
+    def _queue(self, method: str, streams):
+        for stream in streams: self._pending[stream] = method
+        if self._sender is None or self._sender.done(): self._sender = asyncio.create_task(self._send_pending())
+
+    async def _send_pending(self):
+        """Bekleyen değişiklikleri yöntem başına tek mesajda, mesajlar arasında en az 1/`control_rate` sn bırakarak gönderir."""
+        loop = asyncio.get_running_loop()
+        while self._pending and self.ws is not None:
+            wait = self._next_send - loop.time()
+            if wait > 0: await asyncio.sleep(wait)
+            if self.ws is None: break
+            # Önce çıkarmalar: akış sınırı dolu bir bağlantıda yer açar
+            method = "UNSUBSCRIBE" if "UNSUBSCRIBE" in self._pending.values() else "SUBSCRIBE"
+            streams = [stream for stream, pending in self._pending.items() if pending == method]
+            for stream in streams: del self._pending[stream]
+            self._next_send = loop.time() + 1 / self.manager.control_rate
+            await self._send(method, streams)
+
+    async def _send(self, method: str, streams: list[str]):
+        self._request_id += 1
+        try:
+            await self.ws.send(json.dumps({"method": method, "params": list(streams), "id": self._request_id}))
+        except websockets.exceptions.ConnectionClosed:
+            # Yeniden bağlanırken URL güncel akış listesinden kurulacak
+            pass
+
+    async def run(self):
+        """Grup boşalana kadar bağlantıyı açık tutar, koptuğunda jitter'lı üstel beklemeyle yeniden bağlanır."""
+        while self.streams:
+            connected = set(self.streams)
+            ws_url = f"{settings.WEBSOCKET_URL}/stream?streams={'/'.join(sorted(connected))}"
+            error, label = None, "bağlantı sorunu"
+            try:
+                async with websockets.connect(ws_url, ping_interval=30, ping_timeout=15) as ws:
+                    self.ws = ws
+                    self.health.on_connect()
+                    # Bağlanırken eklenen/çıkarılan akışları eşitle (bağlantı URL'si bekleyenleri zaten kapsar)
+                    self._pending.clear()
+                    if connected - self.streams: self._queue("UNSUBSCRIBE", connected - self.streams)
+                    if self.streams - connected: self._queue("SUBSCRIBE", self.streams - connected)
+                    print(f"Piyasa veri akışı kuruldu (grup {self.index}, {len(self.streams)} akış).")
+                    while self.streams:
+                        message = await asyncio.wait_for(ws.recv(), timeout=60.0)
+                        self.health.on_message()
+                        await self.manager.on_message(message)
+            except asyncio.CancelledError:
+                raise
+            except (asyncio.TimeoutError, websockets.exceptions.ConnectionClosed, OSError) as e:
+                error = e
+            except Exception as e:
+                error, label = e, "hatası"
+            finally:
+                self.ws = None
+                self._pending.clear()
+            if not self.streams: break
+            # Kopma sırasında kapanan mumlar, bir sonraki kapanışta açılış zamanı boşluğundan tespit edilip tamamlanır
+            delay = self.health.on_disconnect(repr(error))
+            print(f"Piyasa veri akışı {label} (grup {self.index}): {error!r}. {delay:.1f} sn sonra yeniden bağlanılacak.")
+            await asyncio.sleep(delay)
+
+    async def close(self):
+        self.streams.clear(); self._pending.clear()
+        if self._sender and not self._sender.done(): self._sender.cancel()
+        if self.task and not self.task.done():
+            self.task.cancel()
+            try: await self.task
+            except asyncio.CancelledError: pass
+        self.task, self.ws = None, None
+
+
+class MarketStreamManager:
+    """
+    Tüm sembollerin piyasa akışlarını borsanın bağlantı başına akış sınırına göre
+    combined-stream gruplarına dağıtır. Açık soket ve görev sayısı sembol sayısıyla değil,
+    grup sayısıyla büyür.
+    """
+    def __init__(self, on_message, max_streams: int = settings.MAX_STREAMS_PER_CONNECTION,
+                 control_rate: float = settings.STREAM_CONTROL_MESSAGES_PER_SECOND):
+        self.on_message = on_message
+        self.max_streams, self.control_rate = max_streams, control_rate
+        self.groups: list[StreamGroup] = []
+
+    @property
+    def stream_count(self) -> int:
+        return sum(len(g.streams) for g in self.groups)
+
+    async def subscribe(self, streams: list[str]):
+        pending = [s for s in streams if not any(s in g.streams for g in self.groups)]
+        while pending:
+            group = next((g for g in self.groups if g.free_slots > 0), None)
+            if group is None:
+                group = StreamGroup(self, len(self.groups)); self.groups.append(group)
+            batch, pending = pending[:group.free_slots], pending[group.free_slots:]
+            await group.add(batch)
+
+    async def unsubscribe(self, streams: list[str]):
+        for group in self.groups:
+            owned = [s for s in streams if s in group.streams]
+            if owned: await group.remove(owned)
+        self.groups = [g for g in self.groups if g.streams]
+        for i, group in enumerate(self.groups): group.index = i; group.health.name = f"market-{i}"
+
+    async def close(self):
+        for group in self.groups: await group.close()
+        self.groups = []
+
+    def health(self) -> list[dict]:
+        return [group.health.snapshot() | {"streams": len(group.streams)} for group in self.groups]
@@ -0,0 +1,144 @@
+import asyncio
+import time
+import uuid
+from collections import deque
+from .config import settings
+from .symbol_metadata import SymbolMeta
+
+# Gecikme aşamaları (sinyal anına göre milisaniye)
+LATENCY_STAGES = ("entry_ack", "fill", "protected")
+
+
+def calculate_tp_sl_prices(side: str, entry_price: float) -> tuple[float, float]:
+    """BUY/SELL giriş fiyatından TAKE PROFIT ve STOP LOSS tetik fiyatlarını hesaplar."""
+    if side == 'BUY':
+        return entry_price * (1 + settings.TAKE_PROFIT_PERCENT), entry_price * (1 - settings.STOP_LOSS_PERCENT)
+    return entry_price * (1 - settings.TAKE_PROFIT_PERCENT), entry_price * (1 + settings.STOP_LOSS_PERCENT)
+
+
+async def cancel_all_open_orders(client, symbol: str):
+    """
+    Sembolün normal ve koşullu (TP/SL, algo uç noktası) açık emirlerini iptal eder. python-binance
+    koşullu emirleri ayrı tutar; `conditional=True` olmadan yapılan iptal onlara ulaşmaz. Biri hata
+    verse de diğeri denenir, ilk hata sonra yükseltilir.
+    """
+    results = await asyncio.gather(client.futures_cancel_all_open_orders(symbol=symbol),
+                                   client.futures_cancel_all_open_orders(symbol=symbol, conditional=True),
+                                   return_exceptions=True)
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors: raise errors[0]
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+class OrderPipeline:
+    """
+    Giriş + TP + SL emirlerini pozisyonun korumasız kaldığı süreyi en aza indirerek yerleştirir.
+
+    Piyasa emri `newOrderRespType=RESULT` ile gönderilir; yanıt dolumu zaten içeriyorsa
+    beklenmez, içermiyorsa sabit bir uyku yerine kullanıcı akışındaki ORDER_TRADE_UPDATE
+    dolum olayı beklenir. TP ve SL gerçek dolum fiyatından hesaplanıp eş zamanlı gönderilir.
+    Her işlem için sinyal -> giriş onayı -> dolum -> TP/SL onayı gecikmeleri kaydedilir.
+    """
+    def __init__(self, fill_timeout: float = settings.ORDER_FILL_TIMEOUT_SECONDS, history: int = 500):
+        self.fill_timeout = fill_timeout
+        self._fill_waiters: dict[str, asyncio.Future] = {}
+        self.latencies: deque[dict] = deque(maxlen=history)
+
+    def on_order_update(self, message: dict):
+        """Kullanıcı akışından gelen ORDER_TRADE_UPDATE ile bekleyen giriş emrinin dolumunu bildirir."""
+        if message.get('e') != 'ORDER_TRADE_UPDATE': return
+        order_data = message.get('o', {})
+        waiter = self._fill_waiters.get(order_data.get('c'))
+        if waiter and not waiter.done() and order_data.get('X') == 'FILLED':
+            waiter.set_result((float(order_data.get('ap', 0.0)), float(order_data.get('z', 0.0))))
+
+    async def _wait_for_fill(self, client, symbol: str, client_order_id: str, waiter: asyncio.Future):
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter), timeout=self.fill_timeout)
+        except asyncio.TimeoutError:
+            # Kullanıcı akışı gecikirse emrin durumunu REST ile sorgula
+            order = await client.futures_get_order(symbol=symbol, origClientOrderId=client_order_id)
+            if order.get('status') == 'FILLED': return float(order['avgPrice']), float(order['executedQty'])
+            return None
+
+    async def open_position(self, client, symbol: str, side: str, quantity: str | float, estimated_price: float,
+                            meta: SymbolMeta, signal_time: float | None = None) -> dict | None:
+        """
+        Piyasa emriyle pozisyon açar ve TP/SL emirlerini kurar.
+        Başarılıysa {'order', 'fill_price', 'quantity', 'tp_price', 'sl_price', 'latency'} döner.
+        """
+        def format_price(price): return str(meta.round_price(price))
+        started = signal_time if signal_time is not None else time.perf_counter()
+        marks = {}
+        client_order_id = f"bnc_{uuid.uuid4().hex[:24]}"
+        waiter = asyncio.get_running_loop().create_future()
+        self._fill_waiters[client_order_id] = waiter
+        exit_side = 'SELL' if side == 'BUY' else 'BUY'
+        try:
+            main_order = await client.futures_create_order(symbol=symbol, side=side, type='MARKET', quantity=quantity,
+                                                           newClientOrderId=client_order_id, newOrderRespType='RESULT')
+            marks["entry_ack"] = time.perf_counter()
+            print(f"Başarılı: {symbol} {side} {quantity} PİYASA EMRİ oluşturuldu.")
+
+            fill = None
+            if main_order.get('status') == 'FILLED' and float(main_order.get('avgPrice', 0) or 0) > 0:
+                fill = (float(main_order['avgPrice']), float(main_order['executedQty']))
+            else:
+                fill = await self._wait_for_fill(client, symbol, client_order_id, waiter)
+            marks["fill"] = time.perf_counter()
+            if fill is None:
+                # Dolum doğrulanamadı: tahmini fiyatla koruma kurmak açık pozisyonu korumasız bırakmaktan iyidir
+                print(f"UYARI: {symbol} giriş dolumu doğrulanamadı, tahmini fiyat kullanılıyor.")
+                fill = (estimated_price, float(quantity))
+            fill_price, filled_quantity = fill
+
+            tp_price, sl_price = calculate_tp_sl_prices(side, fill_price)
+            formatted_tp_price, formatted_sl_price = format_price(tp_price), format_price(sl_price)
+            results = await asyncio.gather(
+                client.futures_create_order(symbol=symbol, side=exit_side, type='TAKE_PROFIT_MARKET',
+                                            stopPrice=formatted_tp_price, closePosition=True),
+                client.futures_create_order(symbol=symbol, side=exit_side, type='STOP_MARKET',
+                                            stopPrice=formatted_sl_price, closePosition=True),
+                return_exceptions=True)
+            marks["protected"] = time.perf_counter()
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors: raise errors[0]
+            print(f"Başarılı: {symbol} için TAKE PROFIT {formatted_tp_price} ve STOP LOSS {formatted_sl_price} seviyelerine kuruldu.")
+
+            latency = {stage: (marks[stage] - started) * 1000 for stage in LATENCY_STAGES}
+            latency["time_to_protected"] = (marks["protected"] - marks["fill"]) * 1000
+            self.latencies.append({"symbol": symbol} | latency)
+            print(f"Emir gecikmeleri (ms) {symbol}: " + ", ".join(f"{k}={v:.1f}" for k, v in latency.items()))
+            return {"order": main_order, "fill_price": fill_price, "quantity": filled_quantity,
+                    "tp_price": tp_price, "sl_price": sl_price, "latency": latency}
+        except Exception as e:
+            # BinanceAPIException dışında ağ hataları da pozisyonu korumasız bırakmamalı
+            print(f"Hata: Emir oluşturulurken sorun oluştu: {e}")
+            await self._flatten(client, symbol, exit_side, quantity, entered="entry_ack" in marks)
+            return None
+        finally:
+            self._fill_waiters.pop(client_order_id, None)
+
+    async def _flatten(self, client, symbol: str, exit_side: str, quantity: str | float, entered: bool):
+        """GÜVENLİK: Koruma kurulamadıysa açık emirleri iptal eder ve pozisyonu piyasa emriyle kapatır."""
+        try:
+            await cancel_all_open_orders(client, symbol)
+            if entered:
+                await client.futures_create_order(symbol=symbol, side=exit_side, type='MARKET', quantity=quantity, reduceOnly=True)
+            print(f"--> GÜVENLİK: Hata nedeniyle {symbol} için tüm emirler ve pozisyonlar kapatıldı.")
+        except Exception as e:
+            print(f"Hata: {symbol} güvenlik kapatması başarısız: {e}")
+
+    def latency_summary(self) -> dict:
+        """Kaydedilen işlemler için aşama bazında p50/p99 gecikmeler (ms)."""
+        summary = {"count": len(self.latencies)}
+        for stage in LATENCY_STAGES + ("time_to_protected",):
+            values = [entry[stage] for entry in self.latencies]
+            summary[stage] = {"p50": _percentile(values, 0.5), "p99": _percentile(values, 0.99)}
+        return summary
+
+order_pipeline = OrderPipeline()
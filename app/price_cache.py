@@ -0,0 +1,44 @@
+import time
+from .config import settings
+
+class PriceCache:
+    """
+    Websocket akışlarından (kline, bookTicker, markPrice) beslenen süreç içi son fiyat önbelleği.
+    İşlem öncesi fiyat buradan okunur; değer `max_age` saniyeden eskiyse REST'e düşülür.
+    """
+    def __init__(self, max_age: float = settings.PRICE_CACHE_MAX_AGE_SECONDS):
+        self.max_age = max_age
+        # sembol -> [fiyat, monotonic zaman damgası, kaynak]
+        self._prices: dict[str, list] = {}
+        self.hits = self.misses = 0
+
+    def update(self, symbol: str, price: float, source: str):
+        entry = self._prices.get(symbol)
+        if entry is None: self._prices[symbol] = [price, time.monotonic(), source]
+        else: entry[0], entry[1], entry[2] = price, time.monotonic(), source
+
+    def get(self, symbol: str, max_age: float | None = None) -> float | None:
+        """Taze bir fiyat varsa döndürür, yoksa (ya da bayatsa) None."""
+        entry = self._prices.get(symbol)
+        if entry is None or time.monotonic() - entry[1] > (self.max_age if max_age is None else max_age): return None
+        return entry[0]
+
+    def age(self, symbol: str) -> float | None:
+        entry = self._prices.get(symbol)
+        return time.monotonic() - entry[1] if entry else None
+
+    async def get_or_fetch(self, symbol: str, fetch) -> float | None:
+        """Önbellekteki taze fiyatı ya da `fetch(symbol)` ile REST'ten alınan fiyatı döndürür."""
+        price = self.get(symbol)
+        if price is not None:
+            self.hits += 1; return price
+        self.misses += 1
+        print(f"{symbol} için önbellekteki fiyat bayat, REST'ten çekiliyor...")
+        price = await fetch(symbol)
+        if price: self.update(symbol, price, "rest")
+        return price
+
+    def discard(self, symbol: str):
+        self._prices.pop(symbol, None)
+
+price_cache = PriceCache()
@@ -0,0 +1,195 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from binance.exceptions import BinanceAPIException
+from .config import settings
+
+# Öncelikler (küçük olan önce): emir/iptal > hesap sorguları > meta veri (mum, kaldıraç, exchangeInfo)
+PRIORITY_ORDER, PRIORITY_ACCOUNT, PRIORITY_METADATA = 0, 1, 2
+
+
+def _klines_weight(params: dict) -> int:
+    limit = int(params.get("limit", 500))
+    return 1 if limit < 100 else 2 if limit < 500 else 5 if limit <= 1000 else 10
+
+
+# AsyncClient yöntemi -> (öncelik, dakikalık IP ağırlığı, özdeş eş zamanlı istekler birleştirilsin mi).
+# Ağırlıklar Binance USDⓈ-M dokümantasyonundan; emir gönderimi IP ağırlığına değil emir sayısı sınırına sayılır.
+REQUEST_POLICIES = {
+    "futures_create_order": (PRIORITY_ORDER, 0, False),
+    "futures_cancel_order": (PRIORITY_ORDER, 1, False),
+    "futures_cancel_all_open_orders": (PRIORITY_ORDER, 1, False),
+    "futures_get_order": (PRIORITY_ACCOUNT, 1, True),
+    "futures_symbol_ticker": (PRIORITY_ACCOUNT, lambda params: 1 if params.get("symbol") else 2, True),
+    "futures_position_information": (PRIORITY_ACCOUNT, 5, True),
+    "futures_account": (PRIORITY_ACCOUNT, 5, True),
+    "futures_account_trades": (PRIORITY_ACCOUNT, 5, True),
+    "futures_klines": (PRIORITY_METADATA, _klines_weight, True),
+    "futures_change_leverage": (PRIORITY_METADATA, 1, False),
+    "futures_exchange_info": (PRIORITY_METADATA, 1, True),
+}
+
+# python-binance son yanıtı paylaşılan `client.response` alanına yazar; eş zamanlı isteklerde o alan başka bir
+# çağrıya ait olabilir. Her çağrının kendi yanıtı, çağrıyı yürüten görevin bağlamında tutulur.
+_response: contextvars.ContextVar = contextvars.ContextVar("rest_response", default=None)
+
+
+def _track_responses(client):
+    """`client._handle_response` kancası: işlenen yanıtı o anki çağrının bağlamına kaydeder (istemci başına bir kez)."""
+    handle = getattr(client, "_handle_response", None)
+    if handle is None or getattr(handle, "tracks_response", False): return
+    async def tracked(response):
+        _response.set(response)
+        return await handle(response)
+    tracked.tracks_response = True
+    client._handle_response = tracked
+
+
+class RestScheduler:
+    """
+    Binance REST istekleri için istemci tarafı hız sınırlayıcı.
+
+    Her istek için uç nokta ağırlığı, istek gönderilmeden önce dakikalık pencereden düşülür; yanıtlardaki
+    `X-MBX-USED-WEIGHT-1M` ve `X-MBX-ORDER-COUNT-*` başlıkları yerel sayacı borsanın değerine çeker.
+    Öncelik sınıfları bütçenin farklı oranlarını kullanabilir: meta veri istekleri `order_reserve` kadar
+    payı emirlere bırakır, bu yüzden çok sembollü başlangıçta bile emir ve iptaller beklemez. Sığmayan
+    istekler öncelik sırasıyla kuyrukta pencerenin yenilenmesini bekler; 429/418 yanıtında `Retry-After`
+    süresince tüm istekler durdurulur, emir dışındaki istekler sonra yeniden denenir.
+    Aynı parametrelerle eş zamanlı yapılan salt okuma istekleri (fiyat, pozisyon, ...) tek çağrıda birleştirilir.
+    """
+    def __init__(self, weight_limit: int = settings.REST_WEIGHT_LIMIT_1M, safety: float = settings.REST_WEIGHT_SAFETY,
+                 order_reserve: float = settings.REST_ORDER_RESERVE, order_limit_10s: int = settings.ORDER_LIMIT_10S,
+                 order_limit_1m: int = settings.ORDER_LIMIT_1M, retries: int = 2):
+        budget = weight_limit * safety
+        self.weight_caps = {PRIORITY_ORDER: budget, PRIORITY_ACCOUNT: budget * (1 - order_reserve / 2),
+                            PRIORITY_METADATA: budget * (1 - order_reserve)}
+        self.order_caps = (order_limit_10s * safety, order_limit_1m * safety)
+        self.retries = retries
+        self._weight = [0, 0]      # [dakika, kullanılan ağırlık]
+        self._orders_10s = [0, 0]  # [10 sn'lik pencere, emir sayısı]
+        self._orders_1m = [0, 0]
+        self._blocked_until = 0.0
+        self._waiters: list[tuple[int, int, int, bool, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._dispatcher: asyncio.Task | None = None
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        self.metrics = {"requests": 0, "coalesced": 0, "queued": 0, "max_wait_ms": 0.0, "rate_limited": 0, "retries": 0}
+
+    def _roll(self, now: float):
+        minute, window = int(now // 60), int(now // 10)
+        if self._weight[0] != minute: self._weight = [minute, 0]
+        if self._orders_1m[0] != minute: self._orders_1m = [minute, 0]
+        if self._orders_10s[0] != window: self._orders_10s = [window, 0]
+
+    def _fits(self, priority: int, weight: int, is_order: bool, now: float) -> bool:
+        if now < self._blocked_until: return False
+        self._roll(now)
+        if self._weight[1] + weight > self.weight_caps[priority]: return False
+        return not is_order or (self._orders_10s[1] + 1 <= self.order_caps[0] and self._orders_1m[1] + 1 <= self.order_caps[1])
+
+    def _take(self, weight: int, is_order: bool):
+        self._weight[1] += weight
+        if is_order: self._orders_10s[1] += 1; self._orders_1m[1] += 1
+
+    async def _acquire(self, priority: int, weight: int, is_order: bool):
+        now = time.time()
+        # Aynı ya da daha yüksek öncelikte bekleyen varsa sıra atlanmaz
+        if not any(waiter[0] <= priority for waiter in self._waiters) and self._fits(priority, weight, is_order, now):
+            self._take(weight, is_order); return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), weight, is_order, future))
+        self.metrics["queued"] += 1
+        if self._dispatcher is None or self._dispatcher.done(): self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+        self.metrics["max_wait_ms"] = max(self.metrics["max_wait_ms"], (time.time() - now) * 1000)
+
+    async def _dispatch(self):
+        """Kuyruktaki istekleri öncelik sırasıyla, bütçe yettikçe serbest bırakır; yetmezse pencere yenilenene kadar uyur."""
+        while self._waiters:
+            now = time.time()
+            while self._waiters:
+                priority, _, weight, is_order, future = self._waiters[0]
+                if future.done(): heapq.heappop(self._waiters); continue
+                if not self._fits(priority, weight, is_order, now): break
+                heapq.heappop(self._waiters); self._take(weight, is_order); future.set_result(None)
+            if not self._waiters: break
+            # Sonraki fırsat: yasak bitişi, 10 sn'lik emir penceresi ya da dakikalık ağırlık penceresi
+            is_order = self._waiters[0][3]
+            wake = max(self._blocked_until, (now // 10 + 1) * 10 if is_order else (now // 60 + 1) * 60)
+            await asyncio.sleep(max(0.01, wake - now))
+
+    def _observe(self, response):
+        """Yanıt başlıklarındaki borsa sayaçlarını yerel sayaçlara yansıtır (yerel tahmin düşükse)."""
+        headers = getattr(response, "headers", None)
+        if not headers: return
+        self._roll(time.time())
+        for header, counter in (("X-MBX-USED-WEIGHT-1M", self._weight), ("X-MBX-ORDER-COUNT-10S", self._orders_10s),
+                                ("X-MBX-ORDER-COUNT-1M", self._orders_1m)):
+            value = headers.get(header)
+            if value is not None and value.isdigit(): counter[1] = max(counter[1], int(value))
+
+    def _on_rate_limited(self, error: BinanceAPIException):
+        headers = getattr(error.response, "headers", None) or {}
+        retry_after = float(headers.get("Retry-After") or 60 - time.time() % 60)
+        self._observe(error.response)
+        self.metrics["rate_limited"] += 1
+        # Aynı anda reddedilen istekler aynı yasağı bildirir; uyarı bir kez basılır
+        if time.time() + retry_after <= self._blocked_until + 1: return
+        self._blocked_until = time.time() + retry_after
+        print(f"UYARI: Binance istek sınırı aşıldı ({error.status_code}), istekler {retry_after:.0f} sn durduruldu.")
+
+    async def _execute(self, client, name: str, params: dict):
+        priority, weight, _ = REQUEST_POLICIES[name]
+        weight = weight(params) if callable(weight) else weight
+        is_order = name == "futures_create_order"
+        _track_responses(client)
+        for attempt in range(self.retries + 1):
+            await self._acquire(priority, weight, is_order)
+            self.metrics["requests"] += 1
+            _response.set(None)
+            try:
+                result = await getattr(client, name)(**params)
+            except BinanceAPIException as e:
+                if e.status_code not in (418, 429): raise
+                self._on_rate_limited(e)
+                # Emir yinelenirse çift pozisyon açılabilir; kararı çağırana bırak
+                if priority == PRIORITY_ORDER or attempt == self.retries: raise
+                self.metrics["retries"] += 1
+                continue
+            self._observe(_response.get())
+            return result
+
+    async def call(self, client, name: str, params: dict):
+        """`client.<name>(**params)` çağrısını sıraya koyar; politikası olmayan yöntemler doğrudan çağrılır."""
+        policy = REQUEST_POLICIES.get(name)
+        if policy is None: return await getattr(client, name)(**params)
+        if not policy[2]: return await self._execute(client, name, params)
+        key = (id(client), name, tuple(sorted(params.items())))
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.create_task(self._execute(client, name, params))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.metrics["coalesced"] += 1
+        # Bir çağıranın iptali ortak isteği iptal etmemeli
+        return await asyncio.shield(task)
+
+    def snapshot(self) -> dict:
+        self._roll(time.time())
+        return self.metrics | {"used_weight_1m": self._weight[1], "order_count_10s": self._orders_10s[1], "order_count_1m": self._orders_1m[1],
+                               "waiting": len(self._waiters), "inflight": len(self._inflight),
+                               "blocked_for_seconds": max(0.0, round(self._blocked_until - time.time(), 1))}
+
+
+class ScheduledClient:
+    """`AsyncClient` sarmalayıcısı: REST yöntemleri `RestScheduler` üzerinden, diğer her şey doğrudan çağrılır."""
+    def __init__(self, client, scheduler: RestScheduler):
+        self.client, self.scheduler = client, scheduler
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.client, name)
+        if name not in REQUEST_POLICIES: return attribute
+        async def scheduled(**params): return await self.scheduler.call(self.client, name, params)
+        return scheduled
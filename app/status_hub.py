@@ -0,0 +1,106 @@
+import asyncio
+import json
+from .config import settings
+
+
+def merge_patch(old: dict, new: dict) -> dict:
+    """`old` -> `new` geçişi için JSON Merge Patch (RFC 7386): değişen anahtarlar, silinenler None."""
+    patch = {key: None for key in old if key not in new}
+    for key, value in new.items():
+        previous = old.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = merge_patch(previous, value)
+            if nested: patch[key] = nested
+        elif key not in old or previous != value:
+            patch[key] = value
+    return patch
+
+
+class _Subscriber:
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self, size: int):
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=size)
+        self.dropped = False
+
+
+class StatusHub:
+    """
+    Panolara durum değişikliklerini ve bot olaylarını (mum kapanışı, sinyal, dolum, PnL) iter.
+
+    `publish` ve `notify` senkron ve ucuzdur; bağlı istemci yoksa hiçbir şey yapmaz. Yayın görevi
+    `interval` içinde biriken olayları ve durum farkını (merge patch) tek bir mesajda birleştirir,
+    mesajı bir kez serileştirip her istemcinin sınırlı kuyruğuna koyar. Kuyruğu dolan yavaş
+    istemci beklenmez, bağlantısı kesilir (istemci yeniden bağlanıp tam durumu alır).
+    """
+    def __init__(self, status_source, interval: float = settings.STATUS_PUSH_INTERVAL_SECONDS,
+                 queue_size: int = settings.STATUS_PUSH_QUEUE_SIZE, max_events: int = 500):
+        self.status_source, self.interval, self.queue_size, self.max_events = status_source, interval, queue_size, max_events
+        self._subscribers: set[_Subscriber] = set()
+        self._events: list[dict] = []
+        self._snapshot: dict = {}
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self.metrics = {"messages": 0, "events": 0, "dropped_events": 0, "dropped_clients": 0}
+
+    def _status(self) -> dict:
+        # Derin kopya: durum sözlükleri yerinde değiştirildiği için fark bir önceki anlık görüntüyle alınır
+        return json.loads(json.dumps(self.status_source(), default=str))
+
+    def publish(self, event_type: str, **payload):
+        if not self._subscribers: return
+        if len(self._events) >= self.max_events: self.metrics["dropped_events"] += 1
+        else: self._events.append({"type": event_type} | payload)
+        self._wakeup.set()
+
+    def notify(self):
+        """Durum değiştiğinde çağrılır; fark bir sonraki yayında gönderilir."""
+        if self._subscribers: self._wakeup.set()
+
+    def _broadcast(self, message: dict):
+        text = json.dumps(message, default=str)
+        self.metrics["messages"] += 1
+        for subscriber in list(self._subscribers):
+            try: subscriber.queue.put_nowait(text)
+            except asyncio.QueueFull:
+                subscriber.dropped = True; self._subscribers.discard(subscriber)
+                self.metrics["dropped_clients"] += 1
+                subscriber.queue.get_nowait(); subscriber.queue.put_nowait("")  # Gönderici görevini uyandır
+
+    async def _run(self):
+        while self._subscribers:
+            try: await asyncio.wait_for(self._wakeup.wait(), settings.STATUS_PUSH_IDLE_SECONDS)
+            except asyncio.TimeoutError: pass  # Olay üretmeyen durum değişikliklerini de yakala
+            await asyncio.sleep(self.interval)  # Patlamaları tek mesajda birleştir
+            self._wakeup.clear()
+            events, self._events = self._events, []
+            status = self._status()
+            patch = merge_patch(self._snapshot, status)
+            self._snapshot = status
+            if events or patch:
+                self.metrics["events"] += len(events)
+                self._broadcast({"type": "update", "status": patch, "events": events})
+
+    async def serve(self, send_text):
+        """Bir istemciye tam durumu, ardından birleştirilmiş güncellemeleri gönderir; bağlantı kapanınca döner."""
+        if self._wakeup is None: self._wakeup = asyncio.Event()
+        subscriber = _Subscriber(self.queue_size)
+        if not self._subscribers: self._snapshot = self._status()
+        self._subscribers.add(subscriber)
+        if self._task is None or self._task.done(): self._task = asyncio.create_task(self._run())
+        try:
+            text = json.dumps({"type": "snapshot", "status": self._snapshot}, default=str)
+            while True:
+                try: await asyncio.wait_for(send_text(text), settings.STATUS_PUSH_SEND_TIMEOUT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Kuyruğu dolup zaten koparılmış istemci ikinci kez sayılmaz
+                    if not subscriber.dropped: self.metrics["dropped_clients"] += 1
+                    return
+                text = await subscriber.queue.get()
+                if subscriber.dropped: return
+        finally:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def client_count(self) -> int:
+        return len(self._subscribers)
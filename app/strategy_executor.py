@@ -0,0 +1,200 @@
+import asyncio
+import os
+import time
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from .config import settings
+from .indicators import BAR_FIELDS, IndicatorEngine
+from .kline_store import attach_shared_column, detach_shared
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+
+def _percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def _evaluate_shared(items: list[tuple], live: frozenset[str] | None = None) -> list[str | None]:
+    """
+    Süreç havuzu işçisi: (sembol, paylaşımlı bellek referansı, strateji) listesi için ham sinyalleri hesaplar.
+    Aynı pencere uzunluğundaki semboller (semboller x zaman) dizilerine yığılır ve göstergeler bir kez hesaplanır.
+    `live` verilirse, içinde olmayan (durdurulan sembollere ait) önbellekteki bellek bağlantıları önce kapatılır.
+    """
+    if live is not None: detach_shared(live)
+    signals: list[str | None] = [None] * len(items)
+    groups: dict[int, list[int]] = {}
+    for index, (_, ref, _) in enumerate(items): groups.setdefault(ref[3], []).append(index)
+    for indexes in groups.values():
+        columns = {name: np.stack([attach_shared_column(items[i][1], name) for i in indexes]) for name in BAR_FIELDS}
+        indicators = {ind.key: ind for i in indexes for ind in items[i][2].indicators()}
+        engine = IndicatorEngine.from_window([items[i][0] for i in indexes], columns, list(indicators.values()))
+        for i in indexes: signals[i] = items[i][2].signal(engine.view(items[i][0]))
+    return signals
+
+
+class StrategyExecutor:
+    """
+    Kapanan mumların gösterge güncellemesini ve strateji değerlendirmesini yürütür; sinyalleri tamamlandıkça
+    `on_signal`'e iletir.
+
+    `submit` çağrıları olay döngüsünün bir sonraki turuna (ya da `batch_window` saniye sonrasına) kadar
+    biriktirilir; biriken tüm sembollerin göstergeleri ortak `IndicatorEngine` ile tek vektörel adımda
+    güncellenir, ardından her sembolün stratejisi değerlendirilir.
+
+    - inline: toplu güncelleme ve değerlendirme olay döngüsünde yapılır.
+    - thread: toplu güncelleme ve değerlendirme iş parçacığı havuzunda yapılır (NumPy GIL'i bırakır); olay
+      döngüsü aynı depoya yeni mumlar eklemeye devam ettiğinden her kapanışın son mumu `submit` anında kopyalanır.
+    - process: her toplu iş süreç havuzunda, paylaşımlı bellekteki (`KlineStore(shared=True)`) mum
+      penceresinden durumsuz hesaplanır; pencere `history_size` ile göstergelerin ısınmasına yetecek uzunlukta tutulur.
+
+    Aynı mum sınırında (aynı açılış zamanı) kapanan semboller bir "sınır" olarak gruplanır; her sınır
+    için mum kapanışından (`T`) kararın (ve varsa emrin) verilmesine kadar geçen süreler ile ilk mesajdan
+    son kararın verilmesine kadarki yayılma süresi kaydedilir.
+    Sinyalin işlem açma kısmı `on_signal` tarafından ayrı bir görevde yürütülmelidir ki diğer semboller beklemesin.
+    """
+    def __init__(self, on_signal, mode: str = settings.STRATEGY_EXECUTOR, workers: int | None = settings.STRATEGY_WORKERS,
+                 history: int = 200, batch_window: float = settings.STRATEGY_BATCH_WINDOW_SECONDS):
+        if mode not in EXECUTOR_MODES: raise ValueError(f"Geçersiz strateji yürütücüsü: {mode}")
+        self.on_signal, self.mode, self.workers, self.batch_window = on_signal, mode, workers or os.cpu_count() or 1, batch_window
+        self.engine = IndicatorEngine()
+        self._pool = None
+        self._pending: set[asyncio.Task] = set()
+        self._batch: list[tuple] = []
+        self._flush_handle: asyncio.Handle | None = None
+        # açılış zamanı -> sınır ölçümleri; tamamlananlar `boundaries` geçmişine taşınır
+        self._boundaries: dict[int, dict] = {}
+        self.boundaries: deque[dict] = deque(maxlen=history)
+        # Çalışan sembollerin paylaşımlı bellek adları; işçiler bunların dışındaki bağlantıları kapatır
+        self._shared_names: set[str] = set()
+
+    @property
+    def shared_klines(self) -> bool:
+        """Süreç havuzu kullanılıyorsa mum depoları paylaşımlı bellekte oluşturulmalıdır."""
+        return self.mode == "process"
+
+    def _executor(self):
+        if self._pool is None:
+            if self.mode == "thread": self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="strategy")
+            else: self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def history_size(self, strategy) -> int:
+        """Sembol için tutulacak (ve REST'ten yüklenecek) mum sayısı."""
+        if self.mode != "process": return settings.KLINE_HISTORY_LIMIT
+        longest = max((getattr(indicator, "period", 0) for indicator in strategy.indicators()), default=0)
+        return min(1500, max(settings.KLINE_HISTORY_LIMIT, settings.PROCESS_WARMUP_FACTOR * longest))
+
+    def add_symbol(self, state):
+        """Sembolün stratejisinin istediği göstergeleri kaydeder ve mum geçmişinden besler."""
+        # Süreç havuzu göstergeleri her seferinde paylaşımlı pencereden hesaplar
+        if self.mode != "process": self.engine.add_symbol(state.symbol, state.strategy.indicators(), state.klines)
+        elif state.klines.shared_ref: self._shared_names.add(state.klines.shared_ref[0])
+
+    def remove_symbol(self, state):
+        self.engine.remove_symbol(state.symbol)
+        if state.klines is not None and state.klines.shared_ref: self._shared_names.discard(state.klines.shared_ref[0])
+
+    def advance(self, state, count: int):
+        """Depoya eklenen son `count` mumla göstergeleri sinyal üretmeden günceller (boşluk tamamlama)."""
+        if self.mode != "process" and count: self.engine.advance(state.symbol, state.klines, count)
+
+    def submit(self, state, open_time: int, close_time: int, received: float, evaluate: bool = True):
+        """
+        Bir sembolün kapanan mumunu göstergelere işler ve `evaluate` ise stratejiyi değerlendirmeye alır.
+        :param close_time: Mumun borsa kapanış zamanı (ms, kline `T`).
+        :param received: Mesajın alındığı `time.perf_counter()` anı.
+        """
+        boundary = None
+        if evaluate:
+            boundary = self._boundaries.get(open_time)
+            if boundary is None:
+                # Yeni bir sınır başladıysa önceki sınırların tüm sembolleri gelmiştir; bitenler geçmişe taşınır
+                for previous in [b for b in self._boundaries.values() if b["done"] == b["symbols"]]: self._finish(previous)
+                boundary = self._boundaries[open_time] = {"open_time": open_time, "symbols": 0, "done": 0, "signals": 0,
+                                                          "first_received": received, "close_to_decision_ms": []}
+            boundary["symbols"] += 1
+        # İş parçacığı çalışırken olay döngüsü depoya yeni mum ekleyebilir; göstergeler bu kapanışın mumunu görmeli
+        klines = state.klines.tail() if self.mode == "thread" else state.klines
+        self._batch.append((state, boundary, close_time, received, klines))
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.batch_window, self._flush) if self.batch_window > 0 else loop.call_soon(self._flush)
+
+    def _flush(self):
+        batch, self._batch, self._flush_handle = self._batch, [], None
+        if not batch: return
+        if self.mode == "inline":
+            self._complete_batch(batch, self._run_batch(batch))
+            return
+        task = asyncio.create_task(self._evaluate(batch))
+        self._pending.add(task); task.add_done_callback(self._pending.discard)
+
+    def _run_batch(self, batch: list[tuple]) -> list[str | None]:
+        """Göstergeleri toplu günceller ve değerlendirilecek semboller için ham sinyalleri döndürür."""
+        self.engine.update([(state.symbol, klines) for state, *_, klines in batch])
+        return [state.strategy.signal(self.engine.view(state.symbol)) if boundary is not None and state.symbol in self.engine else None
+                for state, boundary, *_ in batch]
+
+    async def _evaluate(self, batch: list[tuple]):
+        loop = asyncio.get_running_loop()
+        try:
+            if self.mode == "thread":
+                signals = await loop.run_in_executor(self._executor(), self._run_batch, batch)
+            else:
+                evaluated = [i for i, (_, boundary, *_) in enumerate(batch) if boundary is not None]
+                items = [(batch[i][0].symbol, batch[i][0].klines.shared_ref, batch[i][0].strategy) for i in evaluated]
+                signals = [None] * len(batch)
+                if items:
+                    results = await loop.run_in_executor(self._executor(), _evaluate_shared, items, frozenset(self._shared_names))
+                    for i, signal in zip(evaluated, results): signals[i] = signal
+        except Exception as e:
+            print(f"Strateji değerlendirme hatası ({', '.join(state.symbol for state, *_ in batch[:5])}): {e}")
+            signals = [None] * len(batch)
+        self._complete_batch(batch, signals)
+
+    def _complete_batch(self, batch: list[tuple], signals: list[str | None]):
+        for (state, boundary, close_time, received, _), signal in zip(batch, signals):
+            if boundary is not None: self._complete(state, boundary, close_time, received, state.strategy.apply_signal(signal))
+
+    def _complete(self, state, boundary: dict, close_time: int, received: float, signal: str):
+        now = time.perf_counter()
+        boundary["done"] += 1
+        if signal in ("LONG", "SHORT"): boundary["signals"] += 1
+        # Karar anı, sinyal varsa emrin gönderilmeye başladığı andır. Hızlandırılmış oynatmada (ya da yerel saat
+        # borsanın gerisindeyse) `T` ileride kalır; ölçüm en az mesajın alınmasından bu yana geçen süredir
+        boundary["close_to_decision_ms"].append(max(time.time() * 1000 - close_time, (now - received) * 1000))
+        boundary["fan_out_ms"] = (now - boundary["first_received"]) * 1000
+        self.on_signal(state, signal, received)
+        if boundary["done"] == boundary["symbols"] and max(self._boundaries) > boundary["open_time"]: self._finish(boundary)
+
+    def _finish(self, boundary: dict):
+        self._boundaries.pop(boundary["open_time"], None)
+        latencies = boundary.pop("close_to_decision_ms")
+        self.boundaries.append(boundary | {"close_to_decision_p50_ms": _percentile(latencies, 0.5),
+                                           "close_to_decision_p99_ms": _percentile(latencies, 0.99)})
+
+    async def drain(self):
+        """Biriken toplu işi hemen işler ve devam eden tüm değerlendirmelerin bitmesini bekler."""
+        if self._flush_handle is not None: self._flush_handle.cancel(); self._flush()
+        if self._pending: await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def finish_boundaries(self):
+        """Tüm sembolleri değerlendirilmiş açık sınırları geçmişe taşır."""
+        for boundary in [b for b in self._boundaries.values() if b["done"] == b["symbols"]]: self._finish(boundary)
+
+    def summary(self) -> dict:
+        """Son sınırlar için yayılma süresi ve mum kapanışından karara gecikme özetleri (ms)."""
+        fan_out = [b["fan_out_ms"] for b in self.boundaries]
+        decision = [b["close_to_decision_p99_ms"] for b in self.boundaries]
+        return {"mode": self.mode, "boundaries": len(fan_out), "fan_out_p50_ms": _percentile(fan_out, 0.5),
+                "fan_out_p99_ms": _percentile(fan_out, 0.99), "close_to_decision_p99_ms": _percentile(decision, 0.99),
+                "indicators": self.engine.metrics | {"keys": len(self.engine.indicator_keys)},
+                "last": self.boundaries[-1] if self.boundaries else None}
+
+    async def close(self):
+        if self._flush_handle is not None: self._flush_handle.cancel(); self._flush_handle = None
+        self._batch.clear()
+        for task in list(self._pending): task.cancel()
+        if self._pool is not None: self._pool.shutdown(wait=False, cancel_futures=True); self._pool = None
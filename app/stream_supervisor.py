@@ -0,0 +1,56 @@
+import random
+import time
+from .config import settings
+
+
+class Backoff:
+    """
+    Yeniden bağlanma için jitter'lı üstel bekleme ("full jitter"): n. denemede [0, min(max, base * 2^n)]
+    aralığından rastgele bir süre. Bağlantı `stable_after` saniyeden uzun yaşadıysa sayaç sıfırlanır;
+    böylece tüm bağlantılar aynı anda kopsa bile yeniden bağlanmalar zamana yayılır.
+    """
+    def __init__(self, base: float = settings.RECONNECT_BASE_SECONDS, maximum: float = settings.RECONNECT_MAX_SECONDS,
+                 stable_after: float = 30.0):
+        self.base, self.maximum, self.stable_after = base, maximum, stable_after
+        self.attempts = 0
+        self._connected_at: float | None = None
+
+    def connected(self):
+        self._connected_at = time.monotonic()
+
+    def next_delay(self) -> float:
+        if self._connected_at is not None and time.monotonic() - self._connected_at >= self.stable_after: self.attempts = 0
+        self._connected_at = None
+        delay = random.uniform(0, min(self.maximum, self.base * 2 ** self.attempts))
+        self.attempts += 1
+        return delay
+
+
+class StreamHealth:
+    """Bir websocket bağlantısının sağlık ölçümleri (bağlantı durumu, yeniden bağlanma, son mesaj yaşı)."""
+    __slots__ = ("name", "connected", "connects", "reconnects", "messages", "last_message", "last_error", "backoff")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.connected, self.connects, self.reconnects, self.messages = False, 0, 0, 0
+        self.last_message: float | None = None
+        self.last_error: str | None = None
+        self.backoff = Backoff()
+
+    def on_connect(self):
+        self.connected = True; self.connects += 1
+        self.backoff.connected()
+
+    def on_message(self):
+        self.messages += 1; self.last_message = time.monotonic()
+
+    def on_disconnect(self, error: BaseException | str | None = None) -> float:
+        """Bağlantı koptuğunda çağrılır; beklenecek süreyi döndürür."""
+        if error is not None: self.last_error = str(error)
+        self.connected = False; self.reconnects += 1
+        return self.backoff.next_delay()
+
+    def snapshot(self) -> dict:
+        return {"name": self.name, "connected": self.connected, "connects": self.connects, "reconnects": self.reconnects,
+                "messages": self.messages, "last_error": self.last_error,
+                "last_message_age": time.monotonic() - self.last_message if self.last_message is not None else None}
@@ -0,0 +1,195 @@
+"""
+EMA periyotları, TP/SL yüzdeleri ve zaman dilimleri üzerinde paralel parametre taraması.
+
+Mum dizileri ana süreçte bir kez yüklenip (gerekirse yeniden örneklenip) geçici .npy
+dosyalarına yazılır; işçi süreçler bunları `mmap_mode='r'` ile açar, böylece veri her
+göreve pickle edilerek kopyalanmaz. Aynı (sembol, zaman dilimi, EMA çifti) için EMA ve
+sinyaller bir kez hesaplanıp tüm TP/SL kombinasyonlarında tekrar kullanılır.
+
+Kullanım:
+    python -m app.sweep BTCUSDT=data/btc-1m.csv ETHUSDT=data/eth-1m.csv \\
+        --short 3:10 --long 12:40:2 --tp 0.002,0.003,0.005 --sl 0.003,0.005 \\
+        --timeframes 1m,5m,15m --workers 8 --samples 10000 --output sonuclar.csv
+"""
+import argparse
+import csv
+import itertools
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from .config import settings
+from .backtester import load_klines, ema, generate_signals, simulate_trades, summarize
+
+# Yeniden örnekleme ve simülasyon için gereken sütunlar (tek bir float64 matrisinde)
+SWEEP_COLUMNS = ("open_time", "open", "high", "low", "close")
+_INTERVAL_UNITS_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+# İşçi süreç başına açılmış bellek eşlemeli diziler
+_worker_arrays: dict = {}
+_worker_paths: dict = {}
+
+
+def interval_ms(interval: str) -> int:
+    unit = _INTERVAL_UNITS_MS.get(interval[-1:])
+    if unit is None or not interval[:-1].isdigit(): raise ValueError(f"Geçersiz zaman dilimi: {interval} (örn. 1m, 4h, 1d)")
+    return int(interval[:-1]) * unit
+
+
+def resample(columns: dict, interval: str) -> dict:
+    """
+    Temel zaman dilimindeki mumları daha büyük bir zaman dilimine toplar (OHLC).
+    Hedef, temel zaman diliminden küçükse ya da onun katı değilse ValueError.
+    """
+    open_time = columns["open_time"]
+    target = interval_ms(interval)
+    if len(open_time) > 1:
+        base = int(np.diff(open_time).min())  # Veri boşlukları farkı büyütür, en küçüğü temel aralıktır
+        if target < base or target % base:
+            raise ValueError(f"{interval} zaman dilimi verinin temel aralığından ({base // 60_000} dk) üretilemez; "
+                             f"temel aralığın katı olmalı.")
+    buckets = open_time // target
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(open_time)] - 1
+    return {
+        "open_time": buckets[starts] * target, "open": columns["open"][starts],
+        "high": np.maximum.reduceat(columns["high"], starts), "low": np.minimum.reduceat(columns["low"], starts),
+        "close": columns["close"][ends],
+    }
+
+
+def parse_values(text: str, cast=float) -> list:
+    """'1,2,3' listesi ya da 'başlangıç:bitiş[:adım]' (bitiş dahil) aralığını ayrıştırır."""
+    if ":" in text:
+        parts = [cast(p) for p in text.split(":")]
+        start, stop, step = parts[0], parts[1], parts[2] if len(parts) > 2 else cast(1)
+        return [cast(round(v, 10)) for v in np.arange(start, stop + step / 2, step)]
+    return [cast(v) for v in text.split(",") if v]
+
+
+def _init_worker(paths: dict):
+    global _worker_paths
+    _worker_paths = paths
+
+
+def _arrays(key):
+    if key not in _worker_arrays:
+        # Sayfalar süreçler arasında paylaşılır; np.memmap alt sınıfının dilimleme maliyetinden kaçınmak için düz görünüm
+        matrix = np.load(_worker_paths[key], mmap_mode="r").view(np.ndarray)
+        _worker_arrays[key] = {name: matrix[i] for i, name in enumerate(SWEEP_COLUMNS)}
+    return _worker_arrays[key]
+
+
+def _evaluate(task: tuple) -> list[dict]:
+    """Bir (sembol, zaman dilimi, EMA çifti) için tüm TP/SL kombinasyonlarını test eder."""
+    symbol, timeframe, short_period, long_period, exits, trade_params = task
+    columns = _arrays((symbol, timeframe))
+    close = columns["close"]
+    indices, sides = generate_signals(close, short_period, long_period, ema(close, short_period), ema(close, long_period))
+    results = []
+    for take_profit, stop_loss in exits:
+        trades = simulate_trades(columns, indices, sides, take_profit_percent=take_profit,
+                                 stop_loss_percent=stop_loss, **trade_params)
+        results.append({"symbol": symbol, "timeframe": timeframe, "short_ema": short_period, "long_ema": long_period,
+                        "take_profit": take_profit, "stop_loss": stop_loss} | summarize(trades))
+    return results
+
+
+def build_tasks(symbols, timeframes, shorts, longs, take_profits, stop_losses, samples=None, seed=None, trade_params=None):
+    """Izgarayı (ya da ondan rastgele bir örneklemi) işçi görevlerine böler."""
+    combos = [c for c in itertools.product(timeframes, shorts, longs, take_profits, stop_losses) if c[1] < c[2]]
+    if samples and samples < len(combos):
+        combos = random.Random(seed).sample(combos, samples)
+    grouped = defaultdict(list)
+    for timeframe, short_period, long_period, take_profit, stop_loss in combos:
+        grouped[(timeframe, short_period, long_period)].append((take_profit, stop_loss))
+    tasks = [(symbol, timeframe, short_period, long_period, exits, trade_params or {})
+             for symbol in symbols for (timeframe, short_period, long_period), exits in grouped.items()]
+    return tasks, len(combos)
+
+
+def rank(results: list[dict], metric: str = "net_pnl") -> list[dict]:
+    """Sonuçları kombinasyon bazında tüm semboller üzerinden toplayıp sıralar."""
+    totals = {}
+    for r in results:
+        key = (r["timeframe"], r["short_ema"], r["long_ema"], r["take_profit"], r["stop_loss"])
+        row = totals.setdefault(key, dict(zip(("timeframe", "short_ema", "long_ema", "take_profit", "stop_loss"), key))
+                                | {"symbols": 0, "total_trades": 0, "winning_trades": 0, "net_pnl": 0.0,
+                                   "gross_profit": 0.0, "gross_loss": 0.0, "max_drawdown": 0.0})
+        row["symbols"] += 1
+        for field in ("total_trades", "winning_trades", "net_pnl", "gross_profit", "gross_loss"): row[field] += r[field]
+        row["max_drawdown"] = max(row["max_drawdown"], r["max_drawdown"])
+    for row in totals.values():
+        row["win_rate"] = row["winning_trades"] / row["total_trades"] if row["total_trades"] else 0.0
+        row["profit_factor"] = row["gross_profit"] / row["gross_loss"] if row["gross_loss"] else float("inf") if row["gross_profit"] else 0.0
+    return sorted(totals.values(), key=lambda row: row[metric], reverse=True)
+
+
+def run_sweep(datasets: dict[str, str], timeframes, shorts, longs, take_profits, stop_losses,
+              workers: int | None = None, samples: int | None = None, seed: int | None = None, trade_params=None) -> list[dict]:
+    """Tüm sembol dosyalarını yükler, görevleri süreç havuzuna dağıtır ve ham sonuçları döndürür."""
+    with tempfile.TemporaryDirectory(prefix="bnc-sweep-") as tmp:
+        paths = {}
+        for symbol, path in datasets.items():
+            base = load_klines(path)
+            for timeframe in timeframes:
+                columns = resample(base, timeframe)
+                paths[(symbol, timeframe)] = file = os.path.join(tmp, f"{symbol}-{timeframe}.npy")
+                np.save(file, np.vstack([columns[name].astype(np.float64) for name in SWEEP_COLUMNS]))
+        tasks, combo_count = build_tasks(list(datasets), timeframes, shorts, longs, take_profits, stop_losses,
+                                         samples, seed, trade_params)
+        print(f"{combo_count} kombinasyon x {len(datasets)} sembol, {len(tasks)} görev olarak dağıtılıyor...")
+        results = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(paths,)) as pool:
+            for future in as_completed([pool.submit(_evaluate, task) for task in tasks]):
+                results.extend(future.result())
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EMA/TP/SL/zaman dilimi parametre taraması.")
+    parser.add_argument("datasets", nargs="+", help="SEMBOL=dosya.csv|parquet (temel zaman diliminde, örn. 1m)")
+    parser.add_argument("--short", default="3:9", help="Kısa EMA periyotları: '5,8' ya da '3:9'")
+    parser.add_argument("--long", default="12:30:2", help="Uzun EMA periyotları")
+    parser.add_argument("--tp", default=str(settings.TAKE_PROFIT_PERCENT), help="TAKE PROFIT yüzdeleri (0.003 = %%0.3)")
+    parser.add_argument("--sl", default=str(settings.STOP_LOSS_PERCENT), help="STOP LOSS yüzdeleri")
+    parser.add_argument("--timeframes", default=settings.TIMEFRAME, help="Örn: '1m,5m,15m'")
+    parser.add_argument("--samples", type=int, default=None, help="Izgaradan rastgele seçilecek kombinasyon sayısı")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--metric", default="net_pnl", help="Sıralama ölçütü (net_pnl, profit_factor, win_rate...)")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", default=None, help="Sembol bazlı tüm sonuçların yazılacağı CSV")
+    parser.add_argument("--fee-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    datasets = dict(item.split("=", 1) for item in args.datasets)
+    started = time.perf_counter()
+    try:
+        results = run_sweep(datasets, args.timeframes.split(","), parse_values(args.short, int), parse_values(args.long, int),
+                            parse_values(args.tp), parse_values(args.sl), args.workers, args.samples, args.seed,
+                            {"fee_rate": args.fee_rate})
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"{len(results)} backtest {time.perf_counter() - started:.1f} sn içinde tamamlandı.")
+    # Örn. tüm kısa periyotlar uzun periyotlardan büyükse ızgara boş kalır
+    if not results: parser.exit(1, "Izgara hiç kombinasyon üretmedi (kısa EMA periyotları uzunlardan küçük olmalı).\n")
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader(); writer.writerows(results)
+        print(f"Sonuçlar {args.output} dosyasına yazıldı.")
+
+    header = f"{'#':>3} {'TF':>4} {'EMA':>7} {'TP':>7} {'SL':>7} {'İşlem':>6} {'Kazanç%':>8} {'Net PnL':>10} {'PF':>6} {'Max DD':>9}"
+    print(header); print("-" * len(header))
+    for i, row in enumerate(rank(results, args.metric)[:args.top], 1):
+        print(f"{i:>3} {row['timeframe']:>4} {row['short_ema']:>3}/{row['long_ema']:<3} {row['take_profit']:>7.4f} "
+              f"{row['stop_loss']:>7.4f} {row['total_trades']:>6} {row['win_rate'] * 100:>7.1f}% {row['net_pnl']:>10.2f} "
+              f"{row['profit_factor']:>6.2f} {row['max_drawdown']:>9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import json
+import os
+import time
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
+from .config import settings
+
+
+def _precision(size: Decimal) -> int:
+    """'0.00100' -> 3, '1' -> 0"""
+    return max(0, -size.normalize().as_tuple().exponent)
+
+
+class SymbolMeta:
+    """Bir vadeli işlem sembolünün emir kuralları; filtreler yüklemede bir kez ayrıştırılır."""
+    __slots__ = ("symbol", "tick_size", "step_size", "min_qty", "max_qty", "market_step_size", "market_max_qty",
+                 "min_notional", "price_precision", "quantity_precision")
+    _DECIMALS = ("tick_size", "step_size", "min_qty", "max_qty", "market_step_size", "market_max_qty", "min_notional")
+
+    def __init__(self, symbol: str, tick_size, step_size, min_qty="0", max_qty="0", market_step_size=None,
+                 market_max_qty=None, min_notional="0"):
+        self.symbol = symbol
+        self.tick_size, self.step_size = Decimal(tick_size), Decimal(step_size)
+        self.min_qty, self.max_qty = Decimal(min_qty), Decimal(max_qty)
+        self.market_step_size = Decimal(market_step_size) if market_step_size else self.step_size
+        self.market_max_qty = Decimal(market_max_qty) if market_max_qty else self.max_qty
+        self.min_notional = Decimal(min_notional)
+        self.price_precision, self.quantity_precision = _precision(self.tick_size), _precision(self.step_size)
+
+    @classmethod
+    def from_exchange_info(cls, info: dict) -> "SymbolMeta":
+        filters = {f['filterType']: f for f in info.get('filters', [])}
+        price, lot = filters.get('PRICE_FILTER', {}), filters.get('LOT_SIZE', {})
+        market_lot, notional = filters.get('MARKET_LOT_SIZE', {}), filters.get('MIN_NOTIONAL', {})
+        return cls(info['symbol'], price.get('tickSize', '0.01'), lot.get('stepSize', '1'), lot.get('minQty', '0'),
+                   lot.get('maxQty', '0'), market_lot.get('stepSize'), market_lot.get('maxQty'),
+                   notional.get('notional', notional.get('minNotional', '0')))
+
+    def to_record(self) -> list:
+        return [self.symbol] + [str(getattr(self, name)) for name in self._DECIMALS]
+
+    @classmethod
+    def from_record(cls, record: list) -> "SymbolMeta":
+        return cls(*record)
+
+    def round_quantity(self, quantity, market: bool = True) -> Decimal:
+        """Miktarı adım büyüklüğüne aşağı yuvarlar ve azami miktarla sınırlar."""
+        step, max_qty = (self.market_step_size, self.market_max_qty) if market else (self.step_size, self.max_qty)
+        rounded = (Decimal(str(quantity)) / step).to_integral_value(rounding=ROUND_DOWN) * step
+        if max_qty > 0: rounded = min(rounded, (max_qty / step).to_integral_value(rounding=ROUND_DOWN) * step)
+        return rounded.quantize(step)
+
+    def round_price(self, price, rounding=ROUND_HALF_UP) -> Decimal:
+        """Fiyatı fiyat adımına (tickSize) yuvarlar."""
+        return ((Decimal(str(price)) / self.tick_size).to_integral_value(rounding=rounding) * self.tick_size).quantize(self.tick_size)
+
+    def is_valid_order(self, quantity: Decimal, price: float) -> bool:
+        """Asgari miktar ve asgari nominal değer kurallarını kontrol eder."""
+        return quantity > 0 and quantity >= self.min_qty and quantity * Decimal(str(price)) >= self.min_notional
+
+
+class SymbolMetadataService:
+    """
+    Vadeli işlem exchangeInfo verisini bir kez indirir, sembole göre sözlükte indeksler ve
+    sade kayıtlar halinde diske yazar. Disk önbelleği `ttl` saniyeden tazeyse soğuk başlangıçta
+    ağ isteği ve büyük JSON ayrıştırması yapılmaz.
+    """
+    def __init__(self, cache_path: str = settings.EXCHANGE_INFO_CACHE_PATH, ttl: float = settings.EXCHANGE_INFO_TTL_SECONDS):
+        self.cache_path, self.ttl = cache_path, ttl
+        self._symbols: dict[str, SymbolMeta] = {}
+        self.loaded_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def is_fresh(self) -> bool:
+        return bool(self._symbols) and time.time() - self.loaded_at < self.ttl
+
+    def get(self, symbol: str) -> SymbolMeta | None:
+        return self._symbols.get(symbol)
+
+    async def load(self, client, force: bool = False):
+        """Bellekteki ya da diskteki kayıtlar bayatsa `futures_exchange_info` ile yeniler."""
+        if not force and self.is_fresh(): return
+        if not force and self._load_cache(): return
+        info = await client.futures_exchange_info()
+        self._symbols = {s['symbol']: SymbolMeta.from_exchange_info(s) for s in info['symbols'] if s.get('status', 'TRADING') == 'TRADING'}
+        self.loaded_at = time.time()
+        self._save_cache()
+        print(f"Vadeli işlem sembol bilgileri yüklendi: {len(self._symbols)} sembol.")
+
+    def _load_cache(self) -> bool:
+        try:
+            with open(self.cache_path) as f: cached = json.load(f)
+            if time.time() - cached['fetched_at'] >= self.ttl: return False
+            self._symbols = {record[0]: SymbolMeta.from_record(record) for record in cached['symbols']}
+            self.loaded_at = cached['fetched_at']
+            print(f"Sembol bilgileri disk önbelleğinden yüklendi: {len(self._symbols)} sembol.")
+            return True
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+    def _save_cache(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"fetched_at": self.loaded_at, "symbols": [m.to_record() for m in self._symbols.values()]}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Sembol bilgileri önbelleğe yazılamadı: {e}")
+
+symbol_metadata = SymbolMetadataService()
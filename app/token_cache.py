@@ -0,0 +1,59 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from .config import settings
+from .firebase_manager import firebase_manager
+
+class TokenCache:
+    """
+    Doğrulanmış Firebase ID token'ları için LRU önbellek.
+
+    Anahtar token'ın SHA-256 özetidir (token'ın kendisi bellekte tutulmaz). Bir kayıt token'ın
+    `exp` iddiasına ve `max_ttl` süresine kadar geçerlidir. Önbellekte olmayan token'lar
+    `verify` ile olay döngüsü dışında (iş parçacığında) doğrulanır; aynı token için eş zamanlı
+    istekler aynı doğrulama görevini bekler.
+    """
+    def __init__(self, verify, max_size: int = settings.TOKEN_CACHE_SIZE, max_ttl: float = settings.TOKEN_CACHE_MAX_TTL_SECONDS):
+        self.verify, self.max_size, self.max_ttl = verify, max_size, max_ttl
+        # özet -> (kullanıcı bilgileri, geçerlilik sonu epoch sn)
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self.hits = self.misses = 0
+
+    async def get_user(self, token: str) -> dict | None:
+        """Token geçerliyse kullanıcı bilgilerini, değilse None döndürür."""
+        key = hashlib.sha256(token.encode()).hexdigest()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if time.time() < entry[1]:
+                self._entries.move_to_end(key); self.hits += 1
+                return entry[0]
+            del self._entries[key]
+        self.misses += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._in_flight[key] = asyncio.create_task(self._verify(key, token))
+            task.add_done_callback(lambda done: self._finished(key, done))
+        # Doğrulama kendi görevinde çalışır; bir çağıranın iptali diğer bekleyenlere yayılmaz
+        return await asyncio.shield(task)
+
+    async def _verify(self, key: str, token: str) -> dict | None:
+        user = await asyncio.to_thread(self.verify, token)
+        if user: self._store(key, user)
+        return user
+
+    def _finished(self, key: str, task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        if not task.cancelled(): task.exception()  # Tüm çağıranlar iptal edildiyse hata "alınmamış" sayılmasın
+
+    def _store(self, key: str, user: dict):
+        expires_at = min(float(user.get('exp', 0)), time.time() + self.max_ttl)
+        if expires_at <= time.time(): return
+        self._entries[key] = (user, expires_at); self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size: self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+token_cache = TokenCache(firebase_manager.verify_token)
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from .config import settings
+from .firebase_manager import firebase_manager
+
+
+class TradeJournal:
+    """
+    İşlem kayıtlarını olay döngüsünü bloklamadan uzak depoya (Firebase) yazar.
+
+    `log_trade` kaydı önce yerel, yalnızca eklemeli bir JSONL günlüğüne (write-ahead log) yazar
+    ve bellek içi kuyruğa koyar. Arka plandaki yazıcı kuyruğu toplu halde boşaltır ve her grubu
+    iş parçacığı havuzunda tek bir çok yollu `update` çağrısıyla `sink.write_trades`'e gönderir.
+    Yazılan anahtarlar günlüğe "ack" olarak işlenir; yeniden başlatmada onaylanmamış kayıtlar
+    tekrar gönderilir. Uzak depo erişilemezse grup `retry_delay`'den başlayıp her denemede iki katına çıkan
+    (en fazla `max_retry_delay`) aralıklarla yeniden denenir, kayıt kaybolmaz.
+
+    `sink` nesnesi `write_trades(records: dict[str, dict])` metodunu sağlamalıdır (bloklayabilir). `configured`
+    özelliği False ise (ör. Firebase kimlik bilgileri yok) yazıcı başlatılmaz; kayıtlar yalnızca günlükte
+    tutulur ve depo yapılandırılıp süreç yeniden başlatıldığında gönderilir.
+    """
+    def __init__(self, sink, wal_path: str = settings.TRADE_JOURNAL_WAL_PATH, batch_size: int = 50,
+                 flush_interval: float = 0.5, max_queue: int = 10000, retry_delay: float = 5.0, max_retry_delay: float = 60.0):
+        self.sink, self.wal_path = sink, wal_path
+        self.batch_size, self.flush_interval, self.max_queue, self.retry_delay = batch_size, flush_interval, max_queue, retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.offline = False
+        self._executor: ThreadPoolExecutor | None = None
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._wal = None
+        # anahtar -> (kayıt, kuyruğa girdiği monotonic zaman); henüz kuyruğa sığmamış taşmalar dahil
+        self._pending: dict[str, tuple[dict, float]] = {}
+        self._overflow: list[str] = []
+        self.metrics = {"enqueued": 0, "written": 0, "replayed": 0, "batches": 0, "failures": 0, "overflow": 0,
+                        "max_queue_depth": 0, "last_batch_size": 0, "last_batch_ms": 0.0, "max_write_lag_ms": 0.0,
+                        "local_only": 0, "last_retry_delay": 0.0}
+
+    def _started(self) -> bool:
+        return self._wal is not None and (self.offline or (self._task is not None and not self._task.done()))
+
+    def start(self):
+        """Günlüğü yeniden oynatır ve yazıcı görevini başlatır (çalışan olay döngüsü içinde çağrılmalı)."""
+        if self._started(): return
+        self.offline = not getattr(self.sink, "configured", True)
+        self._queue = asyncio.Queue()
+        pending = self._replay()
+        now = time.monotonic()
+        self._pending, self._overflow = {}, []
+        if self.offline:
+            print(f"UYARI: Uzak işlem deposu yapılandırılmamış; işlemler yalnızca {self.wal_path} günlüğünde tutulacak "
+                  f"({len(pending)} gönderilmemiş kayıt).")
+            return
+        for key, data in pending.items():
+            self._pending[key] = (data, now); self._queue.put_nowait(key)
+        if pending:
+            self.metrics["replayed"] += len(pending)
+            print(f"İşlem günlüğünden {len(pending)} gönderilmemiş kayıt yeniden kuyruğa alındı.")
+        if self._executor is None: self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trade-journal")
+        self._task = asyncio.create_task(self._run())
+
+    def _replay(self) -> dict[str, dict]:
+        """Onaylanmamış kayıtları okur, günlüğü yalnızca onlarla yeniden yazar ve döndürür."""
+        pending: dict[str, dict] = {}
+        try:
+            with open(self.wal_path) as f:
+                for line in f:
+                    try: entry = json.loads(line)
+                    except ValueError: continue  # Çökme anında yarım kalmış son satır
+                    if entry.get("op") == "trade": pending[entry["key"]] = entry["data"]
+                    elif entry.get("op") == "ack":
+                        for key in entry["keys"]: pending.pop(key, None)
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(self.wal_path) or ".", exist_ok=True)
+        tmp_path = f"{self.wal_path}.tmp"
+        with open(tmp_path, "w") as f:
+            for key, data in pending.items(): f.write(json.dumps({"op": "trade", "key": key, "data": data}) + "\n")
+        os.replace(tmp_path, self.wal_path)
+        if self._wal: self._wal.close()
+        self._wal = open(self.wal_path, "a", buffering=1)
+        return pending
+
+    def log_trade(self, trade_data: dict) -> str:
+        """Kaydı günlüğe yazar ve kuyruğa alır; uzak yazmayı beklemez. Kayıt anahtarını döndürür."""
+        if not self._started(): self.start()
+        record = dict(trade_data)
+        if hasattr(record.get('timestamp'), 'isoformat'): record['timestamp'] = record['timestamp'].isoformat()
+        key = f"{int(time.time() * 1000):013d}_{uuid.uuid4().hex[:8]}"
+        self._wal.write(json.dumps({"op": "trade", "key": key, "data": record}) + "\n")
+        if self.offline: self.metrics["local_only"] += 1; return key
+        self._pending[key] = (record, time.monotonic())
+        self.metrics["enqueued"] += 1
+        if self._queue.qsize() >= self.max_queue:
+            # Geri basınç: kayıt günlükte güvende, kuyruk boşaldıkça sıraya alınır
+            self._overflow.append(key); self.metrics["overflow"] += 1
+        else:
+            self._queue.put_nowait(key)
+        self.metrics["max_queue_depth"] = max(self.metrics["max_queue_depth"], self._queue.qsize())
+        return key
+
+    async def _next_batch(self) -> list[str]:
+        keys = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(keys) < self.batch_size:
+            if self._queue.empty():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0: break
+                try: keys.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError: break
+            else:
+                keys.append(self._queue.get_nowait())
+        return keys
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            keys = await self._next_batch()
+            records = {key: self._pending[key][0] for key in keys}
+            delay = self.retry_delay
+            while True:
+                started = time.perf_counter()
+                try:
+                    await loop.run_in_executor(self._executor, self.sink.write_trades, records)
+                    break
+                except Exception as e:
+                    self.metrics["failures"] += 1; self.metrics["last_retry_delay"] = delay
+                    print(f"İşlem kayıtları uzak depoya yazılamadı ({len(records)} kayıt), {delay:.1f} sn sonra yeniden denenecek: {e}")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.max_retry_delay)
+            now = time.monotonic()
+            self._wal.write(json.dumps({"op": "ack", "keys": keys}) + "\n")
+            self.metrics["max_write_lag_ms"] = max(self.metrics["max_write_lag_ms"], max((now - self._pending[k][1]) * 1000 for k in keys))
+            for key in keys: self._pending.pop(key, None); self._queue.task_done()
+            self.metrics.update(batches=self.metrics["batches"] + 1, written=self.metrics["written"] + len(keys),
+                                last_batch_size=len(keys), last_batch_ms=(time.perf_counter() - started) * 1000)
+            while self._overflow and self._queue.qsize() < self.max_queue: self._queue.put_nowait(self._overflow.pop(0))
+
+    async def flush(self, timeout: float = 10.0) -> bool:
+        """Kuyruktaki tüm kayıtlar yazılana kadar (en fazla `timeout` sn) bekler; depo yapılandırılmamışsa beklemez."""
+        if self._queue is None: return True
+        if self.offline: return False
+        async def drain():
+            # Taşan kayıtlar kuyruğa ancak yer açıldıkça girdiğinden join birden çok kez beklenebilir
+            while self._pending: await self._queue.join()
+        try:
+            await asyncio.wait_for(drain(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            print(f"UYARI: İşlem günlüğü {timeout} sn içinde boşaltılamadı; {len(self._pending)} kayıt yeniden başlatmada gönderilecek.")
+            return False
+
+    async def close(self, timeout: float = 10.0):
+        """Kapanış kancası: kuyruğu boşaltır, yazıcıyı durdurur ve günlüğü kapatır."""
+        await self.flush(timeout)
+        if self._task:
+            self._task.cancel()
+            try: await self._task
+            except asyncio.CancelledError: pass
+            self._task = None
+        if self._wal: self._wal.close(); self._wal = None
+        if self._executor: self._executor.shutdown(wait=False); self._executor = None
+
+    def stats(self) -> dict:
+        """Geri basınç ölçümleri: kuyruk derinliği, bekleyen kayıtlar, en eski kaydın yaşı."""
+        oldest = min((entry[1] for entry in self._pending.values()), default=None)
+        return self.metrics | {"offline": self.offline, "queue_depth": self._queue.qsize() if self._queue else 0, "pending": len(self._pending),
+                               "oldest_pending_ms": (time.monotonic() - oldest) * 1000 if oldest is not None else 0.0}
+
+trade_journal = TradeJournal(firebase_manager)
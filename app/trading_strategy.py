@@ -1,71 +1,163 @@
-import pandas as pd
+from abc import ABC, abstractmethod
+from .indicators import ATR, EMA, RSI, Bollinger, IndicatorView, Indicator, positive_float, positive_int
 
-class TradingStrategy:
+# Ad -> strateji sınıfı; `/api/start` isteğindeki `strategy` alanı bu kayıttan seçilir
+STRATEGIES: dict[str, type["Strategy"]] = {}
+DEFAULT_STRATEGY = "ema_crossover"
+
+
+def register_strategy(cls: type["Strategy"]) -> type["Strategy"]:
+    """Strateji sınıfını `name` alanıyla kayda ekler (sınıf dekoratörü)."""
+    if cls.name in STRATEGIES: raise ValueError(f"Strateji zaten kayıtlı: {cls.name}")
+    STRATEGIES[cls.name] = cls
+    return cls
+
+
+class Strategy(ABC):
     """
-    Gelen mum verilerini analiz ederek alım-satım sinyalleri üretir.
-    Mevcut strateji: Üssel Hareketli Ortalama (EMA) Kesişimi.
+    Strateji arayüzü. Strateji göstergeleri kendisi hesaplamaz: `indicators` ile ihtiyaç duyduğu
+    göstergeleri bildirir, bunlar ortak `IndicatorEngine` tarafından tüm semboller için mum başına bir
+    kez hesaplanır. `signal` bir sembolün gösterge görünümünden ham sinyali üretir ('LONG', 'SHORT',
+    'HOLD'; ısınma bitmediyse None). Tekrar önleme `apply_signal` ile sembol başına uygulanır.
+    Geçersiz parametreler kurucuda ValueError yükseltir.
     """
-    def __init__(self, short_ema_period: int = 9, long_ema_period: int = 21):
-        self.short_ema_period = short_ema_period
-        self.long_ema_period = long_ema_period
+    name = ""
+    description = ""
+
+    def __init__(self):
         # Sinyalin tekrar tekrar tetiklenmesini önlemek için son sinyali sakla
-        self.last_signal = None 
-        print(f"Ticaret Stratejisi başlatıldı: EMA({self.short_ema_period}, {self.long_ema_period})")
-
-    def analyze_klines(self, klines: list) -> str:
-        """
-        Verilen mum listesini analiz eder ve bir sinyal döndürür.
-        Sinyaller: 'LONG', 'SHORT', 'HOLD'
-
-        :param klines: Binance API'den gelen mum verisi listesi.
-        :return: Sinyal string'i.
-        """
-        if len(klines) < self.long_ema_period:
-            # Yeterli veri yoksa analiz yapma
-            return "HOLD"
+        self.last_signal = None
 
-        # 1. Gelen listeyi bir Pandas DataFrame'e dönüştür
-        df = pd.DataFrame(klines, columns=[
-            'open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time',
-            'quote_asset_volume', 'number_of_trades', 'taker_buy_base_asset_volume',
-            'taker_buy_quote_asset_volume', 'ignore'
-        ])
+    @property
+    def params(self) -> dict:
+        return {}
 
-        # 2. Gerekli sütunları sayısal tipe çevir
-        df['close'] = pd.to_numeric(df['close'])
+    @abstractmethod
+    def indicators(self) -> list[Indicator]: ...
 
-        # 3. Kısa ve Uzun Vadeli EMA'ları Hesapla
-        df['short_ema'] = df['close'].ewm(span=self.short_ema_period, adjust=False).mean()
-        df['long_ema'] = df['close'].ewm(span=self.long_ema_period, adjust=False).mean()
+    @abstractmethod
+    def signal(self, ind: IndicatorView) -> str | None: ...
 
-        # 4. Sinyal Mantığını Uygula
-        # Son iki mumu kontrol ederek kesişimin "tam şimdi" olup olmadığını anlarız.
-        # [-1] -> en son kapanan mum
-        # [-2] -> bir önceki mum
-        last_row = df.iloc[-1]
-        prev_row = df.iloc[-2]
-
-        signal = "HOLD" # Varsayılan durum
-
-        # YUKARI KESİŞİM (LONG SİNYALİ):
-        # Önceki mumda kısa EMA uzun EMA'nın altındayken,
-        # şimdiki mumda kısa EMA uzun EMA'nın üzerine çıktıysa.
-        if prev_row['short_ema'] < prev_row['long_ema'] and last_row['short_ema'] > last_row['long_ema']:
-            signal = "LONG"
-
-        # AŞAĞI KESİŞİM (SHORT SİNYALİ):
-        # Önceki mumda kısa EMA uzun EMA'nın üzerindeyken,
-        # şimdiki mumda kısa EMA uzun EMA'nın altına indiyse.
-        elif prev_row['short_ema'] > prev_row['long_ema'] and last_row['short_ema'] < last_row['long_ema']:
-            signal = "SHORT"
-            
+    def evaluate(self, ind: IndicatorView) -> str:
+        """Ham sinyali hesaplar ve tekrar önlemeyi uygular. Sinyaller: 'LONG', 'SHORT', 'HOLD'"""
+        return self.apply_signal(self.signal(ind))
+
+    def apply_signal(self, signal: str | None) -> str:
+        """Başka bir yürütücüde hesaplanan ham sinyale tekrar önlemeyi uygular."""
+        # Yeterli veri yoksa son sinyal değiştirilmez
+        if signal is None: return "HOLD"
         # Sinyal tekrarını önle
         if signal != "HOLD" and signal == self.last_signal:
             return "HOLD"
-        
         self.last_signal = signal
         return signal
 
-# Strateji nesnesini daha hassas periyotlarla global olarak oluşturalım.
-# DEĞİŞİKLİK BURADA YAPILDI:
-trading_strategy = TradingStrategy(short_ema_period=5, long_ema_period=12)
+    @staticmethod
+    def _crossover(prev_fast: float, prev_slow: float, fast: float, slow: float) -> str:
+        # Son iki mumu kontrol ederek kesişimin "tam şimdi" olup olmadığını anlarız.
+        # YUKARI KESİŞİM (LONG SİNYALİ): önceki mumda hızlı seri yavaşın altındayken şimdi üzerine çıktıysa.
+        if prev_fast < prev_slow and fast > slow:
+            return "LONG"
+        # AŞAĞI KESİŞİM (SHORT SİNYALİ): önceki mumda hızlı seri yavaşın üzerindeyken şimdi altına indiyse.
+        if prev_fast > prev_slow and fast < slow:
+            return "SHORT"
+        return "HOLD"
+
+    def __repr__(self) -> str:
+        return f"{self.name}({', '.join(f'{k}={v}' for k, v in self.params.items())})"
+
+
+@register_strategy
+class EmaCrossoverStrategy(Strategy):
+    """Kısa EMA'nın uzun EMA'yı yukarı (LONG) ya da aşağı (SHORT) kesmesi."""
+    name = "ema_crossover"
+    description = "Üssel Hareketli Ortalama (EMA) Kesişimi"
+
+    # Daha hassas periyotlar:
+    def __init__(self, short_ema_period: int = 5, long_ema_period: int = 12):
+        super().__init__()
+        short_ema_period, long_ema_period = positive_int(short_ema_period, "short_ema_period"), positive_int(long_ema_period, "long_ema_period")
+        if short_ema_period >= long_ema_period: raise ValueError(f"short_ema_period ({short_ema_period}) long_ema_period'tan ({long_ema_period}) küçük olmalı")
+        self.short_ema_period, self.long_ema_period = short_ema_period, long_ema_period
+        self.short_ema, self.long_ema = EMA(short_ema_period), EMA(long_ema_period)
+
+    @property
+    def params(self) -> dict:
+        return {"short_ema_period": self.short_ema_period, "long_ema_period": self.long_ema_period}
+
+    def indicators(self):
+        return [self.short_ema, self.long_ema]
+
+    def signal(self, ind):
+        if ind.count(self.long_ema) < self.long_ema_period: return None
+        return self._crossover(ind.prev(self.short_ema), ind.prev(self.long_ema), ind[self.short_ema], ind[self.long_ema])
+
+
+@register_strategy
+class RsiReversionStrategy(Strategy):
+    """RSI aşırı satım seviyesini yukarı kestiğinde LONG, aşırı alım seviyesini aşağı kestiğinde SHORT."""
+    name = "rsi_reversion"
+    description = "RSI aşırı alım/satım dönüşü"
+
+    def __init__(self, period: int = 14, lower: float = 30.0, upper: float = 70.0):
+        super().__init__()
+        period, lower, upper = positive_int(period), positive_float(lower, "lower"), positive_float(upper, "upper")
+        if not lower < upper < 100: raise ValueError(f"0 < lower ({lower}) < upper ({upper}) < 100 olmalı")
+        self.period, self.lower, self.upper = period, lower, upper
+        self.rsi = RSI(period)
+
+    @property
+    def params(self) -> dict:
+        return {"period": self.period, "lower": self.lower, "upper": self.upper}
+
+    def indicators(self):
+        return [self.rsi]
+
+    def signal(self, ind):
+        if ind.count(self.rsi) <= self.period + 1: return None
+        prev, rsi = ind.prev(self.rsi), ind[self.rsi]
+        if prev < self.lower <= rsi: return "LONG"
+        if prev > self.upper >= rsi: return "SHORT"
+        return "HOLD"
+
+
+@register_strategy
+class BollingerReversionStrategy(Strategy):
+    """
+    Kapanış alt banda geri döndüğünde LONG, üst banttan içeri girdiğinde SHORT.
+    Bant genişliği ATR'nin `min_width_atr` katından darsa (yatay piyasa) sinyal üretilmez.
+    """
+    name = "bollinger_reversion"
+    description = "Bollinger bandı dönüşü (ATR filtreli)"
+
+    def __init__(self, period: int = 20, width: float = 2.0, atr_period: int = 14, min_width_atr: float = 1.0):
+        super().__init__()
+        period, atr_period = positive_int(period), positive_int(atr_period, "atr_period")
+        width, min_width_atr = positive_float(width, "width"), float(min_width_atr)
+        if not min_width_atr >= 0: raise ValueError(f"min_width_atr negatif olamaz: {min_width_atr}")
+        self.period, self.width, self.atr_period, self.min_width_atr = period, width, atr_period, min_width_atr
+        self.bands, self.atr = Bollinger(period, width), ATR(atr_period)
+
+    @property
+    def params(self) -> dict:
+        return {"period": self.period, "width": self.width, "atr_period": self.atr_period, "min_width_atr": self.min_width_atr}
+
+    def indicators(self):
+        return [self.bands, self.atr]
+
+    def signal(self, ind):
+        if ind.count(self.bands) <= self.period or ind.count(self.atr) < self.atr_period: return None
+        _, prev_upper, prev_lower = ind.prev(self.bands)
+        _, upper, lower = ind[self.bands]
+        if upper - lower < self.min_width_atr * ind[self.atr]: return "HOLD"
+        if ind.prev_close < prev_lower and ind.close > lower: return "LONG"
+        if ind.prev_close > prev_upper and ind.close < upper: return "SHORT"
+        return "HOLD"
+
+
+def create_strategy(name: str = DEFAULT_STRATEGY, **params) -> Strategy:
+    """Her sembol kendi sinyal geçmişini tuttuğu için sembol başına yeni bir strateji nesnesi üretir."""
+    if name not in STRATEGIES: raise ValueError(f"Bilinmeyen strateji: {name} (mevcut: {', '.join(STRATEGIES)})")
+    strategy = STRATEGIES[name](**params)
+    print(f"Ticaret Stratejisi başlatıldı: {strategy}")
+    return strategy
@@ -0,0 +1,79 @@
+from .config import settings
+
+
+class _TrailingPosition:
+    """
+    Tek bir pozisyonun iz süren stop durumu. Fiyatlar yönle (LONG +1, SHORT -1) çarpılarak tutulur;
+    böylece LONG için tepe, SHORT için dip aynı "büyükse güncelle" karşılaştırmasıyla izlenir.
+    """
+    __slots__ = ("symbol", "side", "entry_price", "activation", "factor", "extreme", "stop", "active", "ticks")
+
+    def __init__(self, symbol: str, side: int, entry_price: float, activation_percent: float, distance_percent: float):
+        self.symbol, self.side, self.entry_price = symbol, side, entry_price
+        # İz sürme, fiyat giriş fiyatından `activation_percent` kadar kâr yönüne gidince başlar
+        self.activation = side * entry_price * (1 + side * activation_percent)
+        # LONG: tepe * (1 - mesafe), SHORT: dip * (1 + mesafe); işaretli uzayda ikisi de extreme * factor
+        self.factor = 1 - side * distance_percent
+        self.extreme = side * entry_price
+        self.stop = self.extreme * self.factor
+        self.active, self.ticks = False, 0
+
+    @property
+    def stop_price(self) -> float:
+        return self.side * self.stop
+
+    def snapshot(self) -> dict:
+        return {"side": "LONG" if self.side > 0 else "SHORT", "entry_price": self.entry_price, "extreme_price": self.side * self.extreme,
+                "stop_price": self.stop_price, "active": self.active, "ticks": self.ticks}
+
+
+class TrailingStopEngine:
+    """
+    Açık pozisyonlar için yerel iz süren stop (trailing stop).
+
+    `on_price` fiyat akışındaki (markPrice@1s / aggTrade) her tikte çağrılır ve pozisyon başına O(1)
+    iş yapar: bir sözlük araması, tepe/dip güncellemesi ve iki karşılaştırma. Tik başına liste, sözlük
+    ya da görev oluşturulmaz; yalnızca stop delindiğinde pozisyon çıkarılır ve `on_trigger(symbol, price,
+    position)` bir kez çağrılır (pozisyonu kapatan görevi başlatmak çağıranın işidir).
+    """
+    def __init__(self, on_trigger=None, activation_percent: float = settings.TRAILING_ACTIVATION_PERCENT,
+                 distance_percent: float = settings.TRAILING_DISTANCE_PERCENT):
+        self.on_trigger = on_trigger
+        self.activation_percent, self.distance_percent = activation_percent, distance_percent
+        self._positions: dict[str, _TrailingPosition] = {}
+        self.metrics = {"ticks": 0, "triggers": 0}
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def open(self, symbol: str, side: str, entry_price: float) -> _TrailingPosition:
+        """Pozisyonu izlemeye başlar; `side` 'LONG' ya da 'SHORT'."""
+        position = _TrailingPosition(symbol, 1 if side == "LONG" else -1, float(entry_price), self.activation_percent, self.distance_percent)
+        self._positions[symbol] = position
+        return position
+
+    def restore(self, position: _TrailingPosition):
+        """Tetiklenen ama kapatılamayan pozisyonu tepe/dip ve stop seviyesiyle birlikte yeniden izlemeye alır."""
+        self._positions[position.symbol] = position
+
+    def close(self, symbol: str) -> _TrailingPosition | None:
+        return self._positions.pop(symbol, None)
+
+    def on_price(self, symbol: str, price: float):
+        position = self._positions.get(symbol)
+        if position is None: return
+        self.metrics["ticks"] += 1; position.ticks += 1
+        signed = position.side * price
+        if signed > position.extreme:
+            position.extreme = signed; position.stop = signed * position.factor
+            if not position.active and signed >= position.activation: position.active = True
+        elif position.active and signed <= position.stop:
+            del self._positions[symbol]
+            self.metrics["triggers"] += 1
+            if self.on_trigger is not None: self.on_trigger(symbol, price, position)
+
+    def snapshot(self) -> dict:
+        return {symbol: position.snapshot() for symbol, position in self._positions.items()}
@@ -0,0 +1,76 @@
+"""
+Aynı mum sınırında kapanan çok sayıda sembol için "mum kapanışından karara" gecikme ölçümü.
+
+Gerçek `BotCore._handle_market_message` yolu, sahte borsa (`MockExchangeClient`) ve
+`FakeKlineStreamServer` fiyat serisiyle çalıştırılır. Her sınırda tüm sembollerin kapanış
+mesajları art arda işlenir; sinyal veren semboller sahte borsada emir açar.
+`--sequential`, her işlemin bitmesinin mesaj döngüsünde beklendiği önceki davranışı taklit eder.
+
+Kullanım:
+    python -m benchmarks.boundary_fanout --symbols 200 --boundaries 30 --mode thread
+"""
+import argparse
+import asyncio
+import json
+import time
+from app.binance_client import binance_client
+from app.bot_core import BotCore, SymbolState
+from app.config import settings
+from app.kline_store import KlineStore
+from benchmarks.mock_exchange import FakeKlineStreamServer, MockExchangeClient
+from app.price_cache import price_cache
+from app.strategy_executor import StrategyExecutor
+from app.symbol_metadata import SymbolMeta
+from app.trading_strategy import DEFAULT_STRATEGY, STRATEGIES, create_strategy
+
+
+async def run(symbols: int, boundaries: int, mode: str, latency: float, sequential: bool, strategy: str) -> dict:
+    server = FakeKlineStreamServer(interval_ms=300_000)
+    bot = BotCore()
+    bot.strategy_executor = StrategyExecutor(bot._on_signal, mode=mode)
+    binance_client.client = MockExchangeClient(latency=latency)
+    names = [f"S{i:03d}USDT" for i in range(symbols)]
+    history = bot.strategy_executor.history_size(create_strategy(strategy))
+    for name in names:
+        state = SymbolState(name, create_strategy(strategy))
+        state.meta = SymbolMeta(name, tick_size="0.0001", step_size="0.001", min_qty="0.001")
+        state.klines = KlineStore.from_klines([server.kline(name, i) for i in range(history)], history, shared=bot.strategy_executor.shared_klines)
+        bot.strategy_executor.add_symbol(state)
+        bot.symbols[name] = state
+    for index in range(history, history + boundaries):
+        for name in names:
+            price_cache.update(name, 100.0, "kline")
+            # Önceki sınırda açılan pozisyonlar bir sonraki sınırda kapanmış sayılır
+            bot.symbols[name].status["in_position"] = False
+            # Mesajlar sınırda borsadan çıkıyormuş gibi "E"/"T" zamanları şimdiye göre kurulur
+            message = json.loads(server.kline_event(f"{name.lower()}@kline_{settings.TIMEFRAME}", index))
+            message["data"]["k"]["T"] = int(time.time() * 1000) - 1
+            await bot._handle_market_message(json.dumps(message))
+            task = bot.symbols[name].trade_task
+            if sequential and task and not task.done(): await task
+        await bot.strategy_executor.drain()
+        pending = [s.trade_task for s in bot.symbols.values() if s.trade_task and not s.trade_task.done()]
+        if pending: await asyncio.gather(*pending)
+    bot.strategy_executor.finish_boundaries()
+    summary = bot.strategy_executor.summary()
+    summary.pop("last")
+    summary["strategy"] = strategy
+    signals = sum(b["signals"] for b in bot.strategy_executor.boundaries)
+    await bot.strategy_executor.close()
+    for state in bot.symbols.values(): state.klines.release()
+    return summary | {"symbols": symbols, "sequential": sequential, "signals": signals}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mum sınırında yayılma (fan-out) gecikmesi ölçümü.")
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--boundaries", type=int, default=20)
+    parser.add_argument("--mode", choices=("inline", "thread", "process"), default="inline")
+    parser.add_argument("--latency", type=float, default=0.03, help="Sahte REST gidiş-dönüş süresi (sn)")
+    parser.add_argument("--strategy", choices=list(STRATEGIES), default=DEFAULT_STRATEGY)
+    parser.add_argument("--sequential", action="store_true", help="Her işlemi mesaj döngüsünde bekle (eski davranış)")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.symbols, args.boundaries, args.mode, args.latency, args.sequential, args.strategy)), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Borsa simülatörüne karşı uçtan uca gecikme ölçümü.
+
+`ExchangeSimulator` ayrı bir süreçte çalışır; gerçek `BotCore`, gerçek `AsyncClient`,
+`BinanceSocketManager` ve `MarketStreamManager` ile ona bağlanır (REST, combined-stream ve
+kullanıcı akışı). Her sembol sayısı için temiz bir simülatör ve bot başlatılır, mumlar oynatılır ve:
+- mesaj işleme hızı (duvar saati ve işleyicide geçen süreye göre mesaj/sn),
+- mum kapanış mesajının gönderilmesinden giriş emrinin borsaya ulaşmasına kadar geçen süre (p50/p90/p99),
+- olay döngüsü gecikmesi (10 ms'lik uykunun taşması),
+- sembol başına bellek (RSS farkı)
+ölçülüp makinece okunabilir JSON olarak yazılır. `--baseline` verilirse sonuçlar önceki bir
+çalıştırmayla karşılaştırılır ve `--tolerance` üzerindeki gerilemede çıkış kodu 1 olur.
+
+Kayıtlı veri için `--data`, data.binance.vision kline CSV'lerinin (`SEMBOL-5m-YYYY-MM.csv`)
+bulunduğu dizindir; dosyası olmayan semboller sentetik mumlarla doldurulur.
+
+Kullanım:
+    python -m benchmarks.end_to_end --symbols 1 50 500 --candles 40
+    python -m benchmarks.end_to_end --symbols 50 --baseline benchmarks/results/end_to_end.json
+"""
+import argparse
+import asyncio
+import contextlib
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import aiohttp
+from app.binance_client import binance_client
+from app.bot_core import BotCore
+from app.config import settings
+from benchmarks.mock_exchange import MockTradeSink, run_simulator_process, simulated_client
+from app.order_pipeline import order_pipeline
+from app.rest_scheduler import RestScheduler
+from app.symbol_metadata import symbol_metadata
+from app.trade_journal import trade_journal
+from app.trading_strategy import DEFAULT_STRATEGY, STRATEGIES
+
+# Karşılaştırılan ölçümler: (yol, daha büyüğü daha kötü mü)
+REGRESSION_CHECKS = ((("close_to_order_ms", "p99"), True), (("loop_lag_ms", "p99"), True),
+                     (("throughput", "handler_messages_per_sec"), False), (("memory", "rss_per_symbol_kb"), True))
+
+
+def rss_kb() -> float:
+    try:
+        with open("/proc/self/statm") as f: return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # Linux dışı: tepe RSS
+
+
+def percentiles(values: list[float]) -> dict:
+    ordered = sorted(values)
+    if not ordered: return {"count": 0, "p50": None, "p90": None, "p99": None, "max": None}
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+    return {"count": len(ordered), "p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99), "max": round(ordered[-1], 3)}
+
+
+def symbol_names(count: int, data_dir: str | None) -> list[str]:
+    recorded = sorted({os.path.basename(p).split("-")[0].upper() for p in glob.glob(os.path.join(data_dir, "*.csv"))}) if data_dir else []
+    return (recorded + [f"S{i:03d}USDT" for i in range(count)])[:count]
+
+
+async def monitor_loop_lag(samples: list[float], interval: float = 0.01):
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - started - interval) * 1000)
+
+
+async def run(symbols: int, candles: int, candle_seconds: float, strategy: str, data_dir: str | None, workdir: str) -> dict:
+    names = symbol_names(symbols, data_dir)
+    parent, child = multiprocessing.Pipe()
+    simulator = multiprocessing.Process(target=run_simulator_process, args=(child, names), daemon=True,
+                                        kwargs={"data_dir": data_dir, "history": settings.KLINE_HISTORY_LIMIT, "candle_seconds": candle_seconds})
+    simulator.start()
+    base_url = parent.recv()
+    client, bsm = simulated_client(base_url)
+    binance_client.client, binance_client.bsm, binance_client.scheduler = client, bsm, RestScheduler()
+    settings.WEBSOCKET_URL = base_url.replace("http", "ws", 1)
+    symbol_metadata.cache_path, symbol_metadata.loaded_at = os.path.join(workdir, f"exchange_info_{symbols}.json"), 0.0
+    order_pipeline.latencies.clear()
+    async with aiohttp.ClientSession() as session:
+        async def control(action: str, **params) -> dict:
+            async with session.post(f"{base_url}/sim/{action}", params=params) as response: return await response.json()
+
+        bot = BotCore()
+        rss_before = rss_kb()
+        started = time.perf_counter()
+        await asyncio.gather(*(bot.start(name, strategy) for name in names))
+        expected = sum(len(state.streams) for state in bot.symbols.values())
+        while (await control("stats"))["subscribed_streams"] < expected: await asyncio.sleep(0.05)
+        startup_seconds = time.perf_counter() - started
+        rss_per_symbol = (rss_kb() - rss_before) / max(1, len(bot.symbols))
+
+        # Mesaj sayısı ve işleyicide geçen süre, gerçek işleyici sarmalanarak ölçülür
+        counters = {"messages": 0, "busy": 0.0}
+        handler = bot.market_streams.on_message
+        async def timed(message):
+            t0 = time.perf_counter()
+            await handler(message)
+            counters["messages"] += 1; counters["busy"] += time.perf_counter() - t0
+        bot.market_streams.on_message = timed
+        lag: list[float] = []
+        lag_task = asyncio.create_task(monitor_loop_lag(lag))
+        replay_started = time.perf_counter()
+        await control("start", candles=candles)
+        while not (stats := await control("stats"))["finished"]: await asyncio.sleep(0.2)
+        # Son kapanışın tetiklediği emirlerin tamamlanmasını bekle
+        await bot.strategy_executor.drain()
+        pending = [s.trade_task for s in bot.symbols.values() if s.trade_task and not s.trade_task.done()]
+        if pending: await asyncio.gather(*pending, return_exceptions=True)
+        replay_seconds = time.perf_counter() - replay_started
+        lag_task.cancel()
+        stats = await control("stats")
+        result = {
+            "symbols": len(names), "started_symbols": len(bot.symbols), "startup_seconds": round(startup_seconds, 3),
+            "throughput": {"messages": counters["messages"], "replay_seconds": round(replay_seconds, 3),
+                           "messages_per_sec": round(counters["messages"] / replay_seconds, 1),
+                           "handler_messages_per_sec": round(counters["messages"] / counters["busy"], 1) if counters["busy"] else None},
+            "close_to_order_ms": stats["close_to_order_ms"],
+            "signal_to_protected_ms": order_pipeline.latency_summary(),
+            "loop_lag_ms": percentiles(lag),
+            "memory": {"rss_before_kb": round(rss_before), "rss_per_symbol_kb": round(rss_per_symbol, 1)},
+            "exchange": {key: stats[key] for key in ("requests", "rejected", "max_used_weight", "orders", "stop_fills", "user_events", "market_messages", "candles")},
+            "rest_scheduler": binance_client.scheduler.snapshot(),
+            "strategy": {key: value for key, value in bot.strategy_executor.summary().items() if key != "last"},
+        }
+        await bot.stop()
+        await control("shutdown")
+    simulator.join(timeout=5)
+    if simulator.is_alive(): simulator.terminate()
+    return result
+
+
+def compare(results: list[dict], baseline: dict, tolerance: float) -> list[str]:
+    """Aynı sembol sayısındaki ölçümleri temel çalıştırmayla karşılaştırır; gerilemeleri döndürür."""
+    previous = {run["symbols"]: run for run in baseline.get("runs", [])}
+    regressions = []
+    for run in results:
+        base = previous.get(run["symbols"])
+        if base is None: continue
+        for (section, key), higher_is_worse in REGRESSION_CHECKS:
+            now, before = run[section].get(key), base.get(section, {}).get(key)
+            if now is None or not before: continue
+            change = (now - before) / before
+            if (change > tolerance) if higher_is_worse else (change < -tolerance):
+                regressions.append(f"{run['symbols']} sembol {section}.{key}: {before} -> {now} ({change:+.0%})")
+    return regressions
+
+
+def git_commit() -> str | None:
+    try: return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError): return None
+
+
+async def main_async(args) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        trade_journal.sink, trade_journal.wal_path = MockTradeSink(latency=0.0), os.path.join(workdir, "trade_journal.jsonl")
+        trade_journal.start()
+        for count in args.symbols:
+            # Bot çıktısı ölçüme dahildir ama ekrana basılmaz
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                result = await run(count, args.candles, args.candle_seconds, args.strategy, args.data, workdir)
+            results.append(result)
+            print(f"{count} sembol: {result['throughput']['messages_per_sec']} mesaj/sn, kapanış->emir p99 {result['close_to_order_ms']['p99']} ms, "
+                  f"döngü gecikmesi p99 {result['loop_lag_ms']['p99']} ms, {result['memory']['rss_per_symbol_kb']} KB/sembol", file=sys.stderr)
+        await trade_journal.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Borsa simülatörüne karşı uçtan uca gecikme ölçümü.")
+    parser.add_argument("--symbols", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--candles", type=int, default=40, help="Oynatılacak mum sayısı")
+    parser.add_argument("--candle-seconds", type=float, default=0.5, help="Bir mumun oynatılma süresi (sn)")
+    parser.add_argument("--strategy", choices=list(STRATEGIES), default=DEFAULT_STRATEGY)
+    parser.add_argument("--data", help="Kaydedilmiş kline CSV dizini (yoksa sentetik mumlar)")
+    parser.add_argument("--output", default="benchmarks/results/end_to_end.json")
+    parser.add_argument("--baseline", help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="İzin verilen göreli gerileme")
+    args = parser.parse_args()
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f: baseline = json.load(f)  # Çıktı aynı dosyaya yazılabilir
+    results = asyncio.run(main_async(args))
+    report = {"meta": {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+                       "cpu_count": os.cpu_count(), "timestamp": time.time(), "timeframe": settings.TIMEFRAME,
+                       "executor": settings.STRATEGY_EXECUTOR, "candles": args.candles, "candle_seconds": args.candle_seconds,
+                       "strategy": args.strategy, "data": args.data}, "runs": results}
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f: json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions: print(f"GERİLEME: {line}", file=sys.stderr)
+        if regressions: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,526 @@
+"""
+Gerçek Binance uç noktaları olmadan emir akışlarını ölçmek için yerel sahte borsa.
+
+`MockExchangeClient`, `AsyncClient`'ın botun kullandığı emir uçlarını taklit eder: her
+REST çağrısı ayarlanabilir bir gecikmeyle yanıtlanır, piyasa emirleri dolar ve dolumlar
+kullanıcı akışındaki gibi ORDER_TRADE_UPDATE olayı olarak `on_event` geri çağrısına iletilir.
+`MockTradeSink`, `TradeJournal` için Firebase yerine kullanılabilen yerel bir depodur.
+`FakeKlineStreamServer`, bağlantıları bilerek düşüren yerel bir piyasa akışı sunucusudur.
+`ExchangeSimulator`, gerçek `AsyncClient` ve `BotCore`'un bağlanabildiği REST + websocket borsa taklididir.
+"""
+import asyncio
+import csv
+import glob
+import itertools
+import json
+import math
+import os
+import threading
+import time
+import zlib
+from urllib.parse import parse_qs, urlparse
+import websockets
+from aiohttp import web
+
+# python-binance bu türleri `futures_create_order` içinde koşullu (algo) emir uç noktasına yönlendirir
+CONDITIONAL_ORDER_TYPES = ("STOP", "STOP_MARKET", "TAKE_PROFIT", "TAKE_PROFIT_MARKET", "TRAILING_STOP_MARKET")
+
+
+def synthetic_kline(symbol: str, index: int, interval_ms: int, start_time: int) -> list:
+    """Sembole göre belirlenimli sinüs dalgası fiyatlı `index`. mum (REST biçiminde)."""
+    phase = zlib.crc32(symbol.encode()) % 100 / 10
+    close = 100 + 5 * math.sin(index / 7 + phase)
+    open_ = 100 + 5 * math.sin((index - 1) / 7 + phase)
+    open_time = start_time + index * interval_ms
+    return [open_time, f"{open_:.4f}", f"{max(open_, close) + 0.1:.4f}", f"{min(open_, close) - 0.1:.4f}", f"{close:.4f}",
+            "10.0", open_time + interval_ms - 1, f"{10 * close:.4f}", 10, "5.0", f"{5 * close:.4f}", "0"]
+
+
+class MockExchangeClient:
+    def __init__(self, price: float = 100.0, latency: float = 0.03, fill_delay: float = 0.005,
+                 event_delay: float = 0.01, result_fills: bool = True, on_event=None):
+        """
+        :param latency: Her REST isteğinin tek yönlü olmayan (gidiş-dönüş) süresi (sn).
+        :param fill_delay: Piyasa emrinin eşleşme süresi (sn).
+        :param event_delay: Dolumun kullanıcı akışından ulaşma gecikmesi (sn).
+        :param result_fills: False ise emir yanıtı dolumu içermez (newOrderRespType=ACK gibi).
+        """
+        self.price, self.latency, self.fill_delay, self.event_delay = price, latency, fill_delay, event_delay
+        # Sembole özel fiyatlar (yoksa `price`)
+        self.prices: dict[str, float] = {}
+        self.result_fills, self.on_event = result_fills, on_event
+        self.orders: dict[str, dict] = {}
+        # sembol -> (net pozisyon miktarı (LONG pozitif), giriş fiyatı); emir dolumlarından tutulur
+        self.positions: dict[str, tuple[float, float]] = {}
+        self.commission_rate = 0.0004
+        self.requests: list[tuple[float, str, dict]] = []
+        self._order_ids = itertools.count(1)
+        self._trade_ids = itertools.count(1)
+
+    async def _round_trip(self, endpoint: str, params: dict):
+        self.requests.append((time.perf_counter(), endpoint, params))
+        await asyncio.sleep(self.latency)
+
+    async def _emit(self, order: dict, trade: dict | None = None):
+        await asyncio.sleep(self.event_delay)
+        if not self.on_event: return
+        now = int(time.time() * 1000)
+        await self.on_event({"e": "ORDER_TRADE_UPDATE", "E": now, "T": now, "o": {
+            "s": order["symbol"], "c": order["clientOrderId"], "S": order["side"], "o": order["type"], "i": order["orderId"],
+            "x": "TRADE" if trade else order["status"], "X": order["status"], "ap": order["avgPrice"], "z": order["executedQty"],
+            "p": "0", "R": order["reduceOnly"], "ps": "BOTH", **(trade or {"rp": "0"})}})
+        if trade:
+            amount, entry = self.positions.get(order["symbol"], (0.0, 0.0))
+            await self.on_event({"e": "ACCOUNT_UPDATE", "E": now, "T": now, "a": {"m": "ORDER", "B": [], "P": [
+                {"s": order["symbol"], "pa": str(amount), "ep": str(entry), "up": "0", "mt": "cross", "ps": "BOTH"}]}})
+
+    def _fill(self, order: dict, quantity: float, price: float) -> dict:
+        """Emri `price` fiyatından doldurur, pozisyonu günceller ve kullanıcı akışı dolum alanlarını döndürür."""
+        order.update(status="FILLED", avgPrice=str(price), executedQty=str(quantity))
+        signed = quantity * (1 if order["side"] == "BUY" else -1)
+        amount, entry = self.positions.get(order["symbol"], (0.0, 0.0))
+        realized = 0.0
+        if amount and (amount > 0) != (signed > 0):
+            closed = min(abs(amount), quantity)
+            realized = closed * (price - entry) * (1 if amount > 0 else -1)
+        new_amount = round(amount + signed, 12)
+        if new_amount == 0: entry = 0.0
+        elif amount == 0 or (amount > 0) == (signed > 0): entry = (abs(amount) * entry + quantity * price) / abs(new_amount)
+        elif (new_amount > 0) != (amount > 0): entry = price  # Pozisyon ters yöne döndü
+        self.positions[order["symbol"]] = (new_amount, entry)
+        commission = quantity * price * self.commission_rate
+        return {"t": next(self._trade_ids), "L": str(price), "l": str(quantity), "rp": str(realized), "n": str(commission), "N": "USDT"}
+
+    async def futures_create_order(self, **params):
+        await self._round_trip("order", params)
+        order = {"orderId": next(self._order_ids), "symbol": params["symbol"], "side": params["side"],
+                 "type": params["type"], "clientOrderId": params.get("newClientOrderId", ""), "reduceOnly": bool(params.get("reduceOnly")),
+                 "status": "NEW", "avgPrice": "0", "executedQty": "0", "stopPrice": params.get("stopPrice", "0"),
+                 "conditional": params["type"] in CONDITIONAL_ORDER_TYPES}
+        self.orders[order["clientOrderId"] or str(order["orderId"])] = order
+        if params["type"] == "MARKET":
+            async def fill():
+                await asyncio.sleep(self.fill_delay)
+                trade = self._fill(order, float(params["quantity"]), self.prices.get(params["symbol"], self.price))
+                await self._emit(order, trade)
+            if self.result_fills:
+                await fill(); return dict(order)
+            asyncio.create_task(fill())
+        return dict(order)
+
+    async def trigger_stop(self, symbol: str, order_type: str, price: float | None = None, order: dict | None = None) -> dict | None:
+        """
+        Bekleyen TAKE_PROFIT_MARKET / STOP_MARKET emrini (verilmezse o türdeki ilk emri) tetikler;
+        `closePosition` emri tüm pozisyonu kapatır.
+        """
+        order = order or next((o for o in self.orders.values() if o["symbol"] == symbol and o["type"] == order_type and o["status"] == "NEW"), None)
+        amount = self.positions.get(symbol, (0.0, 0.0))[0]
+        if order is None: return None
+        if not amount:
+            order["status"] = "EXPIRED"; return None  # Kapatılacak pozisyon yok
+        trade = self._fill(order, abs(amount), price if price is not None else float(order["stopPrice"]))
+        await self._emit(order, trade)
+        return order
+
+    async def futures_get_order(self, **params):
+        await self._round_trip("order/get", params)
+        return dict(self.orders.get(params.get("origClientOrderId", ""), {"status": "NEW"}))
+
+    async def futures_cancel_all_open_orders(self, conditional: bool = False, **params):
+        """Gerçek borsadaki gibi normal emirler ve koşullu (algo) emirler ayrı ayrı iptal edilir."""
+        await self._round_trip("algoOpenOrders" if conditional else "allOpenOrders", params)
+        for order in self.orders.values():
+            if order["symbol"] == params["symbol"] and order["status"] == "NEW" and order["conditional"] == conditional:
+                order["status"] = "CANCELED"
+        return {"code": 200, "msg": "The operation of cancel all open order is done."}
+
+    async def futures_position_information(self, **params):
+        await self._round_trip("positionRisk", params)
+        symbols = [params["symbol"]] if params.get("symbol") else list(self.positions)
+        return [{"symbol": symbol, "positionAmt": str(self.positions.get(symbol, (0.0, 0.0))[0]),
+                 "entryPrice": str(self.positions.get(symbol, (0.0, 0.0))[1])} for symbol in symbols]
+
+    async def futures_account(self, **params):
+        await self._round_trip("account", params)
+        return {"assets": [{"asset": "USDT", "walletBalance": "10000", "crossWalletBalance": "10000"}],
+                "positions": [{"symbol": symbol, "positionAmt": str(amount), "entryPrice": str(entry), "positionSide": "BOTH",
+                               "unrealizedProfit": str((self.prices.get(symbol, self.price) - entry) * amount), "updateTime": 0}
+                              for symbol, (amount, entry) in self.positions.items()]}
+
+    async def futures_symbol_ticker(self, **params):
+        await self._round_trip("ticker/price", params)
+        return {"symbol": params["symbol"], "price": str(self.prices.get(params["symbol"], self.price))}
+
+
+class MockTradeSink:
+    """`FirebaseManager.write_trades` taklidi: gecikme ve hata enjekte edilebilir, yazılanları saklar."""
+    def __init__(self, latency: float = 0.05, fail: bool = False, configured: bool = True):
+        self.latency, self.fail, self.configured = latency, fail, configured
+        self.records: dict[str, dict] = {}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def write_trades(self, records: dict[str, dict]):
+        time.sleep(self.latency)  # Bloklayan ağ çağrısı gibi davranır
+        if self.fail: raise ConnectionError("Sahte depo erişilemez")
+        with self._lock:
+            self.calls += 1; self.records.update(records)
+
+
+class FakeKlineStreamServer:
+    """
+    Binance combined-stream (`/stream?streams=...`) taklidi yapan yerel websocket sunucusu.
+
+    Her `tick` saniyede bir, abone olunan her sembol için bir sonraki mumun kapanış olayını
+    (`x=True`) gönderir; fiyatlar sembole göre belirlenimli bir sinüs dalgasıdır. `drop_every`
+    verilirse her bağlantı o kadar mesajdan sonra bilerek (TCP bağlantısı koparılarak) düşürülür;
+    bağlantı yokken kapanan mumlar kaçırılır ve `futures_klines` ile REST'ten tamamlanabilir.
+    """
+    def __init__(self, interval_ms: int = 60_000, tick: float = 0.05, drop_every: int | None = None,
+                 start_time: int = 1_700_000_000_000):
+        self.interval_ms, self.tick, self.drop_every, self.start_time = interval_ms, tick, drop_every, start_time
+        self.closed_candles = 0
+        self.connections: dict = {}
+        self.drops = 0
+        self._server = None
+        self._clock: asyncio.Task | None = None
+
+    def kline(self, symbol: str, index: int) -> list:
+        """`index`. mumu REST biçiminde döndürür."""
+        return synthetic_kline(symbol, index, self.interval_ms, self.start_time)
+
+    def kline_event(self, stream: str, index: int) -> str:
+        """`index`. mumun combined-stream kapanış mesajı."""
+        symbol = stream.split('@')[0].upper()
+        k = self.kline(symbol, index)
+        return json.dumps({"stream": stream, "data": {"e": "kline", "E": int(time.time() * 1000), "s": symbol, "k": {
+            "t": k[0], "T": k[6], "s": symbol, "i": stream.split('_')[-1], "o": k[1], "c": k[4], "h": k[2], "l": k[3],
+            "v": k[5], "n": k[8], "x": True, "q": k[7], "V": k[9], "Q": k[10]}}})
+
+    async def futures_klines(self, symbol: str, interval: str, limit: int = 500, startTime: int | None = None, endTime: int | None = None):
+        """`AsyncClient.futures_klines` taklidi: yalnızca kapanmış mumlar döner."""
+        last = self.closed_candles - 1
+        first = 0 if startTime is None else max(0, -(-(startTime - self.start_time) // self.interval_ms))
+        if endTime is not None: last = min(last, (endTime - self.start_time) // self.interval_ms)
+        if startTime is None: first = max(0, last - limit + 1)
+        return [self.kline(symbol, i) for i in range(first, min(last + 1, first + limit))]
+
+    async def _handler(self, ws):
+        query = parse_qs(urlparse(ws.request.path).query)
+        streams = set(query.get("streams", [""])[0].split('/')) - {""}
+        self.connections[ws] = [streams, 0]
+        try:
+            async for raw in ws:
+                request = json.loads(raw)
+                if request.get("method") == "SUBSCRIBE": streams.update(request["params"])
+                elif request.get("method") == "UNSUBSCRIBE": streams.difference_update(request["params"])
+                await ws.send(json.dumps({"result": None, "id": request.get("id")}))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self.connections.pop(ws, None)
+
+    async def _run_clock(self):
+        while True:
+            await asyncio.sleep(self.tick)
+            index = self.closed_candles; self.closed_candles += 1
+            for ws, entry in list(self.connections.items()):
+                streams = entry[0]
+                for stream in list(streams):
+                    if self.drop_every and entry[1] >= self.drop_every:
+                        self.drops += 1; self.connections.pop(ws, None)
+                        ws.transport.abort(); break
+                    try: await ws.send(self.kline_event(stream, index))
+                    except websockets.exceptions.ConnectionClosed: break
+                    entry[1] += 1
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Sunucuyu başlatır ve `settings.WEBSOCKET_URL` yerine kullanılacak adresi döndürür."""
+        self._server = await websockets.serve(self._handler, host, port)
+        self._clock = asyncio.create_task(self._run_clock())
+        host, port = next(iter(self._server.sockets)).getsockname()[:2]
+        return f"ws://{host}:{port}"
+
+    async def close(self):
+        if self._clock: self._clock.cancel()
+        if self._server: self._server.close(); await self._server.wait_closed()
+
+
+# Uç nokta -> dakikalık IP ağırlığı (Binance USDⓈ-M dokümantasyonu); "YÖNTEM uç" anahtarı önceliklidir.
+# Emir gönderimi IP ağırlığına sayılmaz (ayrı emir sayısı sınırı vardır).
+ENDPOINT_WEIGHTS = {"exchangeInfo": 1, "leverage": 1, "POST order": 0, "order": 1, "POST algoOrder": 0, "allOpenOrders": 1,
+                    "algoOpenOrders": 1, "ticker/price": 1, "account": 5, "positionRisk": 5, "userTrades": 5, "listenKey": 1}
+
+
+def request_weight(method: str, endpoint: str, params: dict) -> int:
+    if endpoint == "klines":
+        limit = int(params.get("limit", 500))
+        return 1 if limit < 100 else 2 if limit < 500 else 5 if limit <= 1000 else 10
+    return ENDPOINT_WEIGHTS.get(f"{method} {endpoint}", ENDPOINT_WEIGHTS.get(endpoint, 1))
+
+
+class ExchangeSimulator:
+    """
+    Binance USDⓈ-M vadeli REST API'si, combined-stream piyasa akışı ve kullanıcı akışının yerel taklidi.
+
+    Gerçek `AsyncClient`/`BinanceSocketManager` (bkz. `simulated_client`) ve `MarketStreamManager`
+    doğrudan bu sunucuya bağlanır. Mumlar kaydedilmiş dosyalardan (data.binance.vision kline CSV'leri,
+    `SEMBOL-*.csv`) ya da `synthetic_kline` ile üretilir ve `candle_seconds` saniyede bir mum olacak
+    hızda oynatılır. Her mum açılış -> (düşüş/yükseliş) -> kapanış yolunu dört adımda izler; her adımda
+    abone olunan kline ve markPrice akışlarına mesaj gider, bekleyen TP/SL emirleri fiyat geçtiyse dolar.
+    Emirler `MockExchangeClient` üzerinden işlenir; dolumlar kullanıcı akışına ORDER_TRADE_UPDATE ve
+    ACCOUNT_UPDATE olarak iletilir. Yanıtlar `X-MBX-USED-WEIGHT-1M` başlığını taşır; dakikalık ağırlık
+    `weight_limit`'i aşarsa 429 döner. Koşullu emirler yalnızca `algoOpenOrders` ile iptal edilir; pozisyon
+    kapandığında kendiliğinden silinmez, tetiklendiğinde kapatılacak pozisyon yoksa EXPIRED olur.
+    """
+    def __init__(self, symbols: list[str], data_dir: str | None = None, interval_ms: int = 300_000, history: int = 50,
+                 candle_seconds: float = 0.5, weight_limit: int = 2400, start_time: int | None = None):
+        self.interval_ms, self.history, self.candle_seconds, self.weight_limit = interval_ms, history, candle_seconds, weight_limit
+        # Sentetik geçmiş şimdiye kadar uzanır; oynatma hızlandırıldığında sonraki mumların zamanı ileri kayar
+        self.start_time = start_time if start_time is not None else (int(time.time() * 1000) // interval_ms - history) * interval_ms
+        self.series: dict[str, list[list]] = self._load_series(data_dir) if data_dir else {}
+        self.symbols = list(symbols) or list(self.series)
+        self.engine = MockExchangeClient(latency=0.0, fill_delay=0.0, event_delay=0.0, on_event=self._push_user_event)
+        # Sıradaki kapanacak mumun indeksi; REST geçmişi bundan öncekileri döndürür
+        self.index = history
+        self.market: dict[web.WebSocketResponse, set[str]] = {}
+        self.users: set[web.WebSocketResponse] = set()
+        self._stops: dict[str, list[dict]] = {}
+        self._close_sent: dict[str, float] = {}
+        self._weight = [0, 0]  # [dakika, kullanılan ağırlık]
+        self.close_to_order_ms: list[float] = []
+        self.metrics = {"requests": 0, "rejected": 0, "market_messages": 0, "user_events": 0, "orders": 0, "stop_fills": 0,
+                        "candles": 0, "max_used_weight": 0}
+        self.running = self.finished = False
+        self._clock: asyncio.Task | None = None
+        self._stopped = asyncio.Event()
+        self._runner: web.AppRunner | None = None
+        self._routes = {
+            ("GET", "exchangeInfo"): self._exchange_info, ("GET", "klines"): self._klines,
+            ("POST", "leverage"): self._leverage, ("POST", "order"): self._create_order,
+            ("GET", "order"): self.engine.futures_get_order, ("DELETE", "allOpenOrders"): self._cancel_all,
+            ("POST", "algoOrder"): self._create_algo_order, ("DELETE", "algoOpenOrders"): self._cancel_all_algo,
+            ("GET", "ticker/price"): self.engine.futures_symbol_ticker, ("GET", "account"): self.engine.futures_account,
+            ("GET", "positionRisk"): self.engine.futures_position_information, ("GET", "userTrades"): self._user_trades,
+            ("POST", "listenKey"): self._listen_key, ("PUT", "listenKey"): self._listen_key,
+            ("DELETE", "listenKey"): self._listen_key,
+        }
+
+    @staticmethod
+    def _load_series(data_dir: str) -> dict[str, list[list]]:
+        series = {}
+        for path in sorted(glob.glob(os.path.join(data_dir, "*.csv"))):
+            with open(path, newline="") as f:
+                rows = [row for row in csv.reader(f) if row and row[0].isdigit()]  # Başlık satırı atlanır
+            if rows: series[os.path.basename(path).split("-")[0].upper()] = [[int(r[0]), *r[1:6], int(r[6]), *r[7:12]] for r in rows]
+        return series
+
+    def kline(self, symbol: str, index: int) -> list:
+        rows = self.series.get(symbol)
+        if rows: return rows[index % len(rows)]
+        return synthetic_kline(symbol, index, self.interval_ms, self.start_time)
+
+    # --- REST ---
+    async def _rest(self, request: web.Request) -> web.Response:
+        # Sürüm yol eşlemesinde dikkate alınmaz: "/fapi/v2/ticker/price" -> "ticker/price"
+        endpoint = request.match_info["endpoint"]
+        handler = self._routes.get((request.method, endpoint))
+        if handler is None: return web.json_response({"code": -5000, "msg": f"Bilinmeyen yol: {request.path}"}, status=404)
+        params = dict(request.query) | dict(await request.post())
+        minute = int(time.time() // 60)
+        if self._weight[0] != minute: self._weight = [minute, 0]
+        self._weight[1] += request_weight(request.method, endpoint, params)
+        self.metrics["requests"] += 1; self.metrics["max_used_weight"] = max(self.metrics["max_used_weight"], self._weight[1])
+        headers = {"X-MBX-USED-WEIGHT-1M": str(self._weight[1])}
+        if self._weight[1] > self.weight_limit:
+            self.metrics["rejected"] += 1
+            return web.json_response({"code": -1003, "msg": "Too many requests."}, status=429, headers=headers | {"Retry-After": str(60 - int(time.time()) % 60)})
+        # python-binance mantıksal değerleri "true"/"false" metni olarak gönderir
+        params = {k: (v.lower() == "true") if v.lower() in ("true", "false") else v for k, v in params.items() if k not in ("timestamp", "signature", "recvWindow")}
+        return web.json_response(await handler(**params), headers=headers)
+
+    async def _exchange_info(self, **params):
+        filters = [{"filterType": "PRICE_FILTER", "tickSize": "0.0001"}, {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001", "maxQty": "100000"},
+                   {"filterType": "MARKET_LOT_SIZE", "stepSize": "0.001", "minQty": "0.001", "maxQty": "10000"}, {"filterType": "MIN_NOTIONAL", "notional": "5"}]
+        return {"symbols": [{"symbol": symbol, "status": "TRADING", "pricePrecision": 4, "quantityPrecision": 3, "filters": filters} for symbol in self.symbols]}
+
+    async def _klines(self, symbol: str, interval: str, limit: str = "500", startTime: str | None = None, endTime: str | None = None):
+        """Yalnızca kapanmış mumlar; `startTime`/`endTime` mum açılış zamanına göre süzülür."""
+        closed = [self.kline(symbol, i) for i in range(max(0, self.index - 1500), self.index)]
+        if startTime is not None: closed = [k for k in closed if k[0] >= int(startTime)]
+        if endTime is not None: closed = [k for k in closed if k[0] <= int(endTime)]
+        return closed[:int(limit)] if startTime is not None else closed[-int(limit):]
+
+    async def _leverage(self, symbol: str, leverage: str, **params):
+        return {"symbol": symbol, "leverage": int(leverage), "maxNotionalValue": "1000000"}
+
+    async def _create_order(self, **params):
+        symbol = params["symbol"]
+        if params["type"] == "MARKET" and not params.get("reduceOnly"):
+            # Mum kapanış mesajının gönderilmesinden giriş emrinin borsaya ulaşmasına kadar geçen süre
+            sent = self._close_sent.get(symbol)
+            if sent is not None: self.close_to_order_ms.append((time.perf_counter() - sent) * 1000)
+        self.metrics["orders"] += 1
+        return await self.engine.futures_create_order(**params)
+
+    async def _create_algo_order(self, **params):
+        """Koşullu emirler (TP/SL) python-binance tarafından `algoOrder` uç noktasına `triggerPrice` ile gönderilir."""
+        params = params | {"stopPrice": params.pop("triggerPrice"), "newClientOrderId": params.pop("clientAlgoId")}
+        self.metrics["orders"] += 1
+        order = await self.engine.futures_create_order(**params)
+        self._stops.setdefault(params["symbol"], []).append(self.engine.orders[order["clientOrderId"]])
+        return {"algoId": order["orderId"], "clientAlgoId": order["clientOrderId"], "algoType": "CONDITIONAL", "orderType": order["type"],
+                "symbol": order["symbol"], "side": order["side"], "triggerPrice": order["stopPrice"], "algoStatus": "NEW"}
+
+    async def _cancel_all(self, symbol: str, **params):
+        return await self.engine.futures_cancel_all_open_orders(symbol=symbol)
+
+    async def _cancel_all_algo(self, symbol: str, **params):
+        self._stops.pop(symbol, None)
+        return await self.engine.futures_cancel_all_open_orders(symbol=symbol, conditional=True)
+
+    async def _user_trades(self, **params):
+        return []
+
+    async def _listen_key(self, **params):
+        return {"listenKey": "simulator"}
+
+    # --- Websocket ---
+    async def _stream(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(); await ws.prepare(request)
+        streams = set(request.query.get("streams", "").split('/')) - {""}
+        self.market[ws] = streams
+        try:
+            async for message in ws:
+                payload = json.loads(message.data)
+                if payload.get("method") == "SUBSCRIBE": streams.update(payload["params"])
+                elif payload.get("method") == "UNSUBSCRIBE": streams.difference_update(payload["params"])
+                await ws.send_str(json.dumps({"result": None, "id": payload.get("id")}))
+        finally:
+            self.market.pop(ws, None)
+        return ws
+
+    async def _user_stream(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(); await ws.prepare(request)
+        self.users.add(ws)
+        try:
+            async for _ in ws: pass
+        finally:
+            self.users.discard(ws)
+        return ws
+
+    async def _push_user_event(self, event: dict):
+        text = json.dumps(event)
+        self.metrics["user_events"] += 1
+        for ws in list(self.users):
+            try: await ws.send_str(text)
+            except ConnectionError: self.users.discard(ws)
+
+    def _market_message(self, stream: str, row: list, price: float, closed: bool) -> str | None:
+        symbol, _, kind = stream.partition('@')
+        symbol, now = symbol.upper(), int(time.time() * 1000)
+        if kind.startswith("kline_"):
+            return json.dumps({"stream": stream, "data": {"e": "kline", "E": now, "s": symbol, "k": {
+                "t": row[0], "T": row[6], "s": symbol, "i": kind[6:], "o": row[1], "c": f"{price:.4f}", "h": row[2], "l": row[3],
+                "v": row[5], "n": row[8], "x": closed, "q": row[7], "V": row[9], "Q": row[10]}}})
+        if kind.startswith("markPrice"):
+            return json.dumps({"stream": stream, "data": {"e": "markPriceUpdate", "E": now, "s": symbol, "p": f"{price:.4f}"}})
+        if kind == "bookTicker":
+            return json.dumps({"stream": stream, "data": {"e": "bookTicker", "E": now, "s": symbol, "b": f"{price:.4f}", "a": f"{price:.4f}"}})
+        return None
+
+    async def _run_clock(self, candles: int):
+        step_delay = self.candle_seconds / 4
+        for _ in range(candles):
+            rows = {symbol: self.kline(symbol, self.index) for symbol in self.symbols}
+            # Yükselen mumda önce dip, düşen mumda önce tepe görülür
+            paths = {symbol: [float(r[1]), float(r[3]), float(r[2]), float(r[4])] if float(r[4]) >= float(r[1]) else
+                     [float(r[1]), float(r[2]), float(r[3]), float(r[4])] for symbol, r in rows.items()}
+            for step in range(4):
+                await asyncio.sleep(step_delay)
+                closed = step == 3
+                if closed: self.index += 1; self.metrics["candles"] += 1  # Kapanan mum REST geçmişinde de görünür
+                for symbol, path in paths.items(): self.engine.prices[symbol] = path[step]
+                for ws, streams in list(self.market.items()):
+                    for stream in list(streams):
+                        symbol = stream.partition('@')[0].upper()
+                        if symbol not in rows: continue
+                        text = self._market_message(stream, rows[symbol], paths[symbol][step], closed)
+                        if text is None: continue
+                        if closed and "@kline_" in stream: self._close_sent[symbol] = time.perf_counter()
+                        try: await ws.send_str(text)
+                        except ConnectionError: break
+                        self.metrics["market_messages"] += 1
+                await self._check_stops()
+        self.finished = True
+
+    async def _check_stops(self):
+        for symbol, orders in list(self._stops.items()):
+            price = self.engine.prices.get(symbol)
+            for order in list(orders):
+                if order["status"] != "NEW": orders.remove(order); continue
+                stop, buy = float(order["stopPrice"]), order["side"] == "BUY"
+                take_profit = order["type"] == "TAKE_PROFIT_MARKET"
+                # SELL (LONG çıkışı): TP fiyat yükselince, SL düşünce; BUY (SHORT çıkışı) tersi
+                if (price >= stop) == (take_profit != buy) or price == stop:
+                    orders.remove(order)
+                    if await self.engine.trigger_stop(symbol, order["type"], stop, order): self.metrics["stop_fills"] += 1
+            if not orders: self._stops.pop(symbol, None)
+
+    # --- Kontrol ---
+    async def _control(self, request: web.Request) -> web.Response:
+        action = request.match_info["action"]
+        if action == "start" and not self.running:
+            self.running = True
+            self._clock = asyncio.create_task(self._run_clock(int(request.query.get("candles", "20"))))
+        elif action == "shutdown":
+            asyncio.get_running_loop().call_later(0.1, self._stopped.set)
+        return web.json_response(self.stats())
+
+    def stats(self) -> dict:
+        latencies = sorted(self.close_to_order_ms)
+        pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else None
+        return self.metrics | {"finished": self.finished, "subscribed_streams": sum(len(s) for s in self.market.values()),
+                               "user_connections": len(self.users),
+                               "close_to_order_ms": {"count": len(latencies), "p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99),
+                                                     "max": latencies[-1] if latencies else None}}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Sunucuyu başlatır ve `http://host:port` adresini döndürür (websocket: `ws://host:port`)."""
+        app = web.Application()
+        app.router.add_get("/stream", self._stream)
+        app.router.add_get("/ws", self._user_stream); app.router.add_get("/private/ws", self._user_stream)
+        app.router.add_route("*", "/sim/{action}", self._control)
+        app.router.add_route("*", r"/fapi/v{version:\d}/{endpoint:.*}", self._rest)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port); await site.start()
+        host, port = site._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def close(self):
+        if self._clock: self._clock.cancel()
+        for ws in list(self.market) + list(self.users): await ws.close()
+        if self._runner: await self._runner.cleanup()
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 0, on_ready=None):
+        """`/sim/shutdown` çağrılana kadar çalışır; `on_ready(base_url)` adresi bildirir."""
+        base_url = await self.start(host, port)
+        if on_ready: on_ready(base_url)
+        await self._stopped.wait()
+        await self.close()
+
+
+def run_simulator_process(conn, symbols: list[str], **kwargs):
+    """Simülatörü ayrı bir süreçte çalıştırır (bot ile aynı olay döngüsünü ve GIL'i paylaşmasın diye); adres `conn` ile döner."""
+    asyncio.run(ExchangeSimulator(symbols, **kwargs).serve_forever(on_ready=conn.send))
+
+
+def simulated_client(base_url: str):
+    """Simülatöre bağlanan gerçek `AsyncClient` ve `BinanceSocketManager` (olay döngüsü içinde çağrılmalıdır)."""
+    from binance import AsyncClient, BinanceSocketManager
+    client = AsyncClient("simulator", "simulator")
+    client.FUTURES_URL = f"{base_url}/fapi"
+    bsm = BinanceSocketManager(client)
+    bsm.FSTREAM_URL = f"{base_url.replace('http', 'ws', 1)}/"
+    return client, bsm
@@ -0,0 +1,74 @@
+"""
+Yerel sahte borsaya karşı "korumaya kadar geçen süre" (time-to-protected) ölçümü.
+
+Eski akış (REST fiyat -> piyasa emri -> 0.5 sn uyku -> TP -> SL, sıralı) ile
+`OrderPipeline` (RESULT yanıtı ya da ORDER_TRADE_UPDATE dolumu -> eş zamanlı TP/SL)
+karşılaştırılır.
+
+Kullanım:
+    python -m benchmarks.order_latency --trades 50 --latency 0.03
+"""
+import argparse
+import asyncio
+import json
+import time
+from benchmarks.mock_exchange import MockExchangeClient
+from app.order_pipeline import OrderPipeline, calculate_tp_sl_prices
+from app.symbol_metadata import SymbolMeta
+
+BTCUSDT = SymbolMeta("BTCUSDT", tick_size="0.10", step_size="0.001", min_qty="0.001", max_qty="1000", min_notional="100")
+
+
+async def legacy_flow(client, symbol, side, quantity):
+    """Önceki `create_market_order_with_tp_sl` akışının birebir taklidi."""
+    started = time.perf_counter()
+    price = float((await client.futures_symbol_ticker(symbol=symbol))['price'])
+    await client.futures_create_order(symbol=symbol, side=side, type='MARKET', quantity=quantity)
+    filled = time.perf_counter()
+    await asyncio.sleep(0.5)
+    tp_price, sl_price = calculate_tp_sl_prices(side, price)
+    exit_side = 'SELL' if side == 'BUY' else 'BUY'
+    await client.futures_create_order(symbol=symbol, side=exit_side, type='TAKE_PROFIT_MARKET', stopPrice=f"{tp_price:.2f}", closePosition=True)
+    await client.futures_create_order(symbol=symbol, side=exit_side, type='STOP_MARKET', stopPrice=f"{sl_price:.2f}", closePosition=True)
+    done = time.perf_counter()
+    return (done - started) * 1000, (done - filled) * 1000
+
+
+async def pipeline_flow(pipeline, client, symbol, side, quantity):
+    started = time.perf_counter()
+    result = await pipeline.open_position(client, symbol, side, quantity, client.price, BTCUSDT, started)
+    return result["latency"]["protected"], result["latency"]["time_to_protected"]
+
+
+def percentiles(values):
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"p50": round(pick(0.5), 2), "p99": round(pick(0.99), 2), "max": round(ordered[-1], 2)}
+
+
+async def run(trades: int, latency: float, result_fills: bool):
+    results = {}
+    legacy_client = MockExchangeClient(latency=latency)
+    samples = [await legacy_flow(legacy_client, "BTCUSDT", "BUY", 0.01) for _ in range(trades)]
+    results["legacy"] = {"signal_to_protected_ms": percentiles([s[0] for s in samples]),
+                         "time_to_protected_ms": percentiles([s[1] for s in samples])}
+
+    pipeline = OrderPipeline()
+    async def on_event(message): pipeline.on_order_update(message)
+    client = MockExchangeClient(latency=latency, result_fills=result_fills, on_event=on_event)
+    samples = [await pipeline_flow(pipeline, client, "BTCUSDT", "BUY", 0.01) for _ in range(trades)]
+    results["pipeline"] = {"signal_to_protected_ms": percentiles([s[0] for s in samples]),
+                           "time_to_protected_ms": percentiles([s[1] for s in samples])}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Giriş + TP/SL emir akışı gecikme karşılaştırması.")
+    parser.add_argument("--trades", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.03, help="REST gidiş-dönüş süresi (sn)")
+    parser.add_argument("--ack-only", action="store_true", help="Emir yanıtı dolum içermesin, kullanıcı akışı beklensin")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.trades, args.latency, not args.ack_only)), indent=2))
+
+if __name__ == "__main__":
+    main()
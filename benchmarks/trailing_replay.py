@@ -0,0 +1,116 @@
+"""
+İz süren stop motorunun kaydedilmiş tik dosyalarıyla tekrar oynatma ölçümü.
+
+Desteklenen dosyalar:
+- `.jsonl`: combined-stream'den kaydedilmiş ham mesajlar (satır başına bir
+  `{"stream": ..., "data": {"e": "markPriceUpdate" | "aggTrade", ...}}`).
+- `.csv`: data.binance.vision aggTrades dökümleri (`SEMBOL-aggTrades-YYYY-MM-DD.csv`);
+  sembol dosya adından alınır, satırlar `aggTrade` mesajlarına çevrilir.
+
+Dosyadaki her sembol için bir pozisyon açılır; stop tetiklendiğinde pozisyon tetik fiyatından
+yeniden açılır ki yük sabit kalsın. İki yol ölçülür: yalnızca `TrailingStopEngine.on_price`
+(çözümlenmiş tikler) ve gerçek `BotCore._handle_market_message` (JSON çözme + fiyat önbelleği + motor).
+
+Kullanım:
+    python -m benchmarks.trailing_replay --generate ticks.jsonl --symbols 500 --ticks 200000
+    python -m benchmarks.trailing_replay ticks.jsonl BTCUSDT-aggTrades-2024-01-01.csv
+"""
+import argparse
+import asyncio
+import csv
+import json
+import math
+import os
+import random
+import time
+import tracemalloc
+from app.bot_core import BotCore
+from app.trailing_stop import TrailingStopEngine
+
+
+def generate(path: str, symbols: int, ticks: int, seed: int = 7):
+    """Sembollere dağılmış rastgele yürüyüşlü sentetik markPrice mesajları yazar."""
+    rng = random.Random(seed)
+    names = [f"T{i:04d}USDT" for i in range(symbols)]
+    prices = {name: 10 + rng.random() * 100 for name in names}
+    start = int(time.time() * 1000)
+    with open(path, "w") as f:
+        for i in range(ticks):
+            name = names[i % symbols]
+            prices[name] *= math.exp(rng.gauss(0, 0.0008))
+            f.write(json.dumps({"stream": f"{name.lower()}@markPrice@1s", "data": {
+                "e": "markPriceUpdate", "E": start + i, "s": name, "p": f"{prices[name]:.6f}"}}) + "\n")
+
+
+def load(paths: list[str]) -> list[str]:
+    messages = []
+    for path in paths:
+        if path.endswith(".csv"):
+            symbol = os.path.basename(path).split("-")[0].upper()
+            with open(path, newline="") as f:
+                for row in csv.reader(f):
+                    if not row or not row[0].isdigit(): continue  # Başlık satırı
+                    messages.append(json.dumps({"stream": f"{symbol.lower()}@aggTrade", "data": {
+                        "e": "aggTrade", "E": int(row[5]), "s": symbol, "a": int(row[0]), "p": row[1], "q": row[2], "T": int(row[5])}}))
+        else:
+            with open(path) as f: messages.extend(line.strip() for line in f if line.strip())
+    return messages
+
+
+def _open_all(engine: TrailingStopEngine, first_prices: dict[str, float]):
+    for i, (symbol, price) in enumerate(first_prices.items()): engine.open(symbol, "LONG" if i % 2 else "SHORT", price)
+
+
+def run_engine(ticks: list[tuple[str, float]], first_prices: dict[str, float]) -> dict:
+    def reopen(symbol, price, position): engine.open(symbol, "LONG" if position.side < 0 else "SHORT", price)
+    engine = TrailingStopEngine(reopen)
+    _open_all(engine, first_prices)
+    on_price = engine.on_price
+    started = time.perf_counter()
+    for symbol, price in ticks: on_price(symbol, price)
+    elapsed = time.perf_counter() - started
+    triggers = engine.metrics["triggers"]
+    # Tetiklenmeyen tiklerin kalıcı bellek ayırmadığını doğrulamak için ikinci tur tracemalloc ile
+    engine.on_trigger = None
+    _open_all(engine, first_prices)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for symbol, price in ticks: on_price(symbol, price)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ticks_per_sec": len(ticks) / elapsed, "ns_per_tick": elapsed / len(ticks) * 1e9, "triggers": triggers,
+            "retained_bytes": current - before, "peak_bytes": peak - before}
+
+
+async def run_bot(messages: list[str], first_prices: dict[str, float]) -> dict:
+    bot = BotCore()
+    def reopen(symbol, price, position): bot.trailing_stops.open(symbol, "LONG" if position.side < 0 else "SHORT", price)
+    bot.trailing_stops.on_trigger = reopen
+    _open_all(bot.trailing_stops, first_prices)
+    handle = bot._handle_market_message
+    started = time.perf_counter()
+    for message in messages: await handle(message)
+    elapsed = time.perf_counter() - started
+    return {"messages_per_sec": len(messages) / elapsed, "us_per_message": elapsed / len(messages) * 1e6,
+            "triggers": bot.trailing_stops.metrics["triggers"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="İz süren stop motoru tik tekrar oynatma ölçümü.")
+    parser.add_argument("files", nargs="*", help="Kaydedilmiş .jsonl mesaj ya da .csv aggTrades dosyaları")
+    parser.add_argument("--generate", help="Sentetik tik dosyası üretip onu oynat")
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--ticks", type=int, default=100_000)
+    args = parser.parse_args()
+    if args.generate: generate(args.generate, args.symbols, args.ticks); args.files.append(args.generate)
+    if not args.files: parser.error("En az bir tik dosyası ya da --generate gerekli.")
+    messages = load(args.files)
+    ticks = [(data["s"], float(data["p"])) for data in (json.loads(m)["data"] for m in messages)]
+    first_prices: dict[str, float] = {}
+    for symbol, price in ticks: first_prices.setdefault(symbol, price)
+    result = {"ticks": len(ticks), "positions": len(first_prices), "engine": run_engine(ticks, first_prices),
+              "bot_core": asyncio.run(run_bot(messages, first_prices))}
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
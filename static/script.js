@@ -25,19 +25,20 @@ document.addEventListener('DOMContentLoaded', () => {
     const passwordInput = document.getElementById('password');
     const loginError = document.getElementById('login-error');
     const symbolInput = document.getElementById('symbol-input');
+    const strategySelect = document.getElementById('strategy-select');
     const startButton = document.getElementById('start-button');
     const stopButton = document.getElementById('stop-button');
     const statusMessageSpan = document.getElementById('status-message');
     const currentSymbolSpan = document.getElementById('current-symbol');
-    const positionStatusSpan = document.getElementById('position-status');
-    const lastSignalSpan = document.getElementById('last-signal');
+    const symbolsList = document.getElementById('symbols-list');
+    const eventsList = document.getElementById('events-list');
     const statsTotal = document.getElementById('stats-total-trades');
     const statsWinning = document.getElementById('stats-winning-trades');
     const statsNetPnl = document.getElementById('stats-net-pnl');
     const statsDailyPnl = document.getElementById('stats-daily-pnl');
     const statsWeeklyPnl = document.getElementById('stats-weekly-pnl');
     const statsMonthlyPnl = document.getElementById('stats-monthly-pnl');
-    let statusInterval;
+    let statusSocket, reconnectTimer, reconnectDelay = 1000, currentStatus = {};
 
     // --- KİMLİK DOĞRULAMA ---
     loginButton.addEventListener('click', () => {
@@ -52,21 +53,80 @@ document.addEventListener('DOMContentLoaded', () => {
         if (user) {
             loginContainer.style.display = 'none';
             appContainer.style.display = 'flex';
-            getStatus();
-            statusInterval = setInterval(getStatus, 5000);
+            connectStatusSocket();
+            loadStrategies();
             listenForTradeUpdates();
         } else {
             loginContainer.style.display = 'flex';
             appContainer.style.display = 'none';
-            if (statusInterval) clearInterval(statusInterval);
+            disconnectStatusSocket();
         }
     });
 
+    // --- DURUM PUSH KANALI ---
+    // Sunucu önce tam durumu, sonra yalnızca değişen alanları (JSON Merge Patch) ve olayları gönderir
+    async function connectStatusSocket() {
+        const user = auth.currentUser;
+        if (!user || statusSocket) return;
+        const protocol = location.protocol === 'https:' ? 'wss' : 'ws';
+        const socket = new WebSocket(`${protocol}://${location.host}/api/ws`);
+        statusSocket = socket;
+        socket.onopen = async () => {
+            socket.send(JSON.stringify({ token: await user.getIdToken() }));
+            reconnectDelay = 1000;
+        };
+        socket.onmessage = (message) => {
+            const data = JSON.parse(message.data);
+            if (data.type === 'snapshot') currentStatus = data.status;
+            else currentStatus = applyMergePatch(currentStatus, data.status);
+            updateUI(currentStatus);
+            (data.events || []).forEach(renderEvent);
+        };
+        socket.onclose = () => {
+            if (statusSocket !== socket) return;
+            statusSocket = null;
+            if (!auth.currentUser) return;
+            reconnectTimer = setTimeout(connectStatusSocket, reconnectDelay);
+            reconnectDelay = Math.min(reconnectDelay * 2, 30000);
+        };
+    }
+
+    function disconnectStatusSocket() {
+        clearTimeout(reconnectTimer);
+        const socket = statusSocket;
+        statusSocket = null;
+        if (socket) socket.close();
+    }
+
+    function applyMergePatch(target, patch) {
+        if (patch === null || typeof patch !== 'object' || Array.isArray(patch)) return patch;
+        const result = (target && typeof target === 'object' && !Array.isArray(target)) ? { ...target } : {};
+        for (const [key, value] of Object.entries(patch)) {
+            if (value === null) delete result[key];
+            else result[key] = applyMergePatch(result[key], value);
+        }
+        return result;
+    }
+
+    const EVENT_LABELS = { candle: 'Mum', signal: 'Sinyal', fill: 'Dolum', pnl: 'K/Z' };
+    function renderEvent(event) {
+        const details = {
+            candle: () => `kapanış ${event.close}`,
+            signal: () => event.signal,
+            fill: () => `${event.side} ${event.quantity} @ ${event.price}`,
+            pnl: () => `${event.status} ${Number(event.pnl).toFixed(2)} USDT`,
+        }[event.type];
+        const item = document.createElement('li');
+        item.textContent = `${new Date().toLocaleTimeString()} ${EVENT_LABELS[event.type] || event.type} ${event.symbol || ''}: ${details ? details() : ''}`;
+        eventsList.prepend(item);
+        while (eventsList.children.length > 50) eventsList.lastChild.remove();
+    }
+
     // --- API İSTEKLERİ ---
     async function fetchApi(endpoint, options = {}) {
         const user = auth.currentUser;
         if (!user) { alert("Lütfen tekrar giriş yapın."); return null; }
-        const idToken = await user.getIdToken(true);
+        const idToken = await user.getIdToken();
         const headers = { ...options.headers, 'Authorization': `Bearer ${idToken}` };
         if (options.body) headers['Content-Type'] = 'application/json';
         try {
@@ -87,26 +147,55 @@ document.addEventListener('DOMContentLoaded', () => {
     const updateUI = (data) => {
         if (!data) return;
         statusMessageSpan.textContent = data.status_message;
-        currentSymbolSpan.textContent = data.symbol || 'N/A';
-        lastSignalSpan.textContent = data.last_signal || 'N/A';
-        if (data.is_running) {
-            startButton.disabled = true; stopButton.disabled = false; symbolInput.disabled = true;
-            symbolInput.value = data.symbol; statusMessageSpan.className = 'status-running';
-        } else {
-            startButton.disabled = false; stopButton.disabled = true; symbolInput.disabled = false;
-            statusMessageSpan.className = 'status-stopped';
-        }
-        positionStatusSpan.textContent = data.in_position ? 'Evet' : 'Hayır';
-        positionStatusSpan.className = data.in_position ? 'status-in-position' : '';
+        const symbols = Object.values(data.symbols || {});
+        currentSymbolSpan.textContent = symbols.length ? symbols.map(s => s.symbol).join(', ') : 'N/A';
+        statusMessageSpan.className = data.is_running ? 'status-running' : 'status-stopped';
+        stopButton.disabled = !data.is_running;
+        symbolsList.replaceChildren(...symbols.map(renderSymbolRow));
+    };
+
+    // Her sembol için pozisyon ve son sinyal satırı; satıra tıklamak sembolü girişe yazar
+    const renderSymbolRow = (s) => {
+        const row = document.createElement('div');
+        row.className = 'symbol-row';
+        const name = document.createElement('strong');
+        name.textContent = s.symbol;
+        const position = document.createElement('span');
+        position.textContent = s.in_position ? `Pozisyonda (${s.position_side})` : 'Pozisyon yok';
+        position.className = s.in_position ? 'status-in-position' : '';
+        const signal = document.createElement('span');
+        signal.textContent = `${s.strategy || ''} ${s.last_signal || 'N/A'}`;
+        const message = document.createElement('small');
+        message.textContent = s.status_message;
+        row.append(name, position, signal, message);
+        row.addEventListener('click', () => { symbolInput.value = s.symbol; });
+        return row;
     };
 
-    const getStatus = async () => updateUI(await fetchApi('/api/status'));
+    // Kayıtlı stratejiler sunucudan alınır; seçilen strateji sembol başlatılırken gönderilir
+    async function loadStrategies() {
+        const strategies = await fetchApi('/api/strategies');
+        if (!strategies) return;
+        strategySelect.replaceChildren(...strategies.map(s => {
+            const option = document.createElement('option');
+            option.value = s.name;
+            option.textContent = s.description || s.name;
+            return option;
+        }));
+    }
+
     startButton.addEventListener('click', async () => {
         const symbol = symbolInput.value.trim().toUpperCase();
         if (!symbol) return alert('Lütfen bir coin sembolü girin.');
-        updateUI(await fetchApi('/api/start', { method: 'POST', body: JSON.stringify({ symbol }) }));
+        const body = strategySelect.value ? { symbol, strategy: strategySelect.value } : { symbol };
+        updateUI(await fetchApi('/api/start', { method: 'POST', body: JSON.stringify(body) }));
+    });
+    // Giriş boşsa tüm semboller, doluysa yalnızca o sembol durdurulur
+    stopButton.addEventListener('click', async () => {
+        const symbol = symbolInput.value.trim().toUpperCase();
+        if (!symbol && !confirm('Tüm semboller durdurulsun mu?')) return;
+        updateUI(await fetchApi('/api/stop', { method: 'POST', body: JSON.stringify(symbol ? { symbol } : {}) }));
     });
-    stopButton.addEventListener('click', async () => updateUI(await fetchApi('/api/stop', { method: 'POST' })));
 
     // --- İSTATİSTİK HESAPLAMA ---
     function listenForTradeUpdates() {
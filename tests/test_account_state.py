@@ -0,0 +1,123 @@
+import asyncio
+import time
+import pytest
+from app.account_state import AccountState
+
+EXCHANGE_NOW = 1_700_000_000_000
+
+
+class SlowAccountClient:
+    """`futures_account` taklidi: anlık görüntü istek başında alınır, yanıt `release` ile döner."""
+    def __init__(self, positions: dict[str, float], wallet: float = 1000.0):
+        self.positions, self.wallet = positions, wallet
+        self.release = asyncio.Event()
+        self.requested = asyncio.Event()
+
+    async def futures_account(self):
+        snapshot = {"assets": [{"asset": "USDT", "walletBalance": str(self.wallet), "crossWalletBalance": str(self.wallet),
+                                "updateTime": EXCHANGE_NOW}],
+                    "positions": [{"symbol": symbol, "positionAmt": str(amount), "entryPrice": "100", "positionSide": "BOTH",
+                                   "unrealizedProfit": "0", "updateTime": EXCHANGE_NOW} for symbol, amount in self.positions.items()]}
+        self.requested.set()
+        await self.release.wait()
+        return snapshot
+
+
+def _account_update(event_time: int, symbol: str, amount: float, wallet: float = 1000.0) -> dict:
+    return {"e": "ACCOUNT_UPDATE", "E": event_time, "T": event_time - 1, "a": {"m": "ORDER",
+            "B": [{"a": "USDT", "wb": str(wallet), "cw": str(wallet), "bc": "0"}],
+            "P": [{"s": symbol, "pa": str(amount), "ep": "100", "up": "0", "mt": "cross", "ps": "BOTH"}]}}
+
+
+async def _seeded(client: SlowAccountClient) -> AccountState:
+    state = AccountState(reconcile_interval=3600)
+    state._client = client
+    client.release.set()
+    await state.reconcile()
+    client.release.clear(); client.requested.clear()
+    return state
+
+
+@pytest.mark.parametrize("skew_ms", [0, 3_600_000, -3_600_000])
+def test_update_during_reconcile_wins_regardless_of_local_clock(monkeypatch, skew_ms):
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + skew_ms / 1000)
+    async def scenario():
+        client = SlowAccountClient({"BTCUSDT": 0.5})
+        state = await _seeded(client)
+        state.apply(_account_update(EXCHANGE_NOW + 10, "BTCUSDT", 0.5))
+        reconcile = asyncio.create_task(state.reconcile())
+        await client.requested.wait()
+        # Anlık görüntü alındıktan sonra pozisyon kapandı ve bakiye değişti; akış bunu istek sürerken bildirir
+        state.apply(_account_update(EXCHANGE_NOW + 20, "BTCUSDT", 0.0, wallet=1010.0))
+        client.release.set()
+        corrected = await reconcile
+        return state, corrected
+    state, corrected = asyncio.run(scenario())
+    assert corrected == 0
+    assert state.position("BTCUSDT") is None
+    assert state.balances["USDT"]["wallet_balance"] == 1010.0
+
+
+@pytest.mark.parametrize("skew_ms", [0, 3_600_000, -3_600_000])
+def test_missed_event_is_corrected_regardless_of_local_clock(monkeypatch, skew_ms):
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + skew_ms / 1000)
+    async def scenario():
+        client = SlowAccountClient({"BTCUSDT": 0.5})
+        state = await _seeded(client)
+        state.apply(_account_update(EXCHANGE_NOW + 10, "BTCUSDT", 0.5))
+        # Pozisyonu kapatan olay kullanıcı akışında kaçırıldı
+        client.positions["BTCUSDT"], client.wallet = 0.0, 990.0
+        client.release.set()
+        return state, await state.reconcile()
+    state, corrected = asyncio.run(scenario())
+    assert corrected == 1
+    assert state.position("BTCUSDT") is None
+    assert state.balances["USDT"]["wallet_balance"] == 990.0
+
+
+class UserSockets:
+    """`BinanceSocketManager.futures_user_socket` taklidi: her bağlantı kendi mesajlarını verir, sonra bekler."""
+    def __init__(self, *connections: list[dict]):
+        self.connections, self.opened, self.messages = list(connections), 0, []
+
+    def futures_user_socket(self): return self
+
+    async def __aenter__(self):
+        self.messages = list(self.connections[self.opened]); self.opened += 1
+        return self
+
+    async def __aexit__(self, *exc): return False
+
+    async def recv(self):
+        if self.messages: return self.messages.pop(0)
+        await asyncio.Event().wait()
+
+
+def test_user_stream_reconciles_only_after_a_reconnect(monkeypatch):
+    from app.account_state import account_state
+    from app.binance_client import BinanceClient
+    from app.stream_supervisor import StreamHealth
+    class InstantHealth(StreamHealth):
+        def on_disconnect(self, error=None): super().on_disconnect(error); return 0.0
+    client = BinanceClient()
+    client.bsm = UserSockets([{"e": "ORDER_TRADE_UPDATE"}, {"e": "error", "m": "closed"}], [{"e": "ACCOUNT_UPDATE"}])
+    client.user_stream_health = InstantHealth("user")
+    reconciles = []
+    async def reconcile(): reconciles.append(client.user_stream_health.connects); return 0
+    monkeypatch.setattr(account_state, "reconcile", reconcile)
+    async def scenario():
+        received = []
+        async def callback(message): received.append(message["e"])
+        stream = asyncio.create_task(client.start_user_stream(callback))
+        while len(received) < 2: await asyncio.sleep(0)
+        # İlk bağlantıda `initialize` durumu zaten yükledi; yalnızca yeniden bağlantı uzlaştırılır
+        task = client._reconcile_task
+        await task
+        stream.cancel()
+        with pytest.raises(asyncio.CancelledError): await stream
+        return received, task
+    received, task = asyncio.run(scenario())
+    assert received == ["ORDER_TRADE_UPDATE", "ACCOUNT_UPDATE"]
+    assert reconciles == [2] and task.done() and not task.cancelled()
@@ -0,0 +1,95 @@
+import asyncio
+import numpy as np
+from app.binance_client import binance_client
+from app.bot_core import BotCore, SymbolState
+from app.config import settings
+from app.kline_store import KlineStore
+from app.rest_scheduler import RestScheduler
+from app.trading_strategy import DEFAULT_STRATEGY, create_strategy
+from benchmarks.mock_exchange import FakeKlineStreamServer
+
+STEP = 60_000
+
+
+class SlowKlines:
+    """`FakeKlineStreamServer.futures_klines` önünde yavaş bir REST ucu; çağrıları kaydeder."""
+    def __init__(self, server: FakeKlineStreamServer, delay: float):
+        self.server, self.delay = server, delay
+        self.calls: list[dict] = []
+
+    async def futures_klines(self, **params):
+        self.calls.append(params)
+        await asyncio.sleep(self.delay)
+        return await self.server.futures_klines(**params)
+
+
+def _use_rest(monkeypatch, client):
+    monkeypatch.setattr(settings, "TIMEFRAME", "1m")
+    monkeypatch.setattr(settings, "PRICE_STREAM", None)
+    monkeypatch.setattr(binance_client, "client", client)
+    monkeypatch.setattr(binance_client, "scheduler", RestScheduler())
+
+
+def _tracked_state(bot: BotCore, klines: list) -> SymbolState:
+    state = SymbolState("BTCUSDT", create_strategy(DEFAULT_STRATEGY))
+    state.status["in_position"] = True  # Sinyal değerlendirilip emir gönderilmesin
+    state.klines = KlineStore.from_klines(klines, capacity=50)
+    bot.symbols[state.symbol] = state
+    bot.strategy_executor.add_symbol(state)
+    return state
+
+
+def test_dropped_stream_is_backfilled_before_later_closes(monkeypatch):
+    async def scenario():
+        server = FakeKlineStreamServer(interval_ms=STEP, tick=0.03, drop_every=6)
+        server.closed_candles = 60
+        monkeypatch.setattr(settings, "WEBSOCKET_URL", await server.start())
+        rest = SlowKlines(server, delay=0.1)
+        _use_rest(monkeypatch, rest)
+        bot = BotCore()
+        state = _tracked_state(bot, await server.futures_klines("BTCUSDT", "1m", limit=50))
+        held = []
+        original = bot._route_close
+        def route(state, kline_data, received):
+            if state.backfill_task is not None: held.append(int(kline_data['t']))
+            original(state, kline_data, received)
+        bot._route_close = route
+        await bot.market_streams.subscribe(state.streams)
+        # Kopmadan sonra sabit bekleme: aradaki mumlar kaçırılır
+        for group in bot.market_streams.groups: group.health.backoff.next_delay = lambda: 0.1
+        for _ in range(200):
+            await asyncio.sleep(0.05)
+            if server.drops >= 2 and bot.stream_metrics["gaps"] >= 2 and state.backfill_task is None: break
+        await bot.market_streams.close()
+        await server.close()
+        await bot.strategy_executor.close()
+        return bot, state, held, rest
+    bot, state, held, rest = asyncio.run(scenario())
+    open_times = state.klines.column("open_time")
+    assert bot.stream_metrics["gaps"] >= 2 and bot.stream_metrics["backfilled_candles"] >= 2
+    assert bot.stream_metrics["unfilled_candles"] == 0
+    # Tamamlama sürerken gelen kapanışlar bekletildi ve mumlar sırayla, boşluksuz eklendi
+    assert held and rest.calls
+    assert (np.diff(open_times) == STEP).all()
+
+
+def test_long_gap_is_paged_from_oldest_to_newest(monkeypatch):
+    async def scenario():
+        server = FakeKlineStreamServer(interval_ms=STEP)
+        server.closed_candles = 3300
+        rest = SlowKlines(server, delay=0.0)
+        _use_rest(monkeypatch, rest)
+        bot = BotCore()
+        state = _tracked_state(bot, [server.kline("BTCUSDT", i) for i in range(50)])
+        next_open_time = server.start_time + 3250 * STEP
+        event = server.kline("BTCUSDT", 3250)
+        bot._route_close(state, {"t": event[0], "T": event[6], "s": "BTCUSDT", "o": event[1], "c": event[4], "h": event[2],
+                                 "l": event[3], "v": event[5], "n": event[8], "q": event[7], "V": event[9], "Q": event[10]}, 0.0)
+        await state.backfill_task
+        await bot.strategy_executor.close()
+        return bot, state, rest, next_open_time
+    bot, state, rest, next_open_time = asyncio.run(scenario())
+    assert [call["limit"] for call in rest.calls] == [1500, 1500, 200]
+    assert bot.stream_metrics["backfilled_candles"] == 3200 and bot.stream_metrics["unfilled_candles"] == 0
+    assert state.klines.last_open_time == next_open_time
+    assert (np.diff(state.klines.column("open_time")) == STEP).all()
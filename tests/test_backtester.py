@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.backtester import ema, generate_signals, run_backtest, simulate_trades, summarize
+from app.indicators import IndicatorEngine
+from app.kline_store import KlineStore
+from app.trading_strategy import EmaCrossoverStrategy
+
+
+def _flat_runs(n: int, seed: int) -> np.ndarray:
+    """Uzun yatay bölgeli fiyat serisi (aynı kapanış onlarca mum tekrar eder)."""
+    rng = np.random.default_rng(seed)
+    steps = np.where(rng.random(n) < 0.15, rng.normal(0, 0.5, n), 0.0)
+    return np.round(100 + np.cumsum(steps), 2)
+
+
+def _random_walk(n: int, seed: int) -> np.ndarray:
+    return 100 + np.cumsum(np.random.default_rng(seed).normal(0, 0.3, n))
+
+
+def _live_signals(close: np.ndarray, short_period: int, long_period: int) -> list[tuple[int, int]]:
+    """Canlı yol: IndicatorEngine + strateji, mum mum; tekrar önlemesiz ham sinyaller."""
+    strategy = EmaCrossoverStrategy(short_period, long_period)
+    engine, store = IndicatorEngine(), KlineStore(4)
+    engine.add_symbol("TEST", strategy.indicators())
+    signals = []
+    for i, price in enumerate(close.tolist()):
+        store.append((i, price, price, price, price, 1.0, i, price, 1, 0.5, price / 2))
+        engine.update([("TEST", store)])
+        signal = strategy.signal(engine.view("TEST"))
+        if signal in ("LONG", "SHORT"): signals.append((i, 1 if signal == "LONG" else -1))
+    return signals
+
+
+@pytest.mark.parametrize("series", [_flat_runs(5000, 1), _flat_runs(5000, 2), _random_walk(5000, 3)])
+def test_backtest_signals_match_live_strategy(series):
+    indices, sides = generate_signals(series, 5, 12)
+    assert list(zip(indices.tolist(), sides.tolist())) == _live_signals(series, 5, 12)
+
+
+@pytest.mark.parametrize("period", [5, 12, 50])
+def test_ema_is_bit_identical_to_pandas(period):
+    series = np.concatenate([_flat_runs(3000, period), _random_walk(3000, period)])
+    expected = pd.Series(series).ewm(span=period, adjust=False).mean().to_numpy()
+    assert np.array_equal(ema(series, period), expected)
+
+
+def test_flat_series_produces_no_signals():
+    indices, _ = generate_signals(np.full(1000, 42.0), 5, 12)
+    assert len(indices) == 0
+
+
+@pytest.mark.parametrize("period", [5, 12, 200])
+def test_vectorized_ema_is_bit_identical_to_pandas(period):
+    # Uzun seri satır satır vektörel yola girer; çapası tutmayan satırlar yeniden yürütülür
+    series = np.concatenate([_flat_runs(100_000, period), _random_walk(100_003, period)])
+    expected = pd.Series(series).ewm(span=period, adjust=False).mean().to_numpy()
+    assert np.array_equal(ema(series, period), expected)
+
+
+def test_vectorized_ema_propagates_nan_like_the_recurrence():
+    series = _random_walk(200_000, 7); series[150_000] = np.nan
+    result = ema(series, 12)
+    assert np.array_equal(result[:150_000], ema(series[:150_000], 12)) and np.isnan(result[150_000:]).all()
+
+
+def test_trade_log_reports_commission_separately():
+    close = _random_walk(3000, 11)
+    columns = {"open_time": np.arange(3000, dtype=np.int64) * 60_000, "open": np.concatenate([close[:1], close[:-1]]),
+               "high": close + 0.4, "low": close - 0.4, "close": close}
+    result = run_backtest(columns, "BTCUSDT", fee_rate=0.0004)
+    indices, sides = generate_signals(close, 5, 12)
+    trades = simulate_trades(columns, indices, sides, fee_rate=0.0004)
+    assert len(result["trades"]) == len(trades["pnl"]) > 0 and result["summary"] == summarize(trades)
+    for record, quantity, pnl in zip(result["trades"], trades["quantity"].tolist(), trades["pnl"].tolist()):
+        commission = 0.0004 * quantity * (record["entry_price"] + record["exit_price"])
+        assert record["commission"] == pytest.approx(commission)
+        # Canlı kayıtlar gibi `pnl` komisyon hariç; net sonuç özetteki K/Z ile aynı
+        assert record["pnl"] - record["commission"] == pytest.approx(pnl)
@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from app.binance_client import binance_client
+from app.bot_core import BotCore
+from app.config import settings
+from app.order_pipeline import calculate_tp_sl_prices
+from app.rest_scheduler import RestScheduler
+from app.symbol_metadata import symbol_metadata
+from app.trade_journal import trade_journal
+from benchmarks.mock_exchange import ExchangeSimulator, MockTradeSink, simulated_client
+
+HISTORY = 50
+
+
+def _row(open_time: int, interval_ms: int, o: float, h: float, l: float, c: float) -> list:
+    return [open_time, f"{o:.4f}", f"{h:.4f}", f"{l:.4f}", f"{c:.4f}", "10.0", open_time + interval_ms - 1, f"{10 * c:.4f}", 10, "5.0", f"{5 * c:.4f}", "0"]
+
+
+def _series(simulator: ExchangeSimulator, after_entry: tuple[float, float, float, float]) -> list[list]:
+    """
+    Düşen geçmiş, ardından EMA(5/12) yukarı kesişimi üreten sıçrama mumu (LONG girişi, kapanış 104.208);
+    girişten sonraki mum `after_entry` (açılış/tepe/dip/kapanış oranları) ile TP ya da SL'ye gider.
+    """
+    interval, start = simulator.interval_ms, simulator.start_time
+    closes = [110 - 0.2 * i for i in range(HISTORY)]
+    rows = [_row(start + i * interval, interval, closes[i - 1] if i else closes[0], max(closes[i - 1:i + 1] or closes[:1]) + 0.05,
+                 min(closes[i - 1:i + 1] or closes[:1]) - 0.05, closes[i]) for i in range(HISTORY)]
+    entry = closes[-1] * 1.04
+    rows.append(_row(start + HISTORY * interval, interval, closes[-1], entry, closes[-1], entry))
+    rows.append(_row(start + (HISTORY + 1) * interval, interval, *(entry * ratio for ratio in after_entry)))
+    last = entry * after_entry[3]
+    rows += [_row(start + i * interval, interval, last, last, last, last) for i in range(HISTORY + 2, HISTORY + 4)]
+    return rows
+
+
+@pytest.fixture
+def simulated_bot(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "TIMEFRAME", "5m")
+    monkeypatch.setattr(settings, "PRICE_STREAM", None)
+    monkeypatch.setattr(settings, "STRATEGY_EXECUTOR", "inline")
+    monkeypatch.setattr(symbol_metadata, "cache_path", str(tmp_path / "exchange_info.json"))
+    monkeypatch.setattr(symbol_metadata, "loaded_at", 0.0)
+    monkeypatch.setattr(trade_journal, "sink", MockTradeSink(latency=0.0))
+    monkeypatch.setattr(trade_journal, "wal_path", str(tmp_path / "trade_journal.jsonl"))
+    for name in ("client", "bsm", "scheduler"): monkeypatch.setattr(binance_client, name, getattr(binance_client, name))
+    monkeypatch.setattr(settings, "WEBSOCKET_URL", settings.WEBSOCKET_URL)
+
+    async def run(symbols: dict[str, tuple], candles: int = 3) -> tuple[ExchangeSimulator, BotCore]:
+        simulator = ExchangeSimulator(list(symbols), history=HISTORY, candle_seconds=0.8)
+        for symbol, after_entry in symbols.items(): simulator.series[symbol] = _series(simulator, after_entry)
+        base_url = await simulator.start()
+        binance_client.client, binance_client.bsm = simulated_client(base_url)
+        binance_client.scheduler = RestScheduler()
+        settings.WEBSOCKET_URL = base_url.replace("http", "ws", 1)
+        trade_journal.start()
+        bot = BotCore()
+        try:
+            for symbol in symbols: await bot.start(symbol)
+            for _ in range(100):
+                if simulator.stats()["subscribed_streams"] >= len(symbols) and simulator.users: break
+                await asyncio.sleep(0.05)
+            simulator._clock = asyncio.create_task(simulator._run_clock(candles))
+            await simulator._clock
+            await asyncio.sleep(0.3)  # Son olayların işlenmesi
+            await bot.strategy_executor.drain()
+            await trade_journal.flush(timeout=2.0)
+            bot.strategy_executor.finish_boundaries()
+        finally:
+            await bot.stop()
+            await trade_journal.close()
+            await simulator.close()
+        return simulator, bot
+
+    return lambda symbols, **kwargs: asyncio.run(run(symbols, **kwargs))
+
+
+def _orders(simulator: ExchangeSimulator, symbol: str) -> dict[str, dict]:
+    return {order["type"]: order for order in simulator.engine.orders.values() if order["symbol"] == symbol}
+
+
+def test_entry_protection_and_exits_against_simulator(simulated_bot):
+    simulator, bot = simulated_bot({"SLXUSDT": (1.0, 1.0, 0.99, 0.999), "TPXUSDT": (1.0, 1.01, 1.0, 1.005)})
+    entry = round(100.2 * 1.04, 4)
+    take_profit, stop_loss = calculate_tp_sl_prices("BUY", entry)
+    for symbol in ("SLXUSDT", "TPXUSDT"):
+        orders = _orders(simulator, symbol)
+        assert set(orders) == {"MARKET", "TAKE_PROFIT_MARKET", "STOP_MARKET"}
+        assert orders["MARKET"]["side"] == "BUY" and float(orders["MARKET"]["avgPrice"]) == entry
+        # Koruma emirleri algo uç noktasına, dolum fiyatından hesaplanan tetik fiyatlarıyla gitti
+        assert orders["TAKE_PROFIT_MARKET"]["conditional"] and orders["STOP_MARKET"]["conditional"]
+        assert float(orders["TAKE_PROFIT_MARKET"]["stopPrice"]) == pytest.approx(take_profit, abs=1e-4)
+        assert float(orders["STOP_MARKET"]["stopPrice"]) == pytest.approx(stop_loss, abs=1e-4)
+        assert simulator.engine.positions[symbol][0] == 0
+        assert [o for o in orders.values() if o["status"] == "NEW"] == []
+    # Stop-out: SL doldu, yetim TP iptal edildi; kâr tarafında tersi
+    assert _orders(simulator, "SLXUSDT")["STOP_MARKET"]["status"] == "FILLED"
+    assert _orders(simulator, "SLXUSDT")["TAKE_PROFIT_MARKET"]["status"] == "CANCELED"
+    assert _orders(simulator, "TPXUSDT")["TAKE_PROFIT_MARKET"]["status"] == "FILLED"
+    assert _orders(simulator, "TPXUSDT")["STOP_MARKET"]["status"] == "CANCELED"
+    assert simulator.metrics["stop_fills"] == 2 and len(simulator.close_to_order_ms) == 2
+
+    records = {record["symbol"]: record for record in trade_journal.sink.records.values()}
+    assert set(records) == {"SLXUSDT", "TPXUSDT"}
+    assert records["SLXUSDT"]["status"] == "CLOSED_BY_STOP_MARKET" and records["SLXUSDT"]["pnl"] < 0
+    assert records["TPXUSDT"]["status"] == "CLOSED_BY_TAKE_PROFIT_MARKET" and records["TPXUSDT"]["pnl"] > 0
+    assert records["SLXUSDT"]["exit_price"] == pytest.approx(stop_loss, abs=1e-4)
+
+    # Hızlandırılmış oynatmada mum kapanış zamanları ileride olsa da karar gecikmesi negatif olmamalı
+    assert bot.strategy_executor.boundaries
+    assert all(boundary["close_to_decision_p99_ms"] >= 0 for boundary in bot.strategy_executor.boundaries)
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.indicators import ATR, EMA, RSI, VWAP, Bollinger, Indicator, IndicatorEngine
+from app.kline_store import KlineStore
+
+
+def _bars(n: int, seed: int) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    spread = np.abs(rng.normal(0, 0.3, n))
+    return {"open": np.r_[close[0], close[:-1]], "high": close + spread, "low": close - spread, "close": close,
+            "volume": rng.uniform(1, 20, n)}
+
+
+def _run(indicator: Indicator, bars: dict[str, np.ndarray]) -> np.ndarray:
+    """Göstergeyi tek satır için mum mum ilerletir; (zaman, çıktılar) döndürür."""
+    state, rows = indicator.init_state(1), np.array([0])
+    return np.vstack([indicator.step(state, rows, {name: values[t:t + 1] for name, values in bars.items()}, np.array([t]))
+                      for t in range(len(bars["close"]))])
+
+
+def _wilder(values: pd.Series, period: int, first: int) -> pd.Series:
+    """`first` konumundaki ilk `period` değerin ortalamasıyla tohumlanan Wilder yumuşatması (alpha = 1/period)."""
+    seed = values.iloc[first:first + period].mean()
+    smoothed = pd.concat([pd.Series([seed]), values.iloc[first + period:]], ignore_index=True).ewm(alpha=1 / period, adjust=False).mean()
+    return pd.Series(np.r_[np.full(first + period - 1, np.nan), smoothed.to_numpy()])
+
+
+@pytest.mark.parametrize("period", [2, 14])
+def test_rsi_matches_wilder_reference(period):
+    bars = _bars(300, seed=1)
+    delta = pd.Series(bars["close"]).diff()
+    avg_gain, avg_loss = _wilder(delta.clip(lower=0), period, 1), _wilder(-delta.clip(upper=0), period, 1)
+    expected = 100 - 100 / (1 + avg_gain / avg_loss)
+    assert np.allclose(_run(RSI(period), bars)[:, 0], expected, rtol=1e-10, equal_nan=True)
+
+
+def test_rsi_without_losses_is_100():
+    bars = {name: np.arange(1.0, 21.0) for name in ("open", "high", "low", "close", "volume")}
+    assert _run(RSI(5), bars)[5:, 0].tolist() == [100.0] * 15
+
+
+@pytest.mark.parametrize("period", [1, 14])
+def test_atr_matches_wilder_reference(period):
+    bars = _bars(300, seed=2)
+    high, low, prev_close = pd.Series(bars["high"]), pd.Series(bars["low"]), pd.Series(bars["close"]).shift()
+    true_range = pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+    expected = _wilder(true_range, period, 0)
+    assert np.allclose(_run(ATR(period), bars)[:, 0], expected, rtol=1e-10, equal_nan=True)
+
+
+@pytest.mark.parametrize("period, width", [(1, 2.0), (20, 2.0), (10, 1.5)])
+def test_bollinger_matches_rolling_reference(period, width):
+    bars = _bars(200, seed=3)
+    close = pd.Series(bars["close"]).rolling(period)
+    middle, deviation = close.mean(), close.std(ddof=0)
+    expected = np.column_stack([middle, middle + width * deviation, middle - width * deviation])
+    assert np.allclose(_run(Bollinger(period, width), bars), expected, rtol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("period", [1, 20])
+def test_vwap_matches_rolling_reference(period):
+    bars = _bars(200, seed=4)
+    typical = (bars["high"] + bars["low"] + bars["close"]) / 3
+    volume = pd.Series(bars["volume"])
+    expected = (pd.Series(typical) * volume).rolling(period).sum() / volume.rolling(period).sum()
+    assert np.allclose(_run(VWAP(period), bars)[:, 0], expected, rtol=1e-9, equal_nan=True)
+
+
+def test_ema_matches_pandas():
+    bars = _bars(200, seed=5)
+    expected = pd.Series(bars["close"]).ewm(span=9, adjust=False).mean()
+    assert np.array_equal(_run(EMA(9), bars)[:, 0], expected.to_numpy())
+
+
+@pytest.mark.parametrize("make", [lambda: EMA(0), lambda: RSI(-1), lambda: ATR(2.5), lambda: Bollinger(0), lambda: Bollinger(20, 0.0),
+                                  lambda: VWAP(True), lambda: RSI("14")])
+def test_invalid_parameters_raise_value_error(make):
+    with pytest.raises(ValueError):
+        make()
+
+
+def test_indicator_is_abstract():
+    class Incomplete(Indicator):
+        name = "incomplete"
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def _store(seed: int, n: int = 60) -> KlineStore:
+    bars = _bars(n, seed)
+    return KlineStore.from_klines([[t * 60_000, bars["open"][t], bars["high"][t], bars["low"][t], bars["close"][t], bars["volume"][t],
+                                    t * 60_000 + 59_999, 0.0, 1, 0.0, 0.0] for t in range(n)])
+
+
+INDICATORS = [EMA(5), RSI(14), Bollinger(20, 2.0)]
+
+
+def _values(engine: IndicatorEngine, symbol: str) -> list:
+    view = engine.view(symbol)
+    return [view[indicator] for indicator in INDICATORS] + [view.prev(indicator) for indicator in INDICATORS]
+
+
+def _reference(seed: int) -> list:
+    engine = IndicatorEngine()
+    engine.add_symbol("REF", INDICATORS, _store(seed))
+    return _values(engine, "REF")
+
+
+def test_engine_grows_without_losing_rows():
+    engine = IndicatorEngine(capacity=2)
+    for seed in range(5): engine.add_symbol(f"S{seed}", INDICATORS, _store(seed))
+    assert engine._capacity == 8
+    for seed in range(5): assert _values(engine, f"S{seed}") == _reference(seed)
+
+
+def test_removed_row_is_reused_with_fresh_state():
+    engine = IndicatorEngine(capacity=4)
+    for seed in range(3): engine.add_symbol(f"S{seed}", INDICATORS, _store(seed))
+    row = engine._rows["S1"]
+    engine.remove_symbol("S1")
+    assert "S1" not in engine and engine.indicator_keys
+    # Yeni sembol boşalan satırı alır; önceki sembolün durumu (sayım, Wilder ortalamaları, pencere) taşınmaz
+    engine.add_symbol("NEW", INDICATORS, _store(7, n=30))
+    assert engine._rows["NEW"] == row
+    fresh = IndicatorEngine()
+    fresh.add_symbol("REF", INDICATORS, _store(7, n=30))
+    assert _values(engine, "NEW") == _values(fresh, "REF")
+    assert [engine.view("NEW").count(indicator) for indicator in INDICATORS] == [30] * 3
+    assert _values(engine, "S0") == _reference(0) and _values(engine, "S2") == _reference(2)
+
+
+def test_readding_symbol_resets_its_indicators():
+    engine = IndicatorEngine()
+    engine.add_symbol("S0", INDICATORS, _store(0))
+    engine.add_symbol("S0", INDICATORS, _store(3))
+    assert _values(engine, "S0") == _reference(3)
+    assert engine.view("S0").count(INDICATORS[0]) == 60
+
+
+def test_shared_indicator_is_stepped_once_per_update():
+    engine = IndicatorEngine()
+    engine.add_symbol("A", [EMA(5), RSI(14)]); engine.add_symbol("B", [EMA(5)])
+    assert sorted(engine.indicator_keys) == [("ema", 5), ("rsi", 14)]
+    store = _store(0, n=1)
+    engine.update([("A", store), ("B", store)])
+    # EMA iki satır için tek adımda, RSI yalnızca isteyen satırda
+    assert engine.metrics["indicator_steps"] == 2 and engine.metrics["rows_stepped"] == 3
+    assert engine.view("B").count(RSI(14)) == 0
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from app.kline_store import KLINE_EVENT_KEYS, KlineStore, _segments, attach_shared_column, detach_shared
+
+
+def _rest(i: int) -> list:
+    """REST biçiminde (metin fiyatlar, sonda `ignore`) mum; kapanış 100 + i."""
+    return [i * 60_000, f"{99 + i}", f"{101 + i}", f"{98 + i}", f"{100 + i}", "5.0", i * 60_000 + 59_999, "500.0", 7, "2.5", "250.0", "0"]
+
+
+def _event(i: int, close: float | None = None) -> dict:
+    row = _rest(i)
+    if close is not None: row[4] = str(close)
+    return dict(zip(KLINE_EVENT_KEYS, row))
+
+
+def test_ring_wraps_and_keeps_chronological_views():
+    store = KlineStore(4)
+    for i in range(10): store.append(tuple(float(v) for v in _rest(i)[:11]))
+    assert len(store) == 4 and store.last_open_time == 9 * 60_000
+    assert store.open_time.tolist() == [i * 60_000 for i in range(6, 10)]
+    assert store.close.tolist() == [106.0, 107.0, 108.0, 109.0]
+    # Görünüm kopyasız, tek parça ve salt okunur
+    assert store.close.base is store._columns["close"] and store.close.flags.c_contiguous
+    with pytest.raises(ValueError): store.close[0] = 0.0
+
+
+def test_extend_beyond_capacity_keeps_the_newest():
+    store = KlineStore.from_klines([_rest(i) for i in range(3)], capacity=4)
+    store.extend([_rest(i) for i in range(3, 13)])
+    assert store.close.tolist() == [109.0, 110.0, 111.0, 112.0] and store.trades.dtype == np.int64
+    # Halka sınırını aşan kısmi toplu ekleme
+    store = KlineStore.from_klines([_rest(i) for i in range(3)], capacity=4)
+    store.extend([_rest(i) for i in range(3, 6)])
+    assert store.close.tolist() == [102.0, 103.0, 104.0, 105.0]
+    store.extend([])
+    assert len(store) == 4
+
+
+def test_append_event_ignores_repeated_and_older_candles():
+    store = KlineStore.from_klines([_rest(i) for i in range(3)], capacity=5)
+    assert store.append_event(_event(3)) is True
+    assert store.append_event(_event(3, close=999.0)) is False
+    assert store.append_event(_event(1)) is False
+    assert store.close.tolist() == [100.0, 101.0, 102.0, 103.0] and store.volume[-1] == 5.0
+    assert KlineStore(2).append_event(_event(0)) is True  # Boş depoda ilk olay
+
+
+def test_tail_is_an_independent_copy():
+    store = KlineStore.from_klines([_rest(i) for i in range(6)], capacity=4)
+    snapshot = store.tail(2)
+    assert snapshot.capacity == 2 and snapshot.close.tolist() == [104.0, 105.0]
+    assert not np.shares_memory(snapshot.close, store.close)
+    store.append_event(_event(6))
+    assert snapshot.close.tolist() == [104.0, 105.0] and store.close[-1] == 106.0
+    assert len(store.tail(10)) == 4 and len(KlineStore(3).tail(2)) == 0
+
+
+def test_shared_column_is_a_view_of_the_owner_memory():
+    store = KlineStore.from_klines([_rest(i) for i in range(6)], capacity=4, shared=True)
+    try:
+        assert KlineStore(2).shared_ref is None
+        close = attach_shared_column(store.shared_ref, "close")
+        trades = attach_shared_column(store.shared_ref, "trades")
+        assert close.tolist() == store.close.tolist() and trades.tolist() == [7] * 4 and trades.dtype == np.int64
+        name = store.shared_ref[0]
+        # Sahibin yazdığı mum aynı bellekte görünür; yeni ref güncel pencereyi verir, bağlantı yeniden açılmaz
+        store.append_event(_event(6))
+        segment = _segments[name]
+        latest = attach_shared_column(store.shared_ref, "close")
+        assert latest.tolist() == [103.0, 104.0, 105.0, 106.0] and _segments[name] is segment
+        # Eski görünüm kopya değildir: halkada üzerine yazılan en eski yuva yeni mumu gösterir
+        assert close.tolist() == [106.0, 103.0, 104.0, 105.0]
+        # Görünümler yaşarken bağlantı kapatılmaz; bırakılınca kapatılır
+        others = {other for other in _segments if other != name}  # Başka testlerden kalan bağlantılar
+        assert detach_shared(others) == 0 and name in _segments
+        del close, trades, latest
+        assert detach_shared(others | {name}) == 0 and detach_shared(others) == 1 and name not in _segments
+    finally:
+        store.release()
@@ -0,0 +1,57 @@
+import asyncio
+import json
+from app.market_stream import MarketStreamManager, StreamGroup
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent: list[tuple[float, dict]] = []
+
+    async def send(self, text: str):
+        self.sent.append((asyncio.get_running_loop().time(), json.loads(text)))
+
+
+def _connected_group(control_rate: float = 5.0) -> tuple[StreamGroup, FakeSocket]:
+    manager = MarketStreamManager(None, control_rate=control_rate)
+    group = StreamGroup(manager, 0)
+    group.ws, group.task = FakeSocket(), asyncio.get_running_loop().create_future()  # Gerçek bağlantı kurulmaz
+    return group, group.ws
+
+
+def test_bulk_subscribe_is_batched_into_one_message():
+    async def scenario():
+        group, ws = _connected_group()
+        for i in range(50): await group.add([f"s{i}usdt@kline_5m"])
+        await asyncio.sleep(0.05)
+        return ws.sent
+    sent = asyncio.run(scenario())
+    assert len(sent) == 1
+    assert sent[0][1]["method"] == "SUBSCRIBE" and len(sent[0][1]["params"]) == 50
+
+
+def test_control_messages_respect_rate_limit():
+    async def scenario():
+        group, ws = _connected_group(control_rate=10.0)
+        for i in range(5):
+            await group.add([f"a{i}usdt@kline_5m"])
+            await asyncio.sleep(0.01)
+            if i % 2: await group.remove([f"a{i}usdt@kline_5m"])
+        while group._pending or (group._sender and not group._sender.done()): await asyncio.sleep(0.01)
+        return ws.sent
+    sent = asyncio.run(scenario())
+    gaps = [b[0] - a[0] for a, b in zip(sent, sent[1:])]
+    assert len(sent) > 1
+    assert all(gap >= 0.1 - 1e-3 for gap in gaps)
+
+
+def test_last_operation_per_stream_wins():
+    async def scenario():
+        group, ws = _connected_group()
+        await group.add(["x@kline_5m", "y@kline_5m"])
+        await group.remove(["x@kline_5m"])
+        await asyncio.sleep(0.3)  # İkinci mesaj 1/control_rate sn sonra gider
+        return ws.sent
+    sent = asyncio.run(scenario())
+    methods = {message["method"]: message["params"] for _, message in sent}
+    assert methods["UNSUBSCRIBE"] == ["x@kline_5m"]
+    assert methods["SUBSCRIBE"] == ["y@kline_5m"]
@@ -0,0 +1,49 @@
+import asyncio
+from app.order_pipeline import OrderPipeline
+from app.symbol_metadata import SymbolMeta
+from benchmarks.mock_exchange import MockExchangeClient
+
+META = SymbolMeta("BTCUSDT", "0.1", "0.001", min_qty="0.001", max_qty="1000")
+
+
+class FailingStopClient(MockExchangeClient):
+    """TP kurulur ama SL (STOP_MARKET) bacağı borsa tarafından reddedilir."""
+    async def futures_create_order(self, **params):
+        if params["type"] == "STOP_MARKET":
+            await self._round_trip("algoOrder", params)
+            raise ConnectionError("SL emri reddedildi")
+        return await super().futures_create_order(**params)
+
+
+def _open_orders(client: MockExchangeClient, symbol: str) -> list[dict]:
+    return [o for o in client.orders.values() if o["symbol"] == symbol and o["status"] == "NEW"]
+
+
+def test_failed_protection_leg_leaves_no_open_orders():
+    client = FailingStopClient(latency=0.0, fill_delay=0.0, event_delay=0.0)
+    result = asyncio.run(OrderPipeline(fill_timeout=0.1).open_position(client, "BTCUSDT", "BUY", "0.010", 100.0, META))
+    assert result is None
+    # Kurulan TP koşullu emirdir; yalnızca normal emirleri iptal etmek onu yetim bırakırdı
+    assert _open_orders(client, "BTCUSDT") == []
+    assert client.positions["BTCUSDT"][0] == 0
+    cancels = [params for _, endpoint, params in client.requests if endpoint in ("allOpenOrders", "algoOpenOrders")]
+    assert len(cancels) == 2
+
+
+def test_successful_entry_keeps_both_protection_orders():
+    client = MockExchangeClient(latency=0.0, fill_delay=0.0, event_delay=0.0)
+    result = asyncio.run(OrderPipeline(fill_timeout=0.1).open_position(client, "BTCUSDT", "SELL", "0.010", 100.0, META))
+    assert result is not None
+    assert sorted(o["type"] for o in _open_orders(client, "BTCUSDT")) == ["STOP_MARKET", "TAKE_PROFIT_MARKET"]
+
+
+def test_symbol_cleanup_cancels_conditional_orders():
+    from app.binance_client import BinanceClient
+    client = MockExchangeClient(latency=0.0, fill_delay=0.0, event_delay=0.0)
+    async def scenario():
+        await client.futures_create_order(symbol="BTCUSDT", side="SELL", type="TAKE_PROFIT_MARKET", stopPrice="110", closePosition=True)
+        await client.futures_create_order(symbol="BTCUSDT", side="SELL", type="LIMIT", quantity="0.010", price="120")
+        binance = BinanceClient(); binance.client = client
+        await binance.cancel_all_symbol_orders("BTCUSDT")
+    asyncio.run(scenario())
+    assert _open_orders(client, "BTCUSDT") == []
@@ -0,0 +1,66 @@
+import asyncio
+import time
+import pytest
+from app.price_cache import PriceCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+class RestPrices:
+    def __init__(self, price: float | None):
+        self.price, self.calls = price, []
+
+    async def fetch(self, symbol: str) -> float | None:
+        self.calls.append(symbol)
+        return self.price
+
+
+def test_price_goes_stale_after_max_age(clock):
+    cache = PriceCache(max_age=2.0)
+    cache.update("BTCUSDT", 100.0, "bookTicker")
+    clock[0] += 2.0
+    assert cache.get("BTCUSDT") == 100.0 and cache.age("BTCUSDT") == 2.0  # Tam sınırda hâlâ taze
+    assert cache.get("BTCUSDT", max_age=1.0) is None
+    clock[0] += 0.001
+    assert cache.get("BTCUSDT") is None
+    # Yeni akış değeri zaman damgasını yeniler
+    cache.update("BTCUSDT", 101.0, "markPrice")
+    assert cache.get("BTCUSDT") == 101.0 and cache.age("BTCUSDT") == 0.0
+    assert cache.get("ETHUSDT") is None and cache.age("ETHUSDT") is None
+
+
+def test_fresh_price_skips_rest(clock):
+    cache, rest = PriceCache(max_age=2.0), RestPrices(99.0)
+    cache.update("BTCUSDT", 100.0, "kline")
+    clock[0] += 1.0
+    assert asyncio.run(cache.get_or_fetch("BTCUSDT", rest.fetch)) == 100.0
+    assert rest.calls == [] and (cache.hits, cache.misses) == (1, 0)
+
+
+def test_stale_or_missing_price_falls_back_to_rest(clock):
+    cache, rest = PriceCache(max_age=2.0), RestPrices(99.0)
+    cache.update("BTCUSDT", 100.0, "kline")
+    clock[0] += 5.0
+    async def scenario():
+        return [await cache.get_or_fetch(symbol, rest.fetch) for symbol in ("BTCUSDT", "ETHUSDT", "BTCUSDT")]
+    # REST fiyatı önbelleğe yazılır; hemen ardından gelen istek ağa gitmez
+    assert asyncio.run(scenario()) == [99.0, 99.0, 99.0]
+    assert rest.calls == ["BTCUSDT", "ETHUSDT"] and (cache.hits, cache.misses) == (1, 2)
+    assert cache._prices["BTCUSDT"][2] == "rest" and cache.age("BTCUSDT") == 0.0
+
+
+def test_failed_rest_fetch_is_not_cached(clock):
+    cache, rest = PriceCache(max_age=2.0), RestPrices(None)
+    cache.update("BTCUSDT", 100.0, "kline")
+    clock[0] += 5.0
+    assert asyncio.run(cache.get_or_fetch("BTCUSDT", rest.fetch)) is None
+    # Bayat değer tazelenmiş gibi görünmez; sonraki istek yine REST'e gider
+    assert cache.get("BTCUSDT") is None and cache.age("BTCUSDT") == 5.0
+    cache.discard("BTCUSDT")
+    assert asyncio.run(cache.get_or_fetch("BTCUSDT", rest.fetch)) is None
+    assert rest.calls == ["BTCUSDT", "BTCUSDT"] and cache.misses == 2
@@ -0,0 +1,145 @@
+import asyncio
+import time
+import pytest
+from app.rest_scheduler import RestScheduler, ScheduledClient
+
+NOW = 1_700_000_010.0  # Dakika penceresinin başında; test süresince pencere dönmez
+
+
+class FakeResponse:
+    def __init__(self, used_weight: int | None):
+        self.headers = {} if used_weight is None else {"X-MBX-USED-WEIGHT-1M": str(used_weight)}
+
+
+class FakeRestClient:
+    """
+    `AsyncClient._request` taklidi: yanıt `self.response` alanına yazılır, gövde `_handle_response` içinde okunurken
+    olay döngüsü başka isteklere geçer. `plan` yöntem başına (gövde okuma süresi, bildirilen ağırlık) verir.
+    """
+    def __init__(self, plan: dict[str, tuple[float, int | None]] | None = None):
+        self.plan = plan or {}
+        self.response = None
+        self.calls: list[tuple[str, dict]] = []
+
+    def __getattr__(self, name: str):
+        if not name.startswith("futures_"): raise AttributeError(name)
+        async def request(**params): return await self._request(name, params)
+        return request
+
+    async def _request(self, name: str, params: dict):
+        self.calls.append((name, params))
+        delay, used_weight = self.plan.get(name, (0.0, None))
+        self.response = response = FakeResponse(used_weight)
+        await asyncio.sleep(delay)
+        return await self._handle_response(response)
+
+    async def _handle_response(self, response):
+        await asyncio.sleep(0)
+        return {"used": response.headers.get("X-MBX-USED-WEIGHT-1M")}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [NOW]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def test_used_weight_header_is_read_from_the_calls_own_response(clock):
+    # Ağır istek gövdesini okurken hafif istek paylaşılan `client.response` alanının üzerine yazar
+    client = FakeRestClient({"futures_account": (0.05, 800), "futures_symbol_ticker": (0.0, 30)})
+    scheduler = RestScheduler(weight_limit=2400, safety=1.0)
+    rest = ScheduledClient(client, scheduler)
+    async def scenario():
+        account = asyncio.create_task(rest.futures_account())
+        await asyncio.sleep(0.01)
+        await rest.futures_symbol_ticker(symbol="BTCUSDT")
+        return await account
+    assert asyncio.run(scenario()) == {"used": "800"}
+    assert client.response.headers["X-MBX-USED-WEIGHT-1M"] == "30"
+    assert scheduler.snapshot()["used_weight_1m"] == 800
+
+
+def test_local_weight_is_charged_per_endpoint_and_lower_headers_do_not_undo_it(clock):
+    client = FakeRestClient({"futures_klines": (0.0, 3)})
+    scheduler = RestScheduler(weight_limit=2400, safety=1.0)
+    rest = ScheduledClient(client, scheduler)
+    async def scenario():
+        await rest.futures_klines(symbol="BTCUSDT", interval="1m", limit=1000)  # 5
+        await rest.futures_klines(symbol="BTCUSDT", interval="1m", limit=1500)  # 10
+        await rest.futures_account()                                            # 5
+        await rest.futures_create_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=1)  # 0, emir sayısı 1
+    asyncio.run(scenario())
+    snapshot = scheduler.snapshot()
+    assert snapshot["used_weight_1m"] == 20
+    assert snapshot["order_count_10s"] == snapshot["order_count_1m"] == 1
+    assert snapshot["requests"] == 4 and snapshot["queued"] == 0
+
+
+def test_metadata_waits_for_reserve_while_orders_go_through(clock):
+    # Borsa 85 bildirir: meta veri payı (80) dolu, emir payı (100) değil
+    client = FakeRestClient({"futures_account": (0.0, 85)})
+    scheduler = RestScheduler(weight_limit=100, safety=1.0, order_reserve=0.2)
+    rest = ScheduledClient(client, scheduler)
+    async def scenario():
+        await rest.futures_account()
+        klines = asyncio.create_task(rest.futures_klines(symbol="BTCUSDT", interval="1m", limit=50))
+        await asyncio.wait_for(rest.futures_cancel_all_open_orders(symbol="BTCUSDT"), 1.0)
+        await asyncio.sleep(0.05)
+        waiting = scheduler.snapshot()["waiting"]
+        klines.cancel(); scheduler._dispatcher.cancel()
+        return waiting
+    assert asyncio.run(scenario()) == 1
+    assert [name for name, _ in client.calls] == ["futures_account", "futures_cancel_all_open_orders"]
+
+
+def test_queued_requests_are_released_in_priority_order(clock):
+    client = FakeRestClient()
+    scheduler = RestScheduler(weight_limit=2400, safety=1.0)
+    rest = ScheduledClient(client, scheduler)
+    clock[0] = NOW + 30 - 0.05  # Dağıtıcı pencere sınırında uyanır
+    async def scenario():
+        scheduler._blocked_until = clock[0] + 0.05  # 429 sonrası yasak: gelen her istek kuyruğa girer
+        requests = [asyncio.create_task(request) for request in (
+            rest.futures_exchange_info(), rest.futures_klines(symbol="BTCUSDT", interval="1m", limit=50),
+            rest.futures_position_information(symbol="BTCUSDT"), rest.futures_cancel_order(symbol="BTCUSDT", orderId=1),
+            rest.futures_create_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=1))]
+        await asyncio.sleep(0.02)
+        assert client.calls == [] and scheduler.snapshot()["waiting"] == 5
+        clock[0] += 1
+        await asyncio.wait_for(asyncio.gather(*requests), 1.0)
+    asyncio.run(scenario())
+    # Emir/iptal > hesap > meta veri; aynı öncelikte geliş sırası korunur
+    assert [name for name, _ in client.calls] == ["futures_cancel_order", "futures_create_order", "futures_position_information",
+                                                 "futures_exchange_info", "futures_klines"]
+
+
+def test_identical_concurrent_reads_are_coalesced(clock):
+    client = FakeRestClient({"futures_position_information": (0.05, None)})
+    scheduler = RestScheduler()
+    rest = ScheduledClient(client, scheduler)
+    async def scenario():
+        first = asyncio.create_task(rest.futures_position_information(symbol="BTCUSDT"))
+        await asyncio.sleep(0)
+        same = [asyncio.create_task(rest.futures_position_information(symbol="BTCUSDT")) for _ in range(3)]
+        other = asyncio.create_task(rest.futures_position_information(symbol="ETHUSDT"))
+        await asyncio.sleep(0)
+        first.cancel()  # Bir çağıranın iptali ortak isteği iptal etmez
+        results = await asyncio.gather(*same, other)
+        # Yanıt döndükten sonra gelen aynı istek yeniden gönderilir
+        await rest.futures_position_information(symbol="BTCUSDT")
+        return results
+    results = asyncio.run(scenario())
+    assert all(result is results[0] for result in results[:3])
+    assert [params["symbol"] for _, params in client.calls] == ["BTCUSDT", "ETHUSDT", "BTCUSDT"]
+    assert scheduler.metrics["coalesced"] == 3 and scheduler.snapshot()["inflight"] == 0
+
+
+def test_orders_are_never_coalesced(clock):
+    client = FakeRestClient({"futures_create_order": (0.02, None)})
+    rest = ScheduledClient(client, RestScheduler())
+    async def scenario():
+        order = {"symbol": "BTCUSDT", "side": "BUY", "type": "MARKET", "quantity": 1}
+        await asyncio.gather(rest.futures_create_order(**order), rest.futures_create_order(**order))
+    asyncio.run(scenario())
+    assert len(client.calls) == 2
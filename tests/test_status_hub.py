@@ -0,0 +1,90 @@
+import asyncio
+import json
+import pytest
+from app.config import settings
+from app.status_hub import StatusHub, merge_patch
+
+
+def _apply(target: dict, patch: dict) -> dict:
+    """RFC 7386 uygulaması: None anahtarı siler, iç içe sözlükler birleştirilir."""
+    result = dict(target)
+    for key, value in patch.items():
+        if value is None: result.pop(key, None)
+        elif isinstance(value, dict): result[key] = _apply(result.get(key) if isinstance(result.get(key), dict) else {}, value)
+        else: result[key] = value
+    return result
+
+
+OLD = {"message": "a", "symbols": {"BTCUSDT": {"price": 1.0, "signal": "HOLD"}, "ETHUSDT": {"price": 2.0}},
+       "removed": 1, "same": {"x": [1, 2]}, "shape": {"k": 1}}
+NEW = {"message": "b", "symbols": {"BTCUSDT": {"price": 1.5, "signal": "HOLD"}, "SOLUSDT": {"price": 3.0}},
+       "same": {"x": [1, 2]}, "shape": [1], "added": {"k": None}}
+
+
+def test_merge_patch_contains_only_changes():
+    patch = merge_patch(OLD, NEW)
+    assert patch == {"message": "b", "removed": None, "shape": [1], "added": {"k": None},
+                     "symbols": {"BTCUSDT": {"price": 1.5}, "ETHUSDT": None, "SOLUSDT": {"price": 3.0}}}
+    assert merge_patch(NEW, NEW) == {}
+
+
+def test_merge_patch_round_trips():
+    # Değeri None olan yaprak anahtar RFC 7386'da ifade edilemez; geri kalanı birebir kurulur
+    expected = NEW | {"added": {}}
+    assert _apply(OLD, merge_patch(OLD, NEW)) == expected
+
+
+class Recorder:
+    def __init__(self, block_after: int | None = None):
+        self.messages: list[dict] = []
+        self.block_after, self.gate = block_after, asyncio.Event()
+
+    async def send_text(self, text: str):
+        if self.block_after is not None and len(self.messages) >= self.block_after: await self.gate.wait()
+        self.messages.append(json.loads(text))
+
+    def updates(self) -> list[dict]:
+        return [message for message in self.messages if message["type"] == "update"]
+
+
+def test_burst_is_coalesced_into_one_message():
+    status = {"message": "idle", "symbols": {"BTCUSDT": {"signal": "HOLD"}}}
+    hub = StatusHub(lambda: status, interval=0.05)
+    client = Recorder()
+    async def scenario():
+        serve = asyncio.create_task(hub.serve(client.send_text))
+        while not client.messages: await asyncio.sleep(0)
+        for i in range(10): hub.publish("candle", symbol="BTCUSDT", close=100 + i)
+        status["symbols"]["BTCUSDT"]["signal"] = "LONG"; hub.notify()
+        hub.publish("signal", symbol="BTCUSDT", signal="LONG")
+        await asyncio.sleep(0.2)
+        status["message"] = "done"; hub.notify()
+        await asyncio.sleep(0.2)
+        serve.cancel()
+    asyncio.run(scenario())
+    assert client.messages[0] == {"type": "snapshot", "status": {"message": "idle", "symbols": {"BTCUSDT": {"signal": "HOLD"}}}}
+    first, second = client.updates()
+    assert [event["close"] for event in first["events"][:10]] == list(range(100, 110))
+    assert first["events"][10] == {"type": "signal", "symbol": "BTCUSDT", "signal": "LONG"}
+    assert first["status"] == {"symbols": {"BTCUSDT": {"signal": "LONG"}}}
+    assert second == {"type": "update", "status": {"message": "done"}, "events": []}
+    assert hub.metrics["messages"] == 2 and hub.metrics["events"] == 11
+
+
+def test_client_with_full_queue_is_disconnected(monkeypatch):
+    monkeypatch.setattr(settings, "STATUS_PUSH_SEND_TIMEOUT_SECONDS", 0.3)
+    hub = StatusHub(lambda: {}, interval=0.01, queue_size=2)
+    fast, slow = Recorder(), Recorder(block_after=1)  # Yavaş istemci anlık görüntüden sonra takılır
+    async def scenario():
+        serves = [asyncio.create_task(hub.serve(client.send_text)) for client in (fast, slow)]
+        while not (fast.messages and slow.messages): await asyncio.sleep(0)
+        for i in range(5):
+            hub.publish("candle", index=i)
+            await asyncio.sleep(0.04)
+        # Kuyruğu dolan istemci yayını bekletmez; diğer istemci tüm güncellemeleri alır
+        assert hub.client_count == 1 and hub.metrics["dropped_clients"] == 1
+        await asyncio.wait_for(serves[1], 1.0)
+        serves[0].cancel()
+    asyncio.run(scenario())
+    assert [update["events"][0]["index"] for update in fast.updates()] == list(range(5))
+    assert slow.updates() == [] and hub.metrics["dropped_clients"] == 1
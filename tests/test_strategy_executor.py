@@ -0,0 +1,127 @@
+import asyncio
+import numpy as np
+import pytest
+from app.indicators import BAR_FIELDS, IndicatorEngine
+from app.kline_store import KlineStore
+from app.strategy_executor import StrategyExecutor, _evaluate_shared
+from app.trading_strategy import STRATEGIES, create_strategy
+
+
+class _State:
+    def __init__(self, symbol: str, strategy, klines: KlineStore):
+        self.symbol, self.strategy, self.klines = symbol, strategy, klines
+
+
+def _klines(n: int, seed: int) -> list[list]:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.3, n))
+    spread = np.abs(rng.normal(0, 0.2, n))
+    return [[i * 60_000, close[i - 1] if i else close[0], close[i] + spread[i], close[i] - spread[i], close[i], 10 + i % 7,
+             i * 60_000 + 59_999, close[i] * 10, 5, 5.0, close[i] * 5] for i in range(n)]
+
+
+@pytest.mark.parametrize("name", sorted(STRATEGIES))
+def test_process_window_indicators_converge_to_streaming_values(name):
+    """Süreç havuzu her mumda pencereden baştan hesaplar; pencere akışlı göstergelerin değerine yakınsamalı."""
+    strategy = create_strategy(name)
+    window = StrategyExecutor(None, mode="process").history_size(strategy)
+    assert window >= 20 * max(indicator.period for indicator in strategy.indicators())
+    klines = _klines(window + 500, seed=len(name))
+    # Akışlı göstergeler botun başlangıcından beri tüm mumları görmüştür
+    engine = IndicatorEngine()
+    engine.add_symbol("TEST", strategy.indicators(), KlineStore.from_klines(klines))
+    recent = KlineStore.from_klines(klines[-window:])
+    stateless = IndicatorEngine.from_window(["TEST"], {field: recent.column(field)[None, :] for field in BAR_FIELDS}, strategy.indicators())
+    for indicator in strategy.indicators():
+        expected = np.array(engine.view("TEST")[indicator])
+        assert np.allclose(stateless.view("TEST")[indicator], expected, rtol=1e-5, atol=0), indicator
+
+
+def test_thread_mode_evaluates_the_submitted_candle():
+    """İş parçacığı çalışmadan önce depoya eklenen sonraki mum, önceki kapanışın değerlendirmesine karışmamalı."""
+    klines = _klines(60, seed=7)
+    store = KlineStore.from_klines(klines[:50], capacity=50)
+    state = _State("TEST", create_strategy(), store)
+    async def scenario():
+        executor = StrategyExecutor(lambda *args: None, mode="thread")
+        executor.add_symbol(state)
+        executor.submit(state, klines[49][0], klines[49][6], 0.0, evaluate=False)
+        store.extend([klines[50]])  # Olay döngüsü bir sonraki kapanışı iş parçacığı başlamadan ekler
+        await executor.drain()
+        close = executor.engine.view("TEST").close
+        await executor.close()
+        return close
+    assert asyncio.run(scenario()) == klines[49][4]
+
+
+def test_worker_detaches_segments_of_removed_symbols():
+    from app import kline_store
+    klines = _klines(60, seed=3)
+    stores = {symbol: KlineStore.from_klines(klines, shared=True) for symbol in ("AAA", "BBB")}
+    strategy = create_strategy()
+    try:
+        items = [(symbol, store.shared_ref, strategy) for symbol, store in stores.items()]
+        names = frozenset(store.shared_ref[0] for store in stores.values())
+        _evaluate_shared(items, names)
+        assert names <= set(kline_store._segments)
+        # BBB durduruldu: sonraki toplu işte işçi onun bağlantısını kapatır
+        _evaluate_shared(items[:1], frozenset([stores["AAA"].shared_ref[0]]))
+        assert stores["BBB"].shared_ref[0] not in kline_store._segments
+        assert stores["AAA"].shared_ref[0] in kline_store._segments
+    finally:
+        kline_store.detach_shared(())
+        for store in stores.values(): store.release()
+
+
+def test_executor_tracks_live_shared_segments():
+    executor = StrategyExecutor(None, mode="process")
+    states = [_State(symbol, create_strategy(), KlineStore.from_klines(_klines(30, seed=1), shared=True)) for symbol in ("AAA", "BBB")]
+    try:
+        for state in states: executor.add_symbol(state)
+        executor.remove_symbol(states[1])
+        assert executor._shared_names == {states[0].klines.shared_ref[0]}
+    finally:
+        for state in states: state.klines.release()
+
+
+def test_symbol_stopped_during_setup_releases_shared_klines(monkeypatch):
+    from app import bot_core
+    from app.binance_client import binance_client
+    from app.symbol_metadata import SymbolMeta
+    created = []
+    class RecordingStore(KlineStore):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs); created.append(self)
+    monkeypatch.setattr(bot_core, "KlineStore", RecordingStore)
+    async def scenario():
+        bot = bot_core.BotCore()
+        bot.strategy_executor = StrategyExecutor(bot._on_signal, mode="process")
+        async def history(symbol, interval, limit=100, **_):
+            await bot.stop(symbol)  # Kullanıcı geçmiş yüklenirken sembolü durdurdu
+            return _klines(limit, seed=5)
+        async def noop(*_): return True
+        async def meta(symbol): return SymbolMeta(symbol, "0.1", "0.001")
+        for name, function in (("initialize", noop), ("get_symbol_info", meta), ("set_leverage", noop), ("get_historical_klines", history),
+                               ("close", noop)):
+            monkeypatch.setattr(binance_client, name, function)
+        await bot.start("BTCUSDT")
+        return bot
+    bot = asyncio.run(scenario())
+    assert "BTCUSDT" not in bot.symbols
+    assert len(created) == 1 and created[0].shared_ref is None
+
+
+def test_worker_keeps_segments_with_live_views():
+    from app import kline_store
+    store = KlineStore.from_klines(_klines(30, seed=2), shared=True)
+    try:
+        name = store.shared_ref[0]
+        close = kline_store.attach_shared_column(store.shared_ref, "close")[-5:]
+        # Görünüm yaşarken kapatılsaydı okuma süreci çökertirdi
+        kline_store.detach_shared(())
+        assert name in kline_store._segments
+        assert close.tolist() == [float(kline[4]) for kline in _klines(30, seed=2)[-5:]]
+        del close
+        assert kline_store.detach_shared(()) == 1 and name not in kline_store._segments
+    finally:
+        store.release()
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from app.sweep import build_tasks, resample
+
+
+def _minute_columns(n: int) -> dict:
+    open_time = np.arange(n, dtype=np.int64) * 60_000
+    price = 100 + np.arange(n, dtype=np.float64)
+    return {"open_time": open_time, "open": price, "high": price + 1, "low": price - 1, "close": price + 0.5}
+
+
+def test_resample_aggregates_ohlc():
+    out = resample(_minute_columns(10), "5m")
+    assert out["open_time"].tolist() == [0, 300_000]
+    assert out["open"].tolist() == [100, 105] and out["close"].tolist() == [104.5, 109.5]
+    assert out["high"].tolist() == [105, 110] and out["low"].tolist() == [99, 104]
+
+
+@pytest.mark.parametrize("interval", ["1m", "3m"])
+def test_resample_rejects_finer_or_non_multiple_interval(interval):
+    columns = _minute_columns(20)
+    columns["open_time"] = columns["open_time"] * 2  # 2 dakikalık temel veri
+    with pytest.raises(ValueError):
+        resample(columns, interval)
+
+
+def test_empty_grid_builds_no_tasks():
+    tasks, combos = build_tasks(["BTCUSDT"], ["5m"], [20], [10], [0.003], [0.005])
+    assert tasks == [] and combos == 0
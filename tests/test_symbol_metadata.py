@@ -0,0 +1,107 @@
+import asyncio
+import json
+import time
+from decimal import Decimal
+import pytest
+from app.symbol_metadata import SymbolMeta, SymbolMetadataService
+
+
+def _info(symbol: str, status: str = "TRADING") -> dict:
+    return {"symbol": symbol, "status": status, "filters": [
+        {"filterType": "PRICE_FILTER", "tickSize": "0.10"},
+        {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001", "maxQty": "100"},
+        {"filterType": "MARKET_LOT_SIZE", "stepSize": "0.010", "maxQty": "5.0005"},
+        {"filterType": "MIN_NOTIONAL", "notional": "5"}]}
+
+
+META = SymbolMeta.from_exchange_info(_info("BTCUSDT"))
+
+
+class ExchangeInfoClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def futures_exchange_info(self):
+        self.calls += 1
+        return {"symbols": [_info("BTCUSDT"), _info("ETHUSDT"), _info("OLDUSDT", status="SETTLING")]}
+
+
+def test_filters_are_parsed_from_exchange_info():
+    assert (META.tick_size, META.step_size, META.min_qty, META.max_qty) == (Decimal("0.10"), Decimal("0.001"), Decimal("0.001"), Decimal("100"))
+    assert (META.market_step_size, META.market_max_qty, META.min_notional) == (Decimal("0.010"), Decimal("5.0005"), Decimal("5"))
+    assert (META.price_precision, META.quantity_precision) == (1, 3)
+
+
+@pytest.mark.parametrize("quantity, market, expected", [
+    (0.003, False, "0.003"),                # Tam adım sınırında
+    (0.1 + 0.2, False, "0.300"),            # 0.30000000000000004 ikilik hata payı aşağı yuvarlanmaz
+    (0.0029999, False, "0.002"),            # Sınırın hemen altı aşağı
+    (1.239, True, "1.230"),                  # Piyasa emri MARKET_LOT_SIZE adımıyla
+    ("0.02", True, "0.020"),
+])
+# Borsaya giden metin biçimi adım/tik dizgesinin ondalık hanesini korur
+def test_round_quantity_at_step_boundaries(quantity, market, expected):
+    assert str(META.round_quantity(quantity, market=market)) == expected
+
+
+@pytest.mark.parametrize("price, expected", [(100.05, "100.10"), (100.04999, "100.00"), (100.1, "100.10"), (99.95, "100.00"), (0.05, "0.10")])
+def test_round_price_half_up_at_tick_boundaries(price, expected):
+    assert str(META.round_price(price)) == expected
+
+
+def test_quantity_is_capped_at_max_qty_on_the_step_grid():
+    # MARKET_LOT_SIZE azamisi (5.0005) adım ızgarasına aşağı çekilir; LOT_SIZE sınırı ayrı uygulanır
+    assert str(META.round_quantity(10, market=True)) == "5.000"
+    assert str(META.round_quantity(250, market=False)) == "100.000"
+    # Azami değer verilmemişse (0) sınır yoktur
+    assert str(SymbolMeta("X", "0.1", "0.001").round_quantity(1e6)) == "1000000.000"
+
+
+@pytest.mark.parametrize("quantity, price, valid", [
+    ("0.049", 100.0, False),   # 4.9 USDT < 5
+    ("0.05", 100.0, True),     # Tam sınırda
+    ("0.0009", 1e6, False),    # Nominal yeterli ama asgari miktarın altında
+    ("0", 100.0, False),
+])
+def test_min_notional_and_min_qty(quantity, price, valid):
+    assert META.is_valid_order(Decimal(quantity), price) is valid
+
+
+def test_cache_round_trip_skips_network(tmp_path):
+    path = str(tmp_path / "cache" / "exchange_info.json")
+    client = ExchangeInfoClient()
+    first = SymbolMetadataService(cache_path=path, ttl=60)
+    asyncio.run(first.load(client))
+    assert client.calls == 1 and len(first) == 2 and first.get("OLDUSDT") is None
+    second = SymbolMetadataService(cache_path=path, ttl=60)
+    asyncio.run(second.load(client))
+    assert client.calls == 1
+    assert second.get("BTCUSDT").to_record() == first.get("BTCUSDT").to_record()
+    assert second.loaded_at == first.loaded_at and second.is_fresh()
+
+
+def test_expired_cache_and_memory_are_refreshed(tmp_path, monkeypatch):
+    path = str(tmp_path / "exchange_info.json")
+    client = ExchangeInfoClient()
+    service = SymbolMetadataService(cache_path=path, ttl=60)
+    asyncio.run(service.load(client))
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert not service.is_fresh()
+    asyncio.run(SymbolMetadataService(cache_path=path, ttl=60).load(client))
+    assert client.calls == 2
+    # Bellekteki bayat kopya, yeni yazılmış disk önbelleğinden ağa gitmeden tazelenir
+    asyncio.run(service.load(client))
+    assert client.calls == 2 and service.is_fresh()
+    asyncio.run(service.load(client, force=True))
+    assert client.calls == 3
+    with open(path) as f: assert json.load(f)["fetched_at"] == pytest.approx(now + 61)
+
+
+def test_corrupt_cache_falls_back_to_network(tmp_path):
+    path = tmp_path / "exchange_info.json"
+    path.write_text('{"fetched_at": ')
+    client = ExchangeInfoClient()
+    service = SymbolMetadataService(cache_path=str(path), ttl=60)
+    asyncio.run(service.load(client))
+    assert client.calls == 1 and service.get("ETHUSDT") is not None
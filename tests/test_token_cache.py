@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+from app.token_cache import TokenCache
+
+
+class FakeVerifier:
+    """`firebase_manager.verify_token` taklidi: çağrıları sayar, isteğe bağlı olarak bir olayı bekler."""
+    def __init__(self, ttl: float = 3600, gate: threading.Event | None = None):
+        self.ttl, self.gate, self.calls = ttl, gate, 0
+
+    def __call__(self, token: str) -> dict | None:
+        self.calls += 1
+        if self.gate: self.gate.wait(2)
+        if token.startswith("bad"): return None
+        return {"uid": token, "exp": time.time() + self.ttl}
+
+
+def test_cache_hit_skips_verification():
+    verify = FakeVerifier()
+    cache = TokenCache(verify, max_size=10, max_ttl=60)
+    async def scenario():
+        first = await cache.get_user("alice")
+        second = await cache.get_user("alice")
+        return first, second
+    first, second = asyncio.run(scenario())
+    assert first == second and first["uid"] == "alice"
+    assert verify.calls == 1 and (cache.hits, cache.misses) == (1, 1)
+
+
+def test_expired_entry_is_verified_again():
+    verify = FakeVerifier()
+    cache = TokenCache(verify, max_size=10, max_ttl=0.05)
+    async def scenario():
+        await cache.get_user("alice")
+        await asyncio.sleep(0.1)
+        await cache.get_user("alice")
+    asyncio.run(scenario())
+    assert verify.calls == 2
+
+
+def test_invalid_and_already_expired_tokens_are_not_cached():
+    verify = FakeVerifier(ttl=-1)
+    cache = TokenCache(verify, max_size=10, max_ttl=60)
+    async def scenario():
+        assert await cache.get_user("bad-token") is None
+        await cache.get_user("bad-token"); await cache.get_user("stale")
+    asyncio.run(scenario())
+    assert verify.calls == 3 and not cache._entries
+
+
+def test_lru_eviction_keeps_recently_used_tokens():
+    verify = FakeVerifier()
+    cache = TokenCache(verify, max_size=2, max_ttl=60)
+    async def scenario():
+        await cache.get_user("a"); await cache.get_user("b")
+        await cache.get_user("a")  # "a" en son kullanılan olur
+        await cache.get_user("c")  # "b" çıkarılır
+        calls = verify.calls
+        await cache.get_user("a"); await cache.get_user("c")
+        assert verify.calls == calls
+        await cache.get_user("b")
+        assert verify.calls == calls + 1
+    asyncio.run(scenario())
+
+
+def test_concurrent_callers_share_one_verification():
+    gate = threading.Event()
+    verify = FakeVerifier(gate=gate)
+    cache = TokenCache(verify, max_size=10, max_ttl=60)
+    async def scenario():
+        callers = [asyncio.create_task(cache.get_user("alice")) for _ in range(20)]
+        await asyncio.sleep(0.05); gate.set()
+        return await asyncio.gather(*callers)
+    users = asyncio.run(scenario())
+    assert verify.calls == 1 and all(user["uid"] == "alice" for user in users)
+
+
+def test_cancelling_first_caller_does_not_cancel_other_waiters():
+    gate = threading.Event()
+    verify = FakeVerifier(gate=gate)
+    cache = TokenCache(verify, max_size=10, max_ttl=60)
+    async def scenario():
+        owner = asyncio.create_task(cache.get_user("alice"))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(cache.get_user("alice"))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        await asyncio.sleep(0.01); gate.set()
+        user = await waiter
+        assert owner.cancelled()
+        return user, await cache.get_user("alice")
+    user, cached = asyncio.run(scenario())
+    assert user["uid"] == "alice" and cached is user
+    assert verify.calls == 1
@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from app.firebase_manager import FirebaseManager
+from app.trade_journal import TradeJournal
+from benchmarks.mock_exchange import MockTradeSink
+
+
+class CountingSink(MockTradeSink):
+    """Her anahtarın kaç kez yazıldığını da sayar."""
+    def __init__(self, **kwargs):
+        super().__init__(latency=0.0, **kwargs)
+        self.writes: dict[str, int] = {}
+
+    def write_trades(self, records: dict[str, dict]):
+        super().write_trades(records)
+        for key in records: self.writes[key] = self.writes.get(key, 0) + 1
+
+
+def test_records_survive_sink_outage_and_are_written_once(tmp_path):
+    wal_path = str(tmp_path / "journal.jsonl")
+    sink = CountingSink(fail=True)
+    async def scenario():
+        journal = TradeJournal(sink, wal_path=wal_path, flush_interval=0.01, retry_delay=0.02)
+        journal.start()
+        keys = [journal.log_trade({"symbol": "BTCUSDT", "pnl": i}) for i in range(3)]
+        await asyncio.sleep(0.1)
+        assert sink.records == {} and journal.metrics["failures"] >= 2
+        assert journal.stats()["pending"] == 3
+        sink.fail = False
+        assert await journal.flush(timeout=2.0)
+        await journal.close()
+        # Yeniden başlatma onaylanmış kayıtları tekrar göndermez
+        restarted = TradeJournal(sink, wal_path=wal_path)
+        restarted.start()
+        await asyncio.sleep(0.05)
+        assert restarted.metrics["replayed"] == 0
+        await restarted.close()
+        return keys
+    keys = asyncio.run(scenario())
+    assert sorted(sink.records) == sorted(keys)
+    assert [sink.records[key]["pnl"] for key in keys] == [0, 1, 2]
+    assert all(sink.writes[key] == 1 for key in keys)
+
+
+def test_unconfigured_firebase_write_raises(monkeypatch):
+    monkeypatch.delenv("FIREBASE_CREDENTIALS_JSON", raising=False)
+    manager = FirebaseManager()
+    with pytest.raises(ConnectionError):
+        manager.write_trades({"k": {"symbol": "BTCUSDT"}})
+
+
+def test_unsent_records_are_replayed_after_restart(tmp_path):
+    wal_path = str(tmp_path / "journal.jsonl")
+    down, healthy = CountingSink(fail=True), CountingSink()
+    async def scenario():
+        journal = TradeJournal(down, wal_path=wal_path, flush_interval=0.01, retry_delay=0.02)
+        key = journal.log_trade({"symbol": "ETHUSDT", "pnl": -1.5})
+        assert not await journal.flush(timeout=0.1)
+        await journal.close(timeout=0.0)
+        restarted = TradeJournal(healthy, wal_path=wal_path, flush_interval=0.01)
+        restarted.start()
+        assert restarted.metrics["replayed"] == 1
+        assert await restarted.flush(timeout=2.0)
+        await restarted.close()
+        return key
+    key = asyncio.run(scenario())
+    assert down.records == {} and healthy.records == {key: {"symbol": "ETHUSDT", "pnl": -1.5}}
+    assert healthy.writes == {key: 1}
+
+
+def test_unconfigured_sink_keeps_records_in_wal_without_retrying(tmp_path):
+    wal_path = str(tmp_path / "journal.jsonl")
+    offline, healthy = CountingSink(configured=False), CountingSink()
+    async def scenario():
+        journal = TradeJournal(offline, wal_path=wal_path, flush_interval=0.01, retry_delay=0.01)
+        keys = [journal.log_trade({"symbol": "BTCUSDT", "pnl": i}) for i in range(2)]
+        await asyncio.sleep(0.05)
+        stats = journal.stats()
+        # Kapanış, yazılamayacak kayıtlar için flush zaman aşımını beklemez
+        started = asyncio.get_running_loop().time()
+        await journal.close(timeout=5.0)
+        closed_in = asyncio.get_running_loop().time() - started
+        restarted = TradeJournal(healthy, wal_path=wal_path, flush_interval=0.01)
+        restarted.start()
+        assert await restarted.flush(timeout=2.0)
+        await restarted.close()
+        return keys, stats, closed_in, restarted
+    keys, stats, closed_in, restarted = asyncio.run(scenario())
+    assert offline.calls == 0 and stats["failures"] == 0
+    assert stats["offline"] and stats["local_only"] == 2 and stats["pending"] == 0
+    assert closed_in < 1.0
+    # Depo yapılandırıldığında günlükte kalan kayıtlar bir kez gönderilir
+    assert restarted.metrics["replayed"] == 2 and sorted(healthy.records) == sorted(keys)
+
+
+def test_failing_sink_retries_with_capped_backoff(tmp_path):
+    sink = CountingSink(fail=True)
+    async def scenario():
+        journal = TradeJournal(sink, wal_path=str(tmp_path / "journal.jsonl"), flush_interval=0.01, retry_delay=0.01, max_retry_delay=0.04)
+        journal.log_trade({"symbol": "BTCUSDT", "pnl": 1.0})
+        await asyncio.sleep(0.3)
+        metrics = dict(journal.metrics)
+        await journal.close(timeout=0.0)
+        return metrics
+    metrics = asyncio.run(scenario())
+    # 0.01 + 0.02 + 0.04 + 0.04 ...: sabit 0.01 sn aralıkla ~30 deneme olurdu
+    assert 4 <= metrics["failures"] <= 12
+    assert metrics["last_retry_delay"] == 0.04
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.indicators import IndicatorEngine
+from app.kline_store import KLINE_EVENT_KEYS, KlineStore
+from app.trading_strategy import STRATEGIES, EmaCrossoverStrategy, Strategy, create_strategy
+
+HISTORY = 50
+
+
+def _candles(n: int = 600, seed: int = 42) -> list[list]:
+    """Sabit mum serisi (REST biçimi): trend, yatay bölge ve dalgalı kısımlar; kapanışlar 2 ondalığa yuvarlı."""
+    rng = np.random.default_rng(seed)
+    steps = np.concatenate([rng.normal(0.05, 0.4, n // 3), np.where(rng.random(n // 3) < 0.2, rng.normal(0, 0.3, n // 3), 0.0),
+                            rng.normal(-0.02, 0.8, n - 2 * (n // 3))])
+    closes = np.round(100 + np.cumsum(steps), 2)
+    return [[i * 60_000, f"{o:.2f}", f"{max(o, c) + 0.05:.2f}", f"{min(o, c) - 0.05:.2f}", f"{c:.2f}", "10.0",
+             i * 60_000 + 59_999, f"{10 * c:.2f}", 10, "5.0", f"{5 * c:.2f}", "0"]
+            for i, (o, c) in enumerate(zip(np.concatenate([closes[:1], closes[:-1]]), closes))]
+
+
+class BaselineStrategy:
+    """İlk sürümdeki `TradingStrategy.analyze_klines`: her mumda tüm listeden pandas ile EMA yeniden hesaplanır."""
+    def __init__(self, short_ema_period: int, long_ema_period: int):
+        self.short_ema_period, self.long_ema_period, self.last_signal = short_ema_period, long_ema_period, None
+
+    def analyze_klines(self, klines: list) -> str:
+        if len(klines) < self.long_ema_period: return "HOLD"
+        close = pd.to_numeric(pd.DataFrame(klines).iloc[:, 4])
+        short_ema = close.ewm(span=self.short_ema_period, adjust=False).mean()
+        long_ema = close.ewm(span=self.long_ema_period, adjust=False).mean()
+        signal = "HOLD"
+        if short_ema.iloc[-2] < long_ema.iloc[-2] and short_ema.iloc[-1] > long_ema.iloc[-1]: signal = "LONG"
+        elif short_ema.iloc[-2] > long_ema.iloc[-2] and short_ema.iloc[-1] < long_ema.iloc[-1]: signal = "SHORT"
+        if signal != "HOLD" and signal == self.last_signal: return "HOLD"
+        self.last_signal = signal
+        return signal
+
+
+@pytest.mark.parametrize("name, params", [
+    ("ema_crossover", {"short_ema_period": 0}), ("ema_crossover", {"short_ema_period": 12, "long_ema_period": 12}),
+    ("ema_crossover", {"short_ema_period": 20, "long_ema_period": 5}), ("ema_crossover", {"long_ema_period": 12.5}),
+    ("rsi_reversion", {"period": 0}), ("rsi_reversion", {"period": "14"}), ("rsi_reversion", {"lower": 70, "upper": 30}),
+    ("bollinger_reversion", {"period": 0}), ("bollinger_reversion", {"atr_period": -1}), ("bollinger_reversion", {"width": 0}),
+    ("bollinger_reversion", {"min_width_atr": -0.5}),
+])
+def test_invalid_parameters_are_rejected_at_construction(name, params):
+    with pytest.raises(ValueError):
+        create_strategy(name, **params)
+
+
+@pytest.mark.parametrize("name", sorted(STRATEGIES))
+def test_default_parameters_are_valid(name):
+    strategy = create_strategy(name)
+    assert strategy.params == type(strategy)(**strategy.params).params
+
+
+def test_strategy_is_abstract():
+    with pytest.raises(TypeError):
+        Strategy()
+
+
+@pytest.mark.parametrize("short_period, long_period", [(5, 12), (9, 21)])
+def test_ema_crossover_matches_baseline_signals(short_period, long_period):
+    # Canlı yol BotCore gibi: geçmişle beslenen depo ve gösterge motoru, sonra her kapanan mumda tek adım.
+    # Temel sürüm kayan 50 mumluk pencereyi yeniden çapalıyordu; EMA artık tüm geçmişi izlediği için
+    # karşılaştırma tüm listeyle yapılır.
+    candles = _candles()
+    baseline, strategy = BaselineStrategy(short_period, long_period), EmaCrossoverStrategy(short_period, long_period)
+    store, engine = KlineStore.from_klines(candles[:HISTORY], capacity=HISTORY), IndicatorEngine()
+    engine.add_symbol("TEST", strategy.indicators(), store)
+    expected, actual = [], []
+    for i in range(HISTORY, len(candles)):
+        expected.append(baseline.analyze_klines(candles[:i + 1]))
+        assert store.append_event(dict(zip(KLINE_EVENT_KEYS, candles[i])))
+        engine.update([("TEST", store)])
+        actual.append(strategy.evaluate(engine.view("TEST")))
+    assert actual == expected
+    assert {"LONG", "SHORT"} <= set(expected) and sum(signal != "HOLD" for signal in expected) >= 10
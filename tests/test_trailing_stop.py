@@ -0,0 +1,167 @@
+import asyncio
+import pytest
+from binance.exceptions import BinanceAPIException
+from app.binance_client import binance_client
+from app.bot_core import BotCore, SymbolState
+from app.config import settings
+from app.rest_scheduler import RestScheduler
+from app.trade_journal import trade_journal
+from app.trading_strategy import create_strategy
+from app.trailing_stop import TrailingStopEngine
+from benchmarks.mock_exchange import MockExchangeClient, MockTradeSink
+
+
+def _engine(activation: float = 0.01, distance: float = 0.005):
+    triggers = []
+    engine = TrailingStopEngine(lambda symbol, price, position: triggers.append((symbol, price, position.stop_price)),
+                                activation_percent=activation, distance_percent=distance)
+    return engine, triggers
+
+
+def test_long_stop_ratchets_up_with_new_highs_only():
+    engine, triggers = _engine()
+    position = engine.open("BTCUSDT", "LONG", 100.0)
+    assert position.stop_price == pytest.approx(99.5)
+    for price in (101.0, 102.0, 101.8, 103.0):
+        engine.on_price("BTCUSDT", price)
+    assert position.extreme * position.side == 103.0
+    assert position.stop_price == pytest.approx(103.0 * 0.995)
+    # Geri çekilme stop'u aşağı çekmez
+    engine.on_price("BTCUSDT", 102.6)
+    assert position.stop_price == pytest.approx(103.0 * 0.995) and triggers == []
+
+
+def test_short_stop_ratchets_down_with_new_lows_only():
+    engine, triggers = _engine()
+    position = engine.open("ETHUSDT", "SHORT", 100.0)
+    assert position.stop_price == pytest.approx(100.5)
+    for price in (99.0, 98.0, 98.3, 97.0):
+        engine.on_price("ETHUSDT", price)
+    assert position.extreme * position.side == 97.0
+    assert position.stop_price == pytest.approx(97.0 * 1.005)
+    engine.on_price("ETHUSDT", 97.4)
+    assert position.stop_price == pytest.approx(97.0 * 1.005) and triggers == []
+
+
+@pytest.mark.parametrize("side, below, at", [("LONG", 100.99, 101.0), ("SHORT", 99.01, 99.0)])
+def test_trailing_activates_at_threshold(side, below, at):
+    engine, _ = _engine(activation=0.01)
+    position = engine.open("BTCUSDT", side, 100.0)
+    engine.on_price("BTCUSDT", below)
+    assert not position.active
+    engine.on_price("BTCUSDT", at)
+    assert position.active
+
+
+@pytest.mark.parametrize("side, prices", [("LONG", (100.8, 100.0, 99.0)), ("SHORT", (99.2, 100.0, 101.0))])
+def test_inactive_stop_does_not_trigger(side, prices):
+    """Aktivasyon eşiğine ulaşmadan fiyat stop'un ötesine geçse de kapanış TP/SL emirlerine bırakılır."""
+    engine, triggers = _engine(activation=0.01)
+    position = engine.open("BTCUSDT", side, 100.0)
+    for price in prices: engine.on_price("BTCUSDT", price)
+    assert triggers == [] and not position.active and "BTCUSDT" in engine
+
+
+@pytest.mark.parametrize("side, path, trigger", [("LONG", (101.0, 102.0), 101.49), ("SHORT", (99.0, 98.0), 98.51)])
+def test_stop_triggers_once_and_stops_tracking(side, path, trigger):
+    engine, triggers = _engine(activation=0.01, distance=0.005)
+    engine.open("BTCUSDT", side, 100.0)
+    for price in path: engine.on_price("BTCUSDT", price)
+    engine.on_price("BTCUSDT", trigger)
+    engine.on_price("BTCUSDT", trigger)
+    engine.on_price("BTCUSDT", trigger * (0.99 if side == "LONG" else 1.01))
+    assert len(triggers) == 1
+    symbol, price, stop = triggers[0]
+    assert (symbol, price) == ("BTCUSDT", trigger)
+    assert stop == pytest.approx(102.0 * 0.995 if side == "LONG" else 98.0 * 1.005)
+    assert "BTCUSDT" not in engine and engine.metrics["triggers"] == 1
+
+
+def test_trigger_at_exact_stop_price():
+    engine, triggers = _engine(activation=0.01, distance=0.005)
+    position = engine.open("BTCUSDT", "LONG", 100.0)
+    engine.on_price("BTCUSDT", 102.0)
+    engine.on_price("BTCUSDT", position.stop_price)
+    assert len(triggers) == 1
+
+
+def test_positions_are_tracked_independently_and_reopen_resets():
+    engine, triggers = _engine(activation=0.01, distance=0.005)
+    engine.open("AAA", "LONG", 100.0); engine.open("BBB", "SHORT", 100.0)
+    engine.on_price("AAA", 102.0); engine.on_price("BBB", 102.0)
+    engine.on_price("AAA", 101.0)
+    assert [t[0] for t in triggers] == ["AAA"] and "BBB" in engine
+    engine.on_price("UNKNOWN", 1.0)  # İzlenmeyen sembol yok sayılır
+    position = engine.open("AAA", "SHORT", 90.0)
+    assert not position.active and position.stop_price == pytest.approx(90.0 * 1.005)
+    assert engine.close("BBB") is not None and engine.close("BBB") is None
+    assert len(engine) == 1
+
+
+def _open_orders(client: MockExchangeClient) -> list[dict]:
+    return [o for o in client.orders.values() if o["status"] == "NEW"]
+
+
+class FailingCloseClient(MockExchangeClient):
+    """Reduce-only kapanış piyasa emrinin ilk `failures` denemesi borsa tarafından reddedilir."""
+    def __init__(self, failures: int, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    async def futures_create_order(self, **params):
+        if params.get("reduceOnly") and self.failures:
+            self.failures -= 1
+            await self._round_trip("order", params)
+            raise BinanceAPIException(None, 400, '{"code": -1001, "msg": "Internal error"}')
+        return await super().futures_create_order(**params)
+
+
+def _protected_bot(monkeypatch, tmp_path, failures: int):
+    client = FailingCloseClient(failures, latency=0.0, fill_delay=0.0, event_delay=0.0)
+    monkeypatch.setattr(binance_client, "client", client)
+    monkeypatch.setattr(binance_client, "scheduler", RestScheduler())
+    monkeypatch.setattr(trade_journal, "sink", MockTradeSink(latency=0.0))
+    monkeypatch.setattr(trade_journal, "wal_path", str(tmp_path / "trade_journal.jsonl"))
+    bot = BotCore()
+    state = SymbolState("BTCUSDT", create_strategy())
+    state.status.update(in_position=True, entry_price=100.0, position_side="LONG")
+    bot.symbols[state.symbol] = state
+    async def open_position():
+        await client.futures_create_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity="0.010")
+        await client.futures_create_order(symbol="BTCUSDT", side="SELL", type="TAKE_PROFIT_MARKET", stopPrice="105", closePosition=True)
+        await client.futures_create_order(symbol="BTCUSDT", side="SELL", type="STOP_MARKET", stopPrice="95", closePosition=True)
+        bot.trailing_stops.open("BTCUSDT", "LONG", 100.0)
+    return bot, state, client, open_position
+
+
+def _trigger(bot: BotCore, state: SymbolState):
+    for price in (102.0, 101.0): bot.trailing_stops.on_price("BTCUSDT", price)
+    return state.trade_task
+
+
+def test_failed_trailing_close_keeps_position_protected(monkeypatch, tmp_path):
+    bot, state, client, open_position = _protected_bot(monkeypatch, tmp_path, failures=3)
+    async def scenario():
+        await open_position()
+        await _trigger(bot, state)
+    asyncio.run(scenario())
+    # Kapatma üç denemede de reddedildi: TP/SL yerinde, iz süren stop aynı seviyeden izlemeye devam ediyor
+    assert client.positions["BTCUSDT"][0] == 0.01
+    assert sorted(o["type"] for o in _open_orders(client)) == ["STOP_MARKET", "TAKE_PROFIT_MARKET"]
+    assert state.status["in_position"] is True
+    assert "BTCUSDT" in bot.trailing_stops
+    assert bot.trailing_stops.snapshot()["BTCUSDT"]["stop_price"] == pytest.approx(102.0 * (1 - settings.TRAILING_DISTANCE_PERCENT))
+
+
+def test_trailing_close_is_retried_and_cleans_up_after_fill(monkeypatch, tmp_path):
+    bot, state, client, open_position = _protected_bot(monkeypatch, tmp_path, failures=1)
+    async def scenario():
+        await open_position()
+        await _trigger(bot, state)
+        await trade_journal.close()
+    asyncio.run(scenario())
+    assert client.positions["BTCUSDT"][0] == 0
+    assert _open_orders(client) == []
+    assert state.status["in_position"] is False and "BTCUSDT" not in bot.trailing_stops
+    [record] = trade_journal.sink.records.values()
+    assert record["status"] == "CLOSED_BY_TRAILING_STOP"